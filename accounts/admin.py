@@ -4,7 +4,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Library, ReaderProfile, User
+from .models import Library, NewsletterCampaign, OutboxEmail, ReaderProfile, User
+from .search import search_readers
 
 
 @admin.register(Library)
@@ -145,3 +146,60 @@ class ReaderProfileAdmin(admin.ModelAdmin):
             {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
         ),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search readers through the full-text index instead of LIKE scans."""
+        if not search_term:
+            return queryset, False
+        return search_readers(queryset, search_term), False
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Read-only admin for the email outbox (delivery state)."""
+
+    list_display = (
+        "subject",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    ordering = ("-created_at",)
+    exclude = ("body",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    """Admin for newsletter campaigns; sending is done by ``send_newsletter``."""
+
+    list_display = (
+        "subject",
+        "library",
+        "status",
+        "sent_count",
+        "failed_count",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "library")
+    search_fields = ("subject",)
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "status",
+        "last_reader_id",
+        "sent_count",
+        "failed_count",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
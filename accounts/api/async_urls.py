@@ -0,0 +1,41 @@
+"""
+API URL configuration with the native async views (ASGI deployments).
+
+The read endpoints of accounts.api.async_views take precedence; every other
+route (authentication, staff endpoints, router) is the regular one.
+"""
+
+from django.urls import path
+
+from . import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+async_urlpatterns = [
+    path("readers/me/", async_views.reader_me, name="reader-me"),
+    path("readers/me/loans/", async_views.reader_me_loans, name="reader-me-loans"),
+    path(
+        "readers/me/reservations/",
+        async_views.reader_me_reservations,
+        name="reader-me-reservations",
+    ),
+    path(
+        "readers/me/history/",
+        async_views.reader_me_history,
+        name="reader-me-history",
+    ),
+    path(
+        "readers/me/dashboard/",
+        async_views.reader_me_dashboard,
+        name="reader-me-dashboard",
+    ),
+    path("libraries/", async_views.library_list, name="library-list"),
+    path("libraries/<int:pk>/", async_views.library_detail, name="library-detail"),
+]
+
+_async_names = {pattern.name for pattern in async_urlpatterns}
+
+urlpatterns = async_urlpatterns + [
+    pattern
+    for pattern in sync_urlpatterns
+    if getattr(pattern, "name", None) not in _async_names
+]
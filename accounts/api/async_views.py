@@ -0,0 +1,254 @@
+"""
+Native async views for the accounts API (ASGI deployments).
+
+They serve the same GET endpoints and payloads as the DRF viewsets without a
+sync_to_async hop around the whole request: the JWT is decoded on the event
+loop, the user state and the data are read with the async ORM, and the DRF
+serializers only format rows that are already loaded. Other methods (e.g.
+PATCH /readers/me/) are handed over to the DRF views. Mounted by
+``accounts.api.async_urls`` when API_ASYNC_VIEWS is enabled (see
+app/asgi.py).
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    NotAuthenticated,
+    NotFound,
+    PermissionDenied,
+)
+
+from accounts import cache_versions
+from accounts.models import ReaderProfile
+from accounts.pagination import CursorPaginator, InvalidCursor
+from loans.archive import HISTORY_ORDERING, reader_history
+from loans.queries import LOAN_ORDERING, current_loans
+from loans.reservations import reader_reservations
+
+from .authentication import ClaimsJWTAuthentication
+from .caching import acached_json, json_response
+from .serializers import (
+    HistorySerializer,
+    LibrarySerializer,
+    LoanSerializer,
+    ReaderMeSerializer,
+    ReservationSerializer,
+)
+from .views import LibraryViewSet, ReaderMeViewSet, serialize_page
+
+NOT_A_READER = "Vous n'êtes pas un lecteur ou votre profil n'existe pas."
+
+_authentication = ClaimsJWTAuthentication()
+
+
+def async_get(sync_view):
+    """
+    Serve GET and HEAD with the decorated coroutine and delegate any other
+    method to ``sync_view``. API exceptions become JSON error responses.
+    """
+    sync_view = sync_to_async(sync_view)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await sync_view(request, *args, **kwargs)
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(request, exc)
+
+        return csrf_exempt(wrapper)
+
+    return decorator
+
+
+def error_response(request, exc):
+    """Render an API exception the way DRF's exception handler does."""
+    detail = exc.detail
+    if not isinstance(detail, (dict, list)):
+        detail = {"detail": detail}
+    response = json_response(detail, exc.status_code)
+    if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+        response["WWW-Authenticate"] = _authentication.authenticate_header(request)
+        response.status_code = status.HTTP_401_UNAUTHORIZED
+    return response
+
+
+async def authenticate(request):
+    """Return the user from the JWT, else from the session."""
+    result = await _authentication.aauthenticate(request)
+    if result is not None:
+        return result[0]
+    user = await request.auser()
+    if not user.is_authenticated:
+        raise NotAuthenticated()
+    return user
+
+
+async def get_reader_profile(user):
+    """Load the reader profile with its user and library, or None."""
+    if not user.is_reader:
+        return None
+    return (
+        await ReaderProfile.objects.select_related("user__library")
+        .filter(user_id=user.pk)
+        .afirst()
+    )
+
+
+async def require_reader_profile(request):
+    profile = await get_reader_profile(await authenticate(request))
+    if profile is None:
+        raise PermissionDenied(NOT_A_READER)
+    return profile
+
+
+async def paginate(
+    request, queryset, ordering, serializer_class, cursor=None, url=None, page_size=None
+):
+    """Async counterpart of ``ReaderMeViewSet.paginate``."""
+    paginator = CursorPaginator(
+        queryset, page_size or ReaderMeViewSet.page_size, ordering
+    )
+    try:
+        page = await paginator.apage(cursor)
+    except InvalidCursor as exc:
+        raise NotFound("Curseur de pagination invalide.") from exc
+    return serialize_page(
+        page,
+        serializer_class,
+        url or request.build_absolute_uri(),
+        ReaderMeViewSet.cursor_query_param,
+    )
+
+
+def get_cursor(request):
+    return request.GET.get(ReaderMeViewSet.cursor_query_param)
+
+
+async def list_reservations(profile):
+    holds = [hold async for hold in reader_reservations(profile.pk)]
+    return ReservationSerializer(holds, many=True).data
+
+
+@async_get(ReaderMeViewSet.as_view({"get": "list", "patch": "partial_update"}))
+async def reader_me(request):
+    """GET /readers/me/ - Reader's profile, sharing the DRF view's cache."""
+    user = await authenticate(request)
+
+    async def build_data():
+        profile = await get_reader_profile(user)
+        if profile is None:
+            return status.HTTP_403_FORBIDDEN, {"detail": NOT_A_READER}
+        return status.HTTP_200_OK, ReaderMeSerializer(profile).data
+
+    scopes = [
+        cache_versions.reader_scope(user.pk),
+        cache_versions.library_scope(user.library_id),
+    ]
+    return await acached_json(request, scopes, build_data)
+
+
+@async_get(ReaderMeViewSet.as_view({"get": "loans"}))
+async def reader_me_loans(request):
+    """GET /readers/me/loans/ - Current loans (cursor-paginated)."""
+    profile = await require_reader_profile(request)
+    return json_response(
+        await paginate(
+            request,
+            current_loans(profile.pk),
+            LOAN_ORDERING,
+            LoanSerializer,
+            cursor=get_cursor(request),
+        )
+    )
+
+
+@async_get(ReaderMeViewSet.as_view({"get": "reservations"}))
+async def reader_me_reservations(request):
+    """GET /readers/me/reservations/ - Reservations with queue positions."""
+    profile = await require_reader_profile(request)
+    results = await list_reservations(profile)
+    return json_response({"count": len(results), "results": results})
+
+
+@async_get(ReaderMeViewSet.as_view({"get": "history"}))
+async def reader_me_history(request):
+    """GET /readers/me/history/ - Archived loan history (cursor-paginated)."""
+    profile = await require_reader_profile(request)
+    return json_response(
+        await paginate(
+            request,
+            reader_history(profile.pk),
+            HISTORY_ORDERING,
+            HistorySerializer,
+            cursor=get_cursor(request),
+        )
+    )
+
+
+@async_get(ReaderMeViewSet.as_view({"get": "dashboard"}))
+async def reader_me_dashboard(request):
+    """GET /readers/me/dashboard/ - All reader sections in one response."""
+    user = await authenticate(request)
+    sections = ReaderMeViewSet.parse_dashboard_sections(request.GET.get("include"))
+    profile = await get_reader_profile(user)
+    if profile is None:
+        raise PermissionDenied(NOT_A_READER)
+
+    data = {}
+    if "profile" in sections:
+        data["profile"] = ReaderMeSerializer(profile).data
+    if "loans" in sections:
+        data["loans"] = await paginate(
+            request,
+            current_loans(profile.pk),
+            LOAN_ORDERING,
+            LoanSerializer,
+            url=request.build_absolute_uri(reverse("reader-me-loans")),
+        )
+    if "reservations" in sections:
+        data["reservations"] = await list_reservations(profile)
+    if "history" in sections:
+        data["history"] = await paginate(
+            request,
+            reader_history(profile.pk),
+            HISTORY_ORDERING,
+            HistorySerializer,
+            url=request.build_absolute_uri(reverse("reader-me-history")),
+            page_size=ReaderMeViewSet.dashboard_history_size,
+        )
+    return json_response(data)
+
+
+@async_get(LibraryViewSet.as_view({"get": "list"}))
+async def library_list(request):
+    """GET /libraries/ - Active libraries, sharing the DRF view's cache."""
+
+    async def build_data():
+        libraries = [library async for library in LibraryViewSet.queryset.all()]
+        return status.HTTP_200_OK, LibrarySerializer(libraries, many=True).data
+
+    return await acached_json(request, [cache_versions.LIBRARIES_SCOPE], build_data)
+
+
+@async_get(LibraryViewSet.as_view({"get": "retrieve"}))
+async def library_detail(request, pk):
+    """GET /libraries/<pk>/ - One active library."""
+
+    async def build_data():
+        library = await LibraryViewSet.queryset.filter(pk=pk).afirst()
+        if library is None:
+            return status.HTTP_404_NOT_FOUND, {"detail": NotFound.default_detail}
+        return status.HTTP_200_OK, LibrarySerializer(library).data
+
+    return await acached_json(request, [cache_versions.LIBRARIES_SCOPE], build_data)
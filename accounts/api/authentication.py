@@ -0,0 +1,211 @@
+"""
+Authentication classes for the accounts API.
+"""
+
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.permissions import SAFE_METHODS
+
+from accounts.backends import identity_queryset
+from accounts.models import ReaderProfile, User
+
+# user_id -> (checked_at, (is_active, user_type, library_id) or None)
+_user_states = {}
+_user_states_lock = threading.Lock()
+
+
+def get_user_state(user_id):
+    """
+    Return the (is_active, user_type, library_id) of a user, or None if the
+    user no longer exists. Results are kept in process memory for
+    JWT_CLAIMS_CHECK_TTL seconds.
+    """
+    now = time.monotonic()
+    entry = _user_states.get(user_id)
+    if entry is not None and now - entry[0] < settings.JWT_CLAIMS_CHECK_TTL:
+        return entry[1]
+    state = (
+        User.objects.filter(pk=user_id)
+        .values_list("is_active", "user_type", "library_id")
+        .first()
+    )
+    with _user_states_lock:
+        _user_states[user_id] = (now, state)
+    return state
+
+
+async def aget_user_state(user_id):
+    """Async counterpart of get_user_state (shares the same memory)."""
+    now = time.monotonic()
+    entry = _user_states.get(user_id)
+    if entry is not None and now - entry[0] < settings.JWT_CLAIMS_CHECK_TTL:
+        return entry[1]
+    state = (
+        await User.objects.filter(pk=user_id)
+        .values_list("is_active", "user_type", "library_id")
+        .afirst()
+    )
+    with _user_states_lock:
+        _user_states[user_id] = (now, state)
+    return state
+
+
+def forget_user(user_id):
+    """Drop the remembered state of a user (called on save and delete)."""
+    with _user_states_lock:
+        _user_states.pop(user_id, None)
+
+
+def clear():
+    """Drop all remembered user states."""
+    with _user_states_lock:
+        _user_states.clear()
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from the access token claims.
+
+    Exposes the attributes the reader endpoints rely on (user type, library)
+    without loading the user row; the reader profile is loaded on demand.
+    """
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def user_type(self):
+        return self.token.get("user_type")
+
+    @cached_property
+    def library_id(self):
+        return self.token.get("library_id")
+
+    @property
+    def is_superadmin(self):
+        return self.user_type == User.UserType.SUPERADMIN
+
+    @property
+    def is_library_staff(self):
+        return self.user_type == User.UserType.LIBRARY
+
+    @property
+    def is_reader(self):
+        return self.user_type == User.UserType.READER
+
+    @cached_property
+    def reader_profile(self):
+        return ReaderProfile.objects.select_related("user__library").get(
+            user_id=self.id
+        )
+
+
+class IdentityJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user with its library and reader
+    profile in a single query (see accounts.backends).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from exc
+
+        user = (
+            identity_queryset().filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        )
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
+
+
+class ClaimsJWTAuthentication(IdentityJWTAuthentication):
+    """
+    Opt-in JWT authentication for read-mostly endpoints.
+
+    Safe requests are authenticated from the token claims alone. The user
+    row is only checked against a short-lived in-memory state (active flag,
+    user type, library) to catch revoked accounts. Unsafe requests, tokens
+    without the custom claims and tokens whose claims no longer match the
+    user's state fall back to the regular database lookup.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in SAFE_METHODS:
+            user = self.get_claims_user(validated_token)
+            if user is not None:
+                return user, validated_token
+        return self.get_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of authenticate() for native async views, which
+        only serve safe requests.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        user = None
+        if "user_type" in validated_token:
+            user = ClaimsUser(validated_token)
+            user = self.check_claims(user, await aget_user_state(user.id))
+        if user is None:
+            user = await sync_to_async(self.get_user)(validated_token)
+        return user, validated_token
+
+    def get_claims_user(self, validated_token):
+        """Return a ClaimsUser, or None when the claims cannot be trusted."""
+        if "user_type" not in validated_token:
+            return None
+        user = ClaimsUser(validated_token)
+        return self.check_claims(user, get_user_state(user.id))
+
+    def check_claims(self, user, state):
+        """Match a ClaimsUser against the user's current state."""
+        if state is None:
+            raise AuthenticationFailed(
+                "Utilisateur introuvable.", code="user_not_found"
+            )
+        is_active, user_type, library_id = state
+        if not is_active:
+            raise AuthenticationFailed("Compte désactivé.", code="user_inactive")
+        if (user_type, library_id) != (user.user_type, user.library_id):
+            return None
+        return user
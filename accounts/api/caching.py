@@ -0,0 +1,126 @@
+"""
+Versioned response caching and conditional GET for API views.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+from accounts import cache_versions
+
+CACHE_PREFIX = "accounts:api"
+
+
+class VersionedCacheMixin:
+    """
+    Serve GET responses from the cache, keyed on cache version scopes.
+
+    The ETag and Last-Modified headers are derived from the versions only, so
+    a matching ``If-None-Match`` / ``If-Modified-Since`` gets a 304 without
+    touching the database. Bumping any scope's version (see
+    ``accounts.cache_versions``) invalidates every cached variant.
+    """
+
+    def get_cache_scopes(self, request):
+        """Return the version scopes the response depends on."""
+        raise NotImplementedError
+
+    def cached_response(self, request, build_response):
+        scopes = self.get_cache_scopes(request)
+        version = combine_versions(
+            [cache_versions.get_version(scope) for scope in scopes]
+        )
+        etag, cache_key = cache_identity(request, scopes, version)
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=version.modified
+        )
+        if not_modified is not None:
+            return self._set_validators(not_modified, etag, version)
+
+        data = cache.get(cache_key)
+        if data is None:
+            response = build_response()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(cache_key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+        return self._set_validators(Response(data), etag, version)
+
+    def _set_validators(self, response, etag, version):
+        return set_validators(response, etag, version)
+
+
+def combine_versions(versions):
+    """Fold the versions of several scopes into a single version."""
+    return cache_versions.Version(
+        hashlib.sha1(
+            "".join(v.token for v in versions).encode(), usedforsecurity=False
+        ).hexdigest(),
+        max(v.modified for v in versions),
+    )
+
+
+def cache_identity(request, scopes, version):
+    """Return the ETag and the cache key of a request at a given version."""
+    path_digest = hashlib.sha1(
+        request.get_full_path().encode(), usedforsecurity=False
+    ).hexdigest()
+    etag = quote_etag(f"{version.token[:24]}-{path_digest[:16]}")
+    cache_key = f"{CACHE_PREFIX}:{','.join(scopes)}:{version.token}:{path_digest}"
+    return etag, cache_key
+
+
+def set_validators(response, etag, version):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(version.modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+async def acached_json(request, scopes, build_data):
+    """
+    Async counterpart of ``VersionedCacheMixin.cached_response`` for native
+    async views. ``build_data`` is awaited on a cache miss and returns
+    ``(status_code, data)``; only 200 responses are cached. Cache entries are
+    shared with the DRF views.
+    """
+    version = combine_versions(
+        [await cache_versions.aget_version(scope) for scope in scopes]
+    )
+    etag, cache_key = cache_identity(request, scopes, version)
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=version.modified
+    )
+    if not_modified is not None:
+        return set_validators(not_modified, etag, version)
+
+    data = await cache.aget(cache_key)
+    if data is None:
+        status_code, data = await build_data()
+        if status_code != status.HTTP_200_OK:
+            return json_response(data, status_code)
+        await cache.aset(cache_key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+    return set_validators(json_response(data), etag, version)
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """Render ``data`` as compact UTF-8 JSON, like DRF's JSONRenderer."""
+    return JsonResponse(
+        data,
+        status=status_code,
+        safe=False,
+        encoder=encoders.JSONEncoder,
+        json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+    )
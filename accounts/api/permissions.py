@@ -0,0 +1,19 @@
+"""
+API permissions for the accounts application.
+"""
+
+from rest_framework.permissions import BasePermission
+
+
+class IsLibraryStaff(BasePermission):
+    """Allow access to library staff and superadmins only."""
+
+    message = "Accès réservé au personnel de médiathèque."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(
+            user
+            and user.is_authenticated
+            and (user.is_superadmin or user.is_library_staff)
+        )
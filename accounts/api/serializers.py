@@ -1,17 +1,24 @@
 """Serializers for the accounts API."""
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
 
 from rest_framework import serializers
 
 from accounts.models import Library, ReaderProfile, User
 
+from .tokens import BlacklistRefreshToken
+
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom JWT token serializer that includes user type in the token.
     """
 
+    token_class = BlacklistRefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
@@ -38,6 +45,15 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class BlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that checks and blacklists rotated refresh tokens
+    through the accounts token blacklist.
+    """
+
+    token_class = BlacklistRefreshToken
+
+
 class LibrarySerializer(serializers.ModelSerializer):
     """Serializer for Library model (public info)."""
 
@@ -180,9 +196,8 @@ class ReaderMeUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-# Placeholder serializers for future features
 class LoanSerializer(serializers.Serializer):
-    """Placeholder serializer for loans (to be implemented)."""
+    """Serializer for a reader's loan (fields loaded by loans.queries)."""
 
     id = serializers.IntegerField()
     document_title = serializers.CharField()
@@ -192,7 +207,7 @@ class LoanSerializer(serializers.Serializer):
 
 
 class ReservationSerializer(serializers.Serializer):
-    """Placeholder serializer for reservations (to be implemented)."""
+    """Serializer for a reader's reservation (see loans.reservations)."""
 
     id = serializers.IntegerField()
     document_title = serializers.CharField()
@@ -202,7 +217,7 @@ class ReservationSerializer(serializers.Serializer):
 
 
 class HistorySerializer(serializers.Serializer):
-    """Placeholder serializer for loan history (to be implemented)."""
+    """Serializer for an archived loan (see loans.archive)."""
 
     id = serializers.IntegerField()
     document_title = serializers.CharField()
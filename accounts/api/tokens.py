@@ -0,0 +1,39 @@
+"""
+JWT token classes for the accounts API.
+"""
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from django.utils.translation import gettext_lazy as _
+
+from accounts import blacklist
+
+
+class BlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token checked against the accounts token blacklist.
+
+    Replaces rest_framework_simplejwt.token_blacklist: no outstanding-token
+    row is written per issued token, and revoked jti values are looked up
+    behind an in-process Bloom filter (see accounts.blacklist).
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        if blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklist.add(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload["exp"]),
+        )
+
+    def outstand(self):
+        return None
@@ -8,7 +8,12 @@ from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
 
-from .views import CustomTokenObtainPairView, LibraryViewSet, ReaderMeViewSet
+from .views import (
+    CustomTokenObtainPairView,
+    LibraryViewSet,
+    ReaderMeViewSet,
+    StaffReaderViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"libraries", LibraryViewSet, basename="library")
@@ -60,6 +65,25 @@ urlpatterns = [
         ),
         name="reader-me-history",
     ),
+    path(
+        "readers/me/dashboard/",
+        ReaderMeViewSet.as_view(
+            {
+                "get": "dashboard",
+            }
+        ),
+        name="reader-me-dashboard",
+    ),
+    # Staff endpoints
+    path(
+        "readers/by-card/<str:card_number>/",
+        StaffReaderViewSet.as_view(
+            {
+                "get": "by_card",
+            }
+        ),
+        name="reader-by-card",
+    ),
     # Router URLs (libraries)
     path("", include(router.urls)),
 ]
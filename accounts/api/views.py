@@ -2,23 +2,59 @@
 API views for the accounts application.
 """
 
+from functools import partial
+
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from django.http import Http404
+from django.urls import reverse
+
 from rest_framework import status, viewsets
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
+from accounts import cache_versions
+from accounts.cards import lookup_card
 from accounts.models import Library, ReaderProfile
+from accounts.pagination import CursorPaginator, InvalidCursor
+from loans.archive import HISTORY_ORDERING, reader_history
+from loans.queries import LOAN_ORDERING, current_loans
+from loans.reservations import reader_reservations
 
+from .authentication import ClaimsJWTAuthentication
+from .caching import VersionedCacheMixin
+from .permissions import IsLibraryStaff
 from .serializers import (
     CustomTokenObtainPairSerializer,
+    HistorySerializer,
     LibrarySerializer,
+    LoanSerializer,
     ReaderMeSerializer,
     ReaderMeUpdateSerializer,
+    ReaderProfileSerializer,
+    ReservationSerializer,
 )
 
 
+def serialize_page(page, serializer_class, url, cursor_query_param="cursor"):
+    """Serialize a cursor page with next/previous links built on ``url``."""
+
+    def link(cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(url, cursor_query_param, cursor)
+
+    return {
+        "next": link(page.next_cursor),
+        "previous": link(page.previous_cursor),
+        "results": serializer_class(page.object_list, many=True).data,
+    }
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom JWT token view that returns additional user information.
@@ -27,32 +63,90 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
-class LibraryViewSet(viewsets.ReadOnlyModelViewSet):
+class LibraryViewSet(VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for viewing libraries.
 
     list: List all active libraries
     retrieve: Get details of a specific library
+
+    Responses are cached and revalidated (ETag / Last-Modified) against the
+    library-set version, bumped on any Library save or delete.
     """
 
     queryset = Library.objects.filter(is_active=True)
     serializer_class = LibrarySerializer
     permission_classes = [AllowAny]
 
+    def get_cache_scopes(self, request):
+        return [cache_versions.LIBRARIES_SCOPE]
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs)
+        )
+
+
+class StaffReaderViewSet(viewsets.ViewSet):
+    """
+    API endpoint for library staff working on readers.
+
+    Provides endpoints for:
+    - GET /readers/by-card/<card_number>/ - Reader lookup from a card scan
+    """
+
+    permission_classes = [IsLibraryStaff]
+
+    def get_queryset(self, request):
+        qs = ReaderProfile.objects.select_related("user", "user__library")
+        user = request.user
+        if not user.is_superadmin:
+            # Staff without a library resolve no card at all
+            qs = qs.filter(user__library_id=user.library_id or 0)
+        return qs
+
+    def by_card(self, request, card_number=None):
+        """GET /readers/by-card/<card_number>/ - Resolve a scanned card."""
+        entry = lookup_card(card_number)
+        if entry is None:
+            raise Http404
+        profile = self.get_queryset(request).filter(pk=entry["pk"]).first()
+        if profile is None:
+            raise Http404
+        return Response(ReaderProfileSerializer(profile).data)
+
 
-class ReaderMeViewSet(viewsets.ViewSet):
+class ReaderMeViewSet(VersionedCacheMixin, viewsets.ViewSet):
     """
     API endpoint for the authenticated reader's own data.
 
+    The profile representation is cached per reader and revalidated with
+    ETag / Last-Modified. Its version is bumped whenever the reader's
+    User, ReaderProfile or Library changes.
+
+    Read requests are authenticated from the JWT claims (see
+    ClaimsJWTAuthentication), so a cached poll does not touch the database.
+
     Provides endpoints for:
     - GET /readers/me/ - Reader's profile
     - PATCH /readers/me/ - Update profile (limited fields)
-    - GET /readers/me/loans/ - Current loans (placeholder)
-    - GET /readers/me/reservations/ - Current reservations (placeholder)
-    - GET /readers/me/history/ - Loan history (placeholder)
+    - GET /readers/me/loans/ - Current loans (cursor-paginated)
+    - GET /readers/me/reservations/ - Current reservations with queue positions
+    - GET /readers/me/history/ - Archived loan history (cursor-paginated)
+    - GET /readers/me/dashboard/ - All of the above in one response
     """
 
+    authentication_classes = [ClaimsJWTAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated]
+    page_size = 50
+    cursor_query_param = "cursor"
+    dashboard_sections = ("profile", "loans", "reservations", "history")
+    dashboard_history_size = 10
 
     def get_reader_profile(self, request):
         """Get the authenticated reader's profile or return None."""
@@ -64,8 +158,18 @@ class ReaderMeViewSet(viewsets.ViewSet):
         except ReaderProfile.DoesNotExist:
             return None
 
+    def get_cache_scopes(self, request):
+        user = request.user
+        return [
+            cache_versions.reader_scope(user.pk),
+            cache_versions.library_scope(user.library_id),
+        ]
+
     def list(self, request):
         """GET /readers/me/ - Returns the authenticated reader's profile."""
+        return self.cached_response(request, partial(self._profile_response, request))
+
+    def _profile_response(self, request):
         profile = self.get_reader_profile(request)
         if not profile:
             return Response(
@@ -89,13 +193,50 @@ class ReaderMeViewSet(viewsets.ViewSet):
             return Response(ReaderMeSerializer(profile).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def paginated_response(self, request, queryset, ordering, serializer_class):
+        """Respond with one cursor page of ``queryset`` (?cursor=...)."""
+        return Response(
+            self.paginate(
+                request,
+                queryset,
+                ordering,
+                serializer_class,
+                cursor=request.query_params.get(self.cursor_query_param),
+            )
+        )
+
+    def paginate(
+        self,
+        request,
+        queryset,
+        ordering,
+        serializer_class,
+        cursor=None,
+        url=None,
+        page_size=None,
+    ):
+        """
+        Serialize one cursor page of ``queryset`` with next/previous links
+        built on ``url`` (defaults to the current request).
+        """
+        paginator = CursorPaginator(queryset, page_size or self.page_size, ordering)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor as exc:
+            raise NotFound("Curseur de pagination invalide.") from exc
+        return serialize_page(
+            page,
+            serializer_class,
+            url or request.build_absolute_uri(),
+            self.cursor_query_param,
+        )
+
     @action(detail=False, methods=["get"])
     def loans(self, request):
         """
         GET /readers/me/loans/ - Returns the reader's current loans.
 
-        Note: This is a placeholder that returns an empty list.
-        Will be implemented when the loans module is created.
+        Pages are read with a keyset cursor (?cursor=...) in one query.
         """
         profile = self.get_reader_profile(request)
         if not profile:
@@ -103,17 +244,17 @@ class ReaderMeViewSet(viewsets.ViewSet):
                 {"detail": "Vous n'êtes pas un lecteur ou votre profil n'existe pas."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        # Placeholder: return empty list
-        # TODO: Implement when loans module is created
-        return Response({"count": 0, "results": []})
+        return self.paginated_response(
+            request, current_loans(profile.pk), LOAN_ORDERING, LoanSerializer
+        )
 
     @action(detail=False, methods=["get"])
     def reservations(self, request):
         """
         GET /readers/me/reservations/ - Returns the reader's current reservations.
 
-        Note: This is a placeholder that returns an empty list.
-        Will be implemented when the reservations module is created.
+        Every hold carries its position in the document's queue, all computed
+        in a single query.
         """
         profile = self.get_reader_profile(request)
         if not profile:
@@ -121,24 +262,80 @@ class ReaderMeViewSet(viewsets.ViewSet):
                 {"detail": "Vous n'êtes pas un lecteur ou votre profil n'existe pas."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        # Placeholder: return empty list
-        # TODO: Implement when reservations module is created
-        return Response({"count": 0, "results": []})
+        results = ReservationSerializer(reader_reservations(profile.pk), many=True).data
+        return Response({"count": len(results), "results": results})
 
     @action(detail=False, methods=["get"])
     def history(self, request):
         """
         GET /readers/me/history/ - Returns the reader's loan history.
 
-        Note: This is a placeholder that returns an empty list.
-        Will be implemented when the loans module is created.
+        Reads the archive table (most recent first) with a keyset cursor.
+        """
+        profile = self.get_reader_profile(request)
+        if not profile:
+            return Response(
+                {"detail": "Vous n'êtes pas un lecteur ou votre profil n'existe pas."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return self.paginated_response(
+            request, reader_history(profile.pk), HISTORY_ORDERING, HistorySerializer
+        )
+
+    @action(detail=False, methods=["get"])
+    def dashboard(self, request):
+        """
+        GET /readers/me/dashboard/ - Profile, current loans, reservations and
+        recent history in one response.
+
+        ``?include=loans,reservations`` picks the sections (default: all).
+        Each section costs one query; the page links of the loans and
+        history sections point to their own endpoints.
         """
+        sections = self.parse_dashboard_sections(request.query_params.get("include"))
         profile = self.get_reader_profile(request)
         if not profile:
             return Response(
                 {"detail": "Vous n'êtes pas un lecteur ou votre profil n'existe pas."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        # Placeholder: return empty list
-        # TODO: Implement when loans module is created
-        return Response({"count": 0, "results": []})
+
+        data = {}
+        if "profile" in sections:
+            data["profile"] = ReaderMeSerializer(profile).data
+        if "loans" in sections:
+            data["loans"] = self.paginate(
+                request,
+                current_loans(profile.pk),
+                LOAN_ORDERING,
+                LoanSerializer,
+                url=request.build_absolute_uri(reverse("reader-me-loans")),
+            )
+        if "reservations" in sections:
+            data["reservations"] = ReservationSerializer(
+                reader_reservations(profile.pk), many=True
+            ).data
+        if "history" in sections:
+            data["history"] = self.paginate(
+                request,
+                reader_history(profile.pk),
+                HISTORY_ORDERING,
+                HistorySerializer,
+                url=request.build_absolute_uri(reverse("reader-me-history")),
+                page_size=self.dashboard_history_size,
+            )
+        return Response(data)
+
+    @classmethod
+    def parse_dashboard_sections(cls, include):
+        """Parse ``?include=``; unknown sections are a validation error."""
+        if not include:
+            return set(cls.dashboard_sections)
+        sections = {name.strip() for name in include.split(",") if name.strip()}
+        unknown = sections.difference(cls.dashboard_sections)
+        if unknown:
+            message = "Sections inconnues : {}. Valeurs possibles : {}.".format(
+                ", ".join(sorted(unknown)), ", ".join(cls.dashboard_sections)
+            )
+            raise ValidationError({"include": message})
+        return sections
@@ -0,0 +1,29 @@
+"""
+Backend d'authentification de l'application accounts.
+
+L'utilisateur d'une requête authentifiée est chargé avec sa médiathèque et son
+profil lecteur en une seule requête : les vues, mixins de permission et
+gabarits qui lisent ``user.library`` ou ``user.reader_profile`` ne
+déclenchent plus de requêtes paresseuses. La mémorisation par requête est
+celle de Django (``request._cached_user`` posé par ``AuthenticationMiddleware``)
+et de DRF (``Request.user``).
+"""
+
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+
+def identity_queryset():
+    """Utilisateurs avec médiathèque et profil lecteur préchargés."""
+    return User.objects.select_related("library", "reader_profile")
+
+
+class IdentityBackend(ModelBackend):
+    """``ModelBackend`` dont ``get_user`` charge l'identité complète."""
+
+    def get_user(self, user_id):
+        user = identity_queryset().filter(pk=user_id).first()
+        if user is not None and self.user_can_authenticate(user):
+            return user
+        return None
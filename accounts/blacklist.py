@@ -0,0 +1,163 @@
+"""
+Liste noire des jetons de rafraîchissement.
+
+Les ``jti`` révoqués sont stockés dans ``BlacklistedToken`` (index unique sur
+``jti``). Chaque processus garde devant cette table un filtre de Bloom : un
+``jti`` absent du filtre n'est pas révoqué et aucune requête n'est faite ; un
+``jti`` présent est confirmé par la table (faux positifs). Le filtre est
+complété avec les révocations des autres processus au plus toutes les
+``TOKEN_BLACKLIST_SYNC_INTERVAL`` secondes (lecture des lignes au-delà de la
+dernière clé primaire vue) et reconstruit après
+``TOKEN_BLACKLIST_BLOOM_MAX_AGE`` secondes pour oublier les jetons purgés.
+
+Le filtre est dimensionné d'après le nombre de jetons révoqués non expirés
+(le double, pour laisser de la place aux révocations suivantes). Seul le
+premier chargement se fait dans la requête ; les reconstructions tournent
+dans un thread, une seule à la fois, et l'ancien filtre reste utilisé jusqu'à
+son remplacement.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import BlacklistedToken
+
+_state = {"filter": None, "last_pk": 0, "loaded_at": 0.0, "synced_at": 0.0}
+_lock = threading.Lock()
+# Tenu pendant une reconstruction du filtre : une seule à la fois
+_rebuild_lock = threading.Lock()
+
+
+class BloomFilter:
+    """Filtre de Bloom sur des chaînes, dimensionné pour une capacité donnée."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hachage : h1 + i * h2 sur un seul condensé
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+def _build():
+    """Construit un filtre des jetons non expirés ; retourne ``(filtre, last_pk)``."""
+    rows = BlacklistedToken.objects.filter(expires_at__gt=timezone.now())
+    bloom = BloomFilter(
+        max(2 * rows.count(), settings.TOKEN_BLACKLIST_BLOOM_MIN_CAPACITY),
+        settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE,
+    )
+    last_pk = 0
+    for pk, jti in rows.values_list("pk", "jti").iterator(chunk_size=10000):
+        bloom.add(jti)
+        last_pk = max(last_pk, pk)
+    return bloom, last_pk
+
+
+def _install(bloom, last_pk):
+    # Appelé sous ``_lock`` ; rattrape les révocations écrites entre-temps
+    now = time.monotonic()
+    _state.update(filter=bloom, last_pk=last_pk, loaded_at=now)
+    _catch_up(now)
+
+
+def _catch_up(now):
+    rows = BlacklistedToken.objects.filter(pk__gt=_state["last_pk"])
+    for pk, jti in rows.order_by("pk").values_list("pk", "jti"):
+        _state["filter"].add(jti)
+        _state["last_pk"] = pk
+    _state["synced_at"] = now
+
+
+def _rebuild():
+    try:
+        bloom, last_pk = _build()
+        with _lock:
+            _install(bloom, last_pk)
+    finally:
+        # Connexion propre au thread de reconstruction
+        connection.close()
+        _rebuild_lock.release()
+
+
+def _start_rebuild():
+    if not _rebuild_lock.acquire(blocking=False):
+        return False
+    try:
+        threading.Thread(
+            target=_rebuild, name="token-blacklist-bloom", daemon=True
+        ).start()
+    except BaseException:
+        _rebuild_lock.release()
+        raise
+    return True
+
+
+def _sync():
+    now = time.monotonic()
+    if _state["filter"] is None:
+        _install(*_build())
+        return
+    if now - _state["loaded_at"] > settings.TOKEN_BLACKLIST_BLOOM_MAX_AGE:
+        _start_rebuild()
+    if now - _state["synced_at"] >= settings.TOKEN_BLACKLIST_SYNC_INTERVAL:
+        _catch_up(now)
+
+
+def is_blacklisted(jti):
+    """Indique si un ``jti`` a été révoqué."""
+    with _lock:
+        _sync()
+        if jti not in _state["filter"]:
+            return False
+    return BlacklistedToken.objects.filter(jti=jti).exists()
+
+
+def add(jti, expires_at):
+    """Révoque un ``jti`` jusqu'à son expiration."""
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True
+    )
+    with _lock:
+        if _state["filter"] is not None:
+            _state["filter"].add(jti)
+
+
+def prune(batch_size=5000):
+    """Supprime les jetons expirés par lots ; retourne le nombre supprimé."""
+    expired = BlacklistedToken.objects.filter(expires_at__lte=timezone.now())
+    deleted = 0
+    while True:
+        pks = list(
+            expired.order_by("expires_at").values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+        deleted += BlacklistedToken.objects.filter(pk__in=pks).delete()[0]
+
+
+def clear():
+    """Oublie le filtre du processus (rechargé à la prochaine vérification)."""
+    with _lock:
+        _state.update(filter=None, last_pk=0, loaded_at=0.0, synced_at=0.0)
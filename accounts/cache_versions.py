@@ -0,0 +1,65 @@
+"""
+Versions de cache par portée (« libraries », « reader:42 », etc.).
+
+Une version est un jeton aléatoire accompagné de sa date de création. Les
+entrées de cache incluent le jeton dans leur clé : changer de version les rend
+toutes obsolètes d'un coup, sans avoir à les énumérer. La date sert d'en-tête
+``Last-Modified`` pour les réponses conditionnelles de l'API.
+"""
+
+import time
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+
+CACHE_PREFIX = "accounts:version"
+
+# Ensemble des médiathèques (API publique)
+LIBRARIES_SCOPE = "libraries"
+
+
+def library_scope(library_id):
+    """Une médiathèque donnée."""
+    return f"library:{library_id}"
+
+
+def reader_scope(user_id):
+    """Les données d'un lecteur (utilisateur et profil)."""
+    return f"reader:{user_id}"
+
+
+Version = namedtuple("Version", ["token", "modified"])
+
+
+def _version_key(scope):
+    return f"{CACHE_PREFIX}:{scope}"
+
+
+def _new_version():
+    return Version(uuid.uuid4().hex, int(time.time()))
+
+
+def get_version(scope):
+    """Version courante d'une portée (créée au premier accès)."""
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key) or _new_version()
+    return Version(*version)
+
+
+async def aget_version(scope):
+    """Variante asynchrone de ``get_version``."""
+    key = _version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_version(), timeout=None)
+        version = await cache.aget(key) or _new_version()
+    return Version(*version)
+
+
+def bump(scope):
+    """Rend obsolètes toutes les entrées mises en cache pour une portée."""
+    cache.set(_version_key(scope), _new_version(), timeout=None)
@@ -0,0 +1,150 @@
+"""
+Numéros de carte : attribution et résolution vers un lecteur.
+
+Attribution : chaque médiathèque a un compteur (``CardSequence``) incrémenté
+par un ``UPDATE`` atomique ; le numéro est ``<CODE>-<valeur sur 6 chiffres
+ou plus><chiffre de contrôle Luhn>``, unique sans vérification d'existence :
+ces numéros sont réservés à l'attribution automatique et refusés à la saisie
+manuelle (``ReaderProfile.clean``) comme à l'import
+(``is_reserved_card_number``).
+Hors transaction, chaque processus peut réserver des blocs de
+``CARD_NUMBER_BLOCK_SIZE`` valeurs pour n'écrire qu'une fois par bloc.
+
+Résolution (scan de code-barres) : la recherche passe par l'index unique de
+``card_number`` ; le résultat (clé primaire et médiathèque) est gardé dans le
+cache pour les scans répétés au guichet et invalidé à chaque sauvegarde ou
+suppression du profil.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CardSequence, ReaderProfile
+
+CACHE_PREFIX = "accounts:card"
+
+# library_id -> [prochaine valeur, fin du bloc (exclue)]
+_blocks = {}
+_blocks_lock = threading.Lock()
+
+
+def luhn_check_digit(digits):
+    """Chiffre de contrôle Luhn (mod 10) d'une suite de chiffres."""
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def format_card_number(library_code, value):
+    """Numéro de carte de la valeur ``value`` d'une médiathèque."""
+    digits = f"{value:06d}"
+    return f"{library_code.upper()}-{digits}{luhn_check_digit(digits)}"
+
+
+def has_valid_check_digit(card_number):
+    """Vérifie le chiffre de contrôle d'un numéro attribué automatiquement."""
+    digits = normalize_card_number(card_number).rpartition("-")[2]
+    if len(digits) < 2 or not digits.isdigit():
+        return False
+    return luhn_check_digit(digits[:-1]) == digits[-1]
+
+
+def is_reserved_card_number(card_number):
+    """
+    Indique si un numéro appartient à l'espace des numéros attribués
+    automatiquement (``<CODE>-`` suivi d'au moins 7 chiffres dont le dernier
+    est un chiffre de contrôle valide).
+    """
+    code, _sep, digits = normalize_card_number(card_number).rpartition("-")
+    return bool(code) and len(digits) >= 7 and has_valid_check_digit(card_number)
+
+
+def reserve_card_values(library, count=1):
+    """
+    Réserve ``count`` valeurs consécutives du compteur d'une médiathèque et
+    retourne la première. L'``UPDATE`` verrouille la ligne jusqu'à la fin de
+    la transaction : deux inscriptions simultanées obtiennent des valeurs
+    distinctes.
+    """
+    sequences = CardSequence.objects.filter(library=library)
+    with transaction.atomic():
+        if not sequences.update(next_value=F("next_value") + count):
+            try:
+                with transaction.atomic():
+                    CardSequence.objects.create(library=library, next_value=1 + count)
+                return 1
+            except IntegrityError:
+                # Créée entre-temps par une autre inscription
+                sequences.update(next_value=F("next_value") + count)
+        return sequences.values_list("next_value", flat=True).get() - count
+
+
+def next_card_number(library):
+    """
+    Attribue un numéro de carte unique. Hors transaction, la valeur vient
+    du bloc réservé par le processus ; dans une transaction, elle est
+    réservée seule (un bloc annulé avec la transaction serait réattribué).
+    """
+    block_size = settings.CARD_NUMBER_BLOCK_SIZE
+    if block_size <= 1 or transaction.get_connection().in_atomic_block:
+        return format_card_number(library.code, reserve_card_values(library))
+    with _blocks_lock:
+        block = _blocks.get(library.pk)
+        if block is None or block[0] >= block[1]:
+            start = reserve_card_values(library, block_size)
+            block = _blocks[library.pk] = [start, start + block_size]
+        value = block[0]
+        block[0] += 1
+    return format_card_number(library.code, value)
+
+
+def normalize_card_number(card_number):
+    """Les numéros de carte sont stockés en majuscules."""
+    return (card_number or "").strip().upper()
+
+
+def card_cache_key(card_number):
+    return f"{CACHE_PREFIX}:{normalize_card_number(card_number)}"
+
+
+def lookup_card(card_number):
+    """
+    Retourne ``{"pk": ..., "library_id": ...}`` pour un numéro de carte,
+    ou ``None`` si aucun lecteur ne la porte.
+    """
+    card_number = normalize_card_number(card_number)
+    if not card_number:
+        return None
+    key = card_cache_key(card_number)
+    entry = cache.get(key)
+    if entry is None:
+        row = (
+            ReaderProfile.objects.filter(card_number=card_number)
+            .values_list("pk", "user__library_id")
+            .first()
+        )
+        if row is None:
+            return None
+        entry = {"pk": row[0], "library_id": row[1]}
+        cache.set(key, entry, timeout=settings.CARD_LOOKUP_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_card(card_number):
+    cache.delete(card_cache_key(card_number))
+
+
+def clear_card_blocks():
+    """Abandonne les blocs de valeurs réservés par le processus."""
+    with _blocks_lock:
+        _blocks.clear()
@@ -0,0 +1,65 @@
+"""
+Fournisseur de comptages pour les listes et statistiques de lecteurs.
+
+En dessous de ``COUNT_EXACT_THRESHOLD`` le comptage est exact et borné
+(``COUNT(*)`` sur une sous-requête limitée). Au-delà, la valeur est calculée
+une fois puis servie depuis le cache jusqu'à invalidation (création ou
+suppression d'un lecteur) ou expiration de ``COUNT_CACHE_TIMEOUT``.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import cache_versions
+from .models import User
+
+CACHE_PREFIX = "accounts:count"
+
+
+def reader_scope(library_id=None):
+    """Portée des comptages de lecteurs d'une médiathèque (ou du réseau)."""
+    return f"readers:{library_id or 'all'}"
+
+
+def invalidate_reader_counts(library_id=None):
+    """Invalide les comptages de lecteurs d'une médiathèque et du réseau."""
+    cache_versions.bump(reader_scope())
+    if library_id:
+        cache_versions.bump(reader_scope(library_id))
+
+
+def count_queryset(queryset, scope, *key_parts):
+    """
+    Compte un queryset : exact jusqu'au seuil, mis en cache au-delà.
+    ``key_parts`` distingue les variantes d'une même portée (recherche, etc.).
+    """
+    threshold = settings.COUNT_EXACT_THRESHOLD
+    digest = hashlib.sha1(
+        "\x1f".join(str(part) for part in key_parts).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    version = cache_versions.get_version(scope)
+    cache_key = f"{CACHE_PREFIX}:{scope}:{version.token}:{digest}"
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    bounded = queryset[: threshold + 1].count()
+    if bounded <= threshold:
+        return bounded
+
+    total = queryset.count()
+    cache.set(cache_key, total, timeout=settings.COUNT_CACHE_TIMEOUT)
+    return total
+
+
+def count_library_readers(library):
+    """Nombre de lecteurs rattachés à une médiathèque."""
+    return count_queryset(
+        library.users.filter(user_type=User.UserType.READER),
+        reader_scope(library.pk),
+        "library_readers",
+    )
@@ -0,0 +1,99 @@
+"""
+Export des lecteurs d'une médiathèque en CSV ou JSON Lines.
+
+Les lignes sont lues par ``.values()`` (pas d'instances de modèle) avec
+``.iterator(chunk_size=...)`` et sérialisées au fil de l'eau : la mémoire
+reste constante quel que soit le nombre de lecteurs et l'en-tête est émis
+avant la première requête. Les colonnes CSV reprennent celles de
+l'import (``accounts.importers``).
+
+Les valeurs texte du CSV qui commencent comme une formule (``=``, ``+``,
+``-``, ``@``, tabulation, retour chariot) sont préfixées d'une apostrophe :
+saisies par les lecteurs à l'inscription, elles ne doivent pas être
+évaluées par le tableur qui ouvre l'export. L'import retire ce préfixe.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import ReaderProfile
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Colonne exportée -> champ lu
+EXPORT_FIELDS = {
+    "username": "user__username",
+    "card_number": "card_number",
+    "first_name": "user__first_name",
+    "last_name": "user__last_name",
+    "email": "user__email",
+    "category": "category",
+    "birth_date": "birth_date",
+    "address": "address",
+    "postal_code": "postal_code",
+    "city": "city",
+    "phone": "phone",
+    "gdpr_consent": "gdpr_consent",
+    "newsletter_consent": "newsletter_consent",
+    "is_active": "is_active",
+    "is_blocked": "is_blocked",
+    "created_at": "created_at",
+}
+
+
+# Premiers caractères interprétés comme une formule par les tableurs
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class _Echo:
+    """Pseudo-fichier : ``csv.writer`` retourne la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(library, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Itère sur les lecteurs d'une médiathèque, un dictionnaire par lecteur."""
+    rows = (
+        ReaderProfile.objects.filter(user__library=library)
+        .order_by("pk")
+        .values_list(*EXPORT_FIELDS.values())
+    )
+    columns = list(EXPORT_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(columns, row))
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return int(value)
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def iter_csv(rows):
+    """Sérialise des lignes en CSV (en-tête compris), une chaîne par ligne."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row.values()])
+
+
+def iter_jsonl(rows):
+    """Sérialise des lignes en JSON Lines, une chaîne par ligne."""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+# Format -> (sérialiseur, type MIME, extension)
+FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8", "csv"),
+    "jsonl": (iter_jsonl, "application/x-ndjson; charset=utf-8", "jsonl"),
+}
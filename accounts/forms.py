@@ -1,9 +1,33 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
+from django.template.defaultfilters import filesizeformat
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .cards import next_card_number
 from .models import Library, ReaderProfile, User
+from .normalization import normalize_name
+
+DUPLICATE_READER_ERROR = _(
+    "Un lecteur portant ce nom et cette date de naissance est déjà inscrit "
+    "dans cette médiathèque."
+)
+
+
+def reader_duplicate_exists(first_name, last_name, birth_date, library):
+    """
+    Indique si un lecteur de même nom, prénom (normalisés) et date de naissance
+    existe déjà dans la médiathèque.
+    """
+    if not (birth_date and library):
+        return False
+    return ReaderProfile.objects.filter(
+        user__normalized_last_name=normalize_name(last_name),
+        user__normalized_first_name=normalize_name(first_name),
+        user__library=library,
+        birth_date=birth_date,
+    ).exists()
 
 
 class LoginForm(AuthenticationForm):
@@ -80,6 +104,12 @@ class ReaderCreationForm(forms.ModelForm):
         label=_("Nom"),
     )
 
+    # Homonyme : le personnel confirme qu'il s'agit d'une autre personne
+    confirm_duplicate = forms.BooleanField(
+        label=_("Il s'agit d'une autre personne (homonyme)"),
+        required=False,
+    )
+
     # Envoi du mot de passe par email
     send_password_email = forms.BooleanField(
         label=_("Envoyer le mot de passe par email"),
@@ -106,6 +136,20 @@ class ReaderCreationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.library = library
         self._generated_password = None
+        self.duplicate_found = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Un lecteur déjà inscrit n'est créé qu'après confirmation
+        if not cleaned_data.get("confirm_duplicate") and reader_duplicate_exists(
+            cleaned_data.get("first_name"),
+            cleaned_data.get("last_name"),
+            cleaned_data.get("birth_date"),
+            self.library,
+        ):
+            self.duplicate_found = True
+            raise forms.ValidationError(DUPLICATE_READER_ERROR)
+        return cleaned_data
 
     def clean_username(self):
         username = self.cleaned_data.get("username")
@@ -160,6 +204,30 @@ class ReaderCreationForm(forms.ModelForm):
         return self._generated_password
 
 
+class ReaderImportForm(forms.Form):
+    """Formulaire d'import de lecteurs depuis un fichier CSV."""
+
+    file = forms.FileField(
+        label=_("Fichier CSV"),
+        help_text=_(
+            "En-tête obligatoire : username, card_number, first_name, last_name ; "
+            "séparateur virgule ou point-virgule, encodage UTF-8."
+        ),
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if upload.size > settings.READER_IMPORT_MAX_UPLOAD_SIZE:
+            raise forms.ValidationError(
+                _(
+                    "Fichier trop volumineux pour un import depuis l'interface "
+                    "(%(max)s au plus) : utiliser la commande import_readers."
+                ),
+                params={"max": filesizeformat(settings.READER_IMPORT_MAX_UPLOAD_SIZE)},
+            )
+        return upload
+
+
 class ReaderUpdateForm(forms.ModelForm):
     """Formulaire de mise à jour d'un lecteur (sans modification du mot de passe)."""
 
@@ -401,16 +469,6 @@ class ReaderRegistrationForm(forms.Form):
             )
         return consent
 
-    def _generate_card_number(self, library):
-        """Génère un numéro de carte unique pour la médiathèque."""
-        import random
-
-        prefix = library.code.upper()
-        while True:
-            number = f"{prefix}-{random.randint(100000, 999999)}"
-            if not ReaderProfile.objects.filter(card_number=number).exists():
-                return number
-
     def save(self):
         """Crée l'utilisateur et le profil lecteur."""
         library = self.cleaned_data["library"]
@@ -429,7 +487,7 @@ class ReaderRegistrationForm(forms.Form):
         # Créer le profil lecteur
         profile = ReaderProfile.objects.create(
             user=user,
-            card_number=self._generate_card_number(library),
+            card_number=next_card_number(library),
             category=self.cleaned_data["category"],
             birth_date=self.cleaned_data.get("birth_date"),
             phone=self.cleaned_data.get("phone", ""),
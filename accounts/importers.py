@@ -0,0 +1,326 @@
+"""
+Import en masse de lecteurs depuis un fichier CSV.
+
+Le fichier est lu ligne à ligne et traité par lots : chaque ligne est
+validée contre les noms d'utilisateur et numéros de carte existants
+(préchargés une fois dans des ensembles), les mots de passe fournis sont
+hachés dans un pool de processus, puis les ``User`` et ``ReaderProfile`` du
+lot sont écrits par ``bulk_create`` dans une transaction. Les structures
+dérivées que les signaux tiennent à jour d'ordinaire (index de recherche,
+statistiques, comptages, autocomplétion) sont mises à jour par lot.
+
+Colonnes reconnues (en-tête obligatoire, séparateur ``,`` ou ``;``) :
+``username``, ``card_number``, ``first_name``, ``last_name`` (obligatoires),
+``email``, ``password``, ``category``, ``birth_date`` (AAAA-MM-JJ),
+``address``, ``postal_code``, ``city``, ``phone``, ``gdpr_consent``,
+``newsletter_consent``. Sans mot de passe, le compte reçoit un mot de passe
+inutilisable : le lecteur passe par la réinitialisation.
+
+Une erreur d'encodage en cours de fichier arrête l'import : les lignes déjà
+lues restent importées et le bilan indique où la lecture s'est arrêtée.
+"""
+
+import csv
+import itertools
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+
+from . import counts, search, stats, typeahead
+from .cards import is_reserved_card_number
+from .exporters import FORMULA_PREFIXES
+from .forms import DUPLICATE_READER_ERROR
+from .models import RESERVED_CARD_NUMBER_ERROR, ReaderProfile, User
+from .normalization import normalize_name
+
+REQUIRED_COLUMNS = ("username", "card_number", "first_name", "last_name")
+TRUE_VALUES = {"1", "true", "yes", "oui", "o", "x"}
+
+_card_validator = ReaderProfile._meta.get_field("card_number").validators[0]
+_categories = {value for value, _label in ReaderProfile.CATEGORY_CHOICES}
+
+
+ENCODING_ERROR = "Le fichier doit être encodé en UTF-8."
+
+
+class RowError(ValueError):
+    """Ligne du fichier refusée."""
+
+
+class ImportReport:
+    """Bilan d'un import : lecteurs créés, lignes refusées, durée."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+        self.started_at = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+    @property
+    def rate(self):
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+def _is_true(value):
+    return value.strip().lower() in TRUE_VALUES
+
+
+def _unescape_cell(value):
+    # Préfixe anti-formule ajouté par l'export CSV
+    if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def open_csv(lines):
+    """Lecteur CSV d'un itérable de lignes (en-tête compris, séparateur détecté)."""
+    lines = iter(lines)
+    header = next(lines, "")
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    return csv.DictReader(itertools.chain([header], lines), dialect=dialect)
+
+
+def count_passwords(lines):
+    """Nombre de lignes qui fournissent un mot de passe à hacher."""
+    return sum(1 for row in open_csv(lines) if (row.get("password") or "").strip())
+
+
+class ReaderImporter:
+    """
+    Importe des lecteurs dans une médiathèque.
+    ``progress`` est appelé après chaque lot avec le bilan en cours.
+    """
+
+    def __init__(self, library, batch_size=1000, workers=None, progress=None):
+        self.library = library
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self._pool = None
+
+    def run(self, lines):
+        """Importe les lignes CSV (itérable de chaînes, en-tête compris)."""
+        report = ImportReport()
+        try:
+            reader = open_csv(lines)
+            fieldnames = reader.fieldnames or ()
+        except UnicodeDecodeError:
+            report.errors.append((1, ENCODING_ERROR))
+            return report
+        missing = set(REQUIRED_COLUMNS) - set(fieldnames)
+        if missing:
+            report.errors.append(
+                (1, f"Colonnes manquantes : {', '.join(sorted(missing))}.")
+            )
+            return report
+
+        self.usernames = set(User.objects.values_list("username", flat=True))
+        self.card_numbers = set(
+            ReaderProfile.objects.values_list("card_number", flat=True)
+        )
+        self.identities = set(
+            ReaderProfile.objects.filter(
+                user__library=self.library, birth_date__isnull=False
+            ).values_list(
+                "user__normalized_first_name",
+                "user__normalized_last_name",
+                "birth_date",
+            )
+        )
+        batch, stopped_at = [], None
+        try:
+            try:
+                for row in enumerate(reader, start=2):
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        self._import_batch(batch, report)
+                        batch = []
+            except UnicodeDecodeError:
+                stopped_at = reader.line_num + 1
+            # Dernier lot, y compris les lignes lues avant une erreur d'encodage
+            if batch:
+                self._import_batch(batch, report)
+            if stopped_at is not None:
+                report.errors.append(
+                    (
+                        stopped_at,
+                        f"{ENCODING_ERROR} Import interrompu à partir de cette "
+                        "ligne ; les lignes précédentes ont été traitées.",
+                    )
+                )
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        report.elapsed = time.monotonic() - report.started_at
+        return report
+
+    def _import_batch(self, batch, report):
+        self._write_batch(batch, report)
+        report.elapsed = time.monotonic() - report.started_at
+        if self.progress:
+            self.progress(report)
+
+    def _write_batch(self, batch, report):
+        accepted = []
+        for line_number, row in batch:
+            try:
+                accepted.append(self.clean_row(row))
+            except RowError as exc:
+                report.errors.append((line_number, str(exc)))
+        if not accepted:
+            return
+
+        passwords = self.hash_passwords(
+            [user_data.pop("password") for user_data, _profile_data in accepted]
+        )
+        now = timezone.now()
+        users = [
+            User(
+                **user_data,
+                password=password,
+                user_type=User.UserType.READER,
+                library=self.library,
+                normalized_first_name=normalize_name(user_data["first_name"]),
+                normalized_last_name=normalize_name(user_data["last_name"]),
+            )
+            for (user_data, _profile_data), password in zip(accepted, passwords)
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            profiles = ReaderProfile.objects.bulk_create(
+                ReaderProfile(
+                    **profile_data,
+                    user=user,
+                    gdpr_consent_date=now if profile_data["gdpr_consent"] else None,
+                )
+                for (_user_data, profile_data), user in zip(accepted, users)
+            )
+            self._update_derived(profiles)
+        report.created += len(profiles)
+
+    def _update_derived(self, profiles):
+        library_id = self.library.pk
+        search.index_readers([profile.pk for profile in profiles])
+        contribution = Counter()
+        for profile in profiles:
+            contribution += stats.user_contribution(library_id, User.UserType.READER)
+            contribution += stats.profile_contribution(
+                library_id, profile.is_active, profile.is_blocked
+            )
+        stats.apply_delta(Counter(), contribution)
+        counts.invalidate_reader_counts(library_id)
+        transaction.on_commit(lambda: typeahead.forget_library(library_id))
+
+    def clean_row(self, row):
+        """Valide une ligne ; retourne ``(données User, données ReaderProfile)``."""
+        values = {
+            key: _unescape_cell(value or "").strip()
+            for key, value in row.items()
+            if key
+        }
+        for column in REQUIRED_COLUMNS:
+            if not values.get(column):
+                raise RowError(f"Colonne « {column} » vide.")
+
+        username = values["username"]
+        if username in self.usernames:
+            raise RowError(f"Le nom d'utilisateur « {username} » existe déjà.")
+        card_number = values["card_number"].upper()
+        if card_number in self.card_numbers:
+            raise RowError(f"Le numéro de carte « {card_number} » existe déjà.")
+        try:
+            _card_validator(card_number)
+        except ValidationError:
+            raise RowError(f"Numéro de carte invalide : « {card_number} ».") from None
+        if is_reserved_card_number(card_number):
+            raise RowError(f"{RESERVED_CARD_NUMBER_ERROR} (« {card_number} »)")
+
+        email = values.get("email", "")
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                raise RowError(f"Email invalide : « {email} ».") from None
+
+        category = values.get("category") or "adult"
+        if category not in _categories:
+            raise RowError(f"Catégorie inconnue : « {category} ».")
+
+        birth_date = None
+        if values.get("birth_date"):
+            try:
+                birth_date = date.fromisoformat(values["birth_date"])
+            except ValueError:
+                raise RowError(
+                    f"Date de naissance invalide : « {values['birth_date']} »."
+                ) from None
+            identity = (
+                normalize_name(values["first_name"]),
+                normalize_name(values["last_name"]),
+                birth_date,
+            )
+            if identity in self.identities:
+                raise RowError(DUPLICATE_READER_ERROR)
+
+        if not _is_true(values.get("gdpr_consent", "")):
+            raise RowError("Le consentement RGPD est obligatoire.")
+
+        self.usernames.add(username)
+        self.card_numbers.add(card_number)
+        if birth_date:
+            self.identities.add(identity)
+        user_data = {
+            "username": username,
+            "email": email,
+            "first_name": values["first_name"],
+            "last_name": values["last_name"],
+            "password": values.get("password", ""),
+        }
+        profile_data = {
+            "card_number": card_number,
+            "category": category,
+            "birth_date": birth_date,
+            "address": values.get("address", ""),
+            "postal_code": values.get("postal_code", ""),
+            "city": values.get("city", ""),
+            "phone": values.get("phone", ""),
+            "gdpr_consent": True,
+            "newsletter_consent": _is_true(values.get("newsletter_consent", "")),
+        }
+        return user_data, profile_data
+
+    def hash_passwords(self, passwords):
+        """
+        Hache les mots de passe fournis (pool de processus si ``workers``
+        le permet) ; les mots de passe vides deviennent inutilisables.
+        """
+        to_hash = [password for password in passwords if password]
+        if self.workers > 1 and len(to_hash) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=django.setup
+                )
+            chunksize = max(1, len(to_hash) // (self.workers * 4))
+            hashed = iter(self._pool.map(make_password, to_hash, chunksize=chunksize))
+        else:
+            hashed = iter([make_password(password) for password in to_hash])
+        return [
+            next(hashed) if password else make_password(None) for password in passwords
+        ]
@@ -0,0 +1,57 @@
+"""Calcule les noms normalisés des utilisateurs existants, par lots."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from accounts.normalization import normalize_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Remplit User.normalized_first_name / normalized_last_name par lots, "
+        "en parcourant la table par clé primaire."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Nombre d'utilisateurs traités par transaction (défaut : 1000).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fields = ["normalized_first_name", "normalized_last_name"]
+        last_pk, scanned, updated = 0, 0, 0
+
+        while True:
+            batch = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "first_name", "last_name", *fields)[:batch_size]
+            )
+            if not batch:
+                break
+            changed = []
+            for user in batch:
+                first = normalize_name(user.first_name)
+                last = normalize_name(user.last_name)
+                if (first, last) != (
+                    user.normalized_first_name,
+                    user.normalized_last_name,
+                ):
+                    user.normalized_first_name, user.normalized_last_name = first, last
+                    changed.append(user)
+            with transaction.atomic():
+                User.objects.bulk_update(changed, fields)
+            scanned += len(batch)
+            updated += len(changed)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{scanned} utilisateur(s) parcouru(s), {updated} mis à jour."
+            )
+        )
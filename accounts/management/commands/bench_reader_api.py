@@ -0,0 +1,120 @@
+"""Mesure le débit de l'API lecteur, servie en WSGI ou en ASGI."""
+
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+
+from accounts.api.serializers import CustomTokenObtainPairSerializer
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Générateur de charge local pour l'API lecteur : envoie N requêtes "
+        "authentifiées avec C requêtes simultanées, par le gestionnaire WSGI "
+        "(threads) ou ASGI (boucle asyncio) de Django, sans serveur ni réseau. "
+        "Lancer une fois par mode, avec API_ASYNC_VIEWS=False puis True."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            required=True,
+            help="Lecteur au nom duquel les requêtes sont envoyées.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["wsgi", "asgi"],
+            default="wsgi",
+            help="Gestionnaire de requêtes (défaut : wsgi).",
+        )
+        parser.add_argument(
+            "--path",
+            default="/api/v1/readers/me/dashboard/",
+            help="Chemin interrogé (défaut : /api/v1/readers/me/dashboard/).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Nombre total de requêtes (défaut : 1000).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Requêtes simultanées (défaut : 20).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(
+                f"Utilisateur « {options['username']} » introuvable."
+            ) from None
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        headers = {"authorization": f"Bearer {token}"}
+
+        mode = options["mode"]
+        if (mode == "asgi") != settings.API_ASYNC_VIEWS:
+            self.stderr.write(
+                f"Attention : mode {mode} avec API_ASYNC_VIEWS="
+                f"{settings.API_ASYNC_VIEWS}."
+            )
+        run = self.run_asgi if mode == "asgi" else self.run_wsgi
+        # Les clients de test interrogent l'hôte « testserver »
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            started = time.perf_counter()
+            results = run(
+                options["path"], headers, options["requests"], options["concurrency"]
+            )
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ok in results)
+        errors = sum(1 for _latency, ok in results if not ok)
+        p50, p95 = (
+            statistics.quantiles(latencies, n=100)[index] * 1000 for index in (49, 94)
+        )
+        views = "vues async" if settings.API_ASYNC_VIEWS else "vues DRF"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{mode} ({views}) : {len(results)} requêtes en {elapsed:.2f} s, "
+                f"{len(results) / elapsed:.0f} req/s, p50 {p50:.1f} ms, "
+                f"p95 {p95:.1f} ms, {errors} erreur(s)."
+            )
+        )
+
+    def run_wsgi(self, path, headers, total, concurrency):
+        local = threading.local()
+
+        def send(_index):
+            if not hasattr(local, "client"):
+                local.client = Client(raise_request_exception=False)
+            started = time.perf_counter()
+            response = local.client.get(path, headers=headers)
+            return time.perf_counter() - started, response.status_code == 200
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(send, range(total)))
+
+    def run_asgi(self, path, headers, total, concurrency):
+        async def main():
+            client = AsyncClient(raise_request_exception=False)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def send():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    return time.perf_counter() - started, response.status_code == 200
+
+            return await asyncio.gather(*(send() for _index in range(total)))
+
+        return asyncio.run(main())
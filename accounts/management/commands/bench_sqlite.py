@@ -0,0 +1,130 @@
+"""Compare l'écriture concurrente sur SQLite sans et avec le profil de performance."""
+
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.test import override_settings
+
+ALIAS = "sqlite_bench"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit de transactions d'écriture concurrentes (lecture puis "
+        "écriture, comme une vue du personnel) et de lectures simultanées sur "
+        "une base SQLite temporaire, sans puis avec le profil accounts.sqlite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=8,
+            help="Threads d'écriture simultanés (défaut : 8).",
+        )
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=4,
+            help="Threads de lecture simultanés (défaut : 4).",
+        )
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=200,
+            help="Transactions d'écriture par thread (défaut : 200).",
+        )
+
+    def handle(self, *args, **options):
+        for label, tuned in (("sans profil", False), ("avec profil", True)):
+            with tempfile.TemporaryDirectory() as directory:
+                done, locked, reads, elapsed = self.run_profile(
+                    Path(directory) / "bench.sqlite3", tuned, options
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{label} : {done} écritures en {elapsed:.2f} s "
+                    f"({done / elapsed:.0f}/s), {locked} échec(s) « database is "
+                    f"locked », {reads} lectures ({reads / elapsed:.0f}/s)."
+                )
+            )
+
+    def run_profile(self, path, tuned, options):
+        connections.settings[ALIAS] = {
+            **connections["default"].settings_dict,
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(path),
+            "OPTIONS": {"transaction_mode": "IMMEDIATE"} if tuned else {},
+        }
+        try:
+            with override_settings(SQLITE_TUNING=tuned):
+                with connections[ALIAS].cursor() as cursor:
+                    cursor.execute(
+                        "CREATE TABLE bench_row "
+                        "(id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT)"
+                    )
+                return self.run_workload(options)
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+
+    def run_workload(self, options):
+        writing = threading.Event()
+        writing.set()
+
+        def write(worker):
+            done, locked = 0, 0
+            try:
+                for _index in range(options["transactions"]):
+                    try:
+                        with transaction.atomic(using=ALIAS):
+                            with connections[ALIAS].cursor() as cursor:
+                                cursor.execute(
+                                    "SELECT COUNT(*) FROM bench_row WHERE worker = %s",
+                                    [worker],
+                                )
+                                count = cursor.fetchone()[0]
+                                cursor.execute(
+                                    "INSERT INTO bench_row (worker, payload) "
+                                    "VALUES (%s, %s)",
+                                    [worker, str(count)],
+                                )
+                        done += 1
+                    except OperationalError:
+                        locked += 1
+            finally:
+                connections[ALIAS].close()
+            return done, locked
+
+        def read(_worker):
+            reads = 0
+            try:
+                while writing.is_set():
+                    with connections[ALIAS].cursor() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM bench_row")
+                        cursor.fetchone()
+                    reads += 1
+            except OperationalError:
+                pass
+            finally:
+                connections[ALIAS].close()
+            return reads
+
+        workers = options["writers"] + options["readers"]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            readers = [pool.submit(read, index) for index in range(options["readers"])]
+            writers = list(pool.map(write, range(options["writers"])))
+            writing.clear()
+            reads = sum(future.result() for future in readers)
+        elapsed = time.perf_counter() - started
+
+        done = sum(result[0] for result in writers)
+        locked = sum(result[1] for result in writers)
+        return done, locked, reads, elapsed
@@ -0,0 +1,54 @@
+"""Exporte en flux les lecteurs d'une médiathèque (CSV ou JSON Lines)."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.exporters import DEFAULT_CHUNK_SIZE, FORMATS, export_rows
+from accounts.models import Library
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporte les lecteurs d'une médiathèque en CSV ou JSON Lines, "
+        "à mémoire constante."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--library",
+            required=True,
+            help="Code de la médiathèque à exporter.",
+        )
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=sorted(FORMATS),
+            default="csv",
+            help="Format de sortie (défaut : csv).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Fichier de sortie (défaut : sortie standard).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Lignes lues par requête (défaut : {DEFAULT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            library = Library.objects.get(code=options["library"])
+        except Library.DoesNotExist:
+            raise CommandError(
+                f"Médiathèque « {options['library']} » introuvable."
+            ) from None
+
+        serialize = FORMATS[options["export_format"]][0]
+        lines = serialize(export_rows(library, chunk_size=options["chunk_size"]))
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,68 @@
+"""Importe des lecteurs en masse depuis un fichier CSV."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import ReaderImporter
+from accounts.models import Library
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des lecteurs depuis un fichier CSV dans une médiathèque : "
+        "lecture en flux, insertions par lots, hachage parallèle des mots de passe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier CSV (UTF-8, avec en-tête).")
+        parser.add_argument(
+            "--library",
+            required=True,
+            help="Code de la médiathèque de rattachement.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Nombre de lecteurs écrits par transaction (défaut : 1000).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Processus de hachage des mots de passe (défaut : nombre de CPU).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            library = Library.objects.get(code=options["library"])
+        except Library.DoesNotExist:
+            raise CommandError(
+                f"Médiathèque « {options['library']} » introuvable."
+            ) from None
+
+        importer = ReaderImporter(
+            library,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            progress=self.report_progress,
+        )
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as csv_file:
+                report = importer.run(csv_file)
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for line_number, message in report.errors:
+            self.stderr.write(f"Ligne {line_number} : {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.created} lecteur(s) importé(s), {report.rejected} ligne(s) "
+                f"refusée(s) en {report.elapsed:.1f} s ({report.rate:.0f} lecteurs/s)."
+            )
+        )
+
+    def report_progress(self, report):
+        self.stdout.write(
+            f"{report.created} lecteur(s) importé(s), {report.rejected} refusé(s) "
+            f"- {report.rate:.0f} lecteurs/s"
+        )
@@ -0,0 +1,26 @@
+"""Supprime par lots les jetons révoqués arrivés à expiration."""
+
+from django.core.management.base import BaseCommand
+
+from accounts.blacklist import prune
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime de la liste noire les jetons de rafraîchissement expirés, "
+        "par lots pour ne pas verrouiller la table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Nombre de jetons supprimés par requête (défaut : 5000).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{deleted} jeton(s) expiré(s) supprimé(s).")
+        )
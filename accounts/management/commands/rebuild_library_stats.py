@@ -0,0 +1,34 @@
+"""Recalcule les statistiques dénormalisées des médiathèques."""
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import Library
+from accounts.stats import rebuild_library_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs LibraryStats et corrige ceux qui ont divergé "
+        "(mises à jour en masse, imports, etc.)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--library",
+            dest="codes",
+            action="append",
+            default=[],
+            help="Code de médiathèque à recalculer (répétable).",
+        )
+
+    def handle(self, *args, **options):
+        libraries = Library.objects.all()
+        if options["codes"]:
+            libraries = libraries.filter(code__in=options["codes"])
+        repaired = rebuild_library_stats(libraries)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{libraries.count()} médiathèque(s) vérifiée(s), "
+                f"{repaired} corrigée(s)."
+            )
+        )
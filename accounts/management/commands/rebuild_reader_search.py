@@ -0,0 +1,16 @@
+"""Reconstruit l'index de recherche plein texte des lecteurs."""
+
+from django.core.management.base import BaseCommand
+
+from accounts import search
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche des lecteurs (FTS5 sous SQLite)."
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            self.stdout.write("Index plein texte indisponible sur ce moteur.")
+            return
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Index de recherche reconstruit."))
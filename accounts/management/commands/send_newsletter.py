@@ -0,0 +1,64 @@
+"""Envoie (ou reprend) une campagne newsletter."""
+
+from smtplib import SMTPException
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import NewsletterCampaign
+from accounts.newsletters import send_campaign
+
+
+class Command(BaseCommand):
+    help = (
+        "Envoie une campagne newsletter aux lecteurs consentants, par lots sur "
+        "une connexion SMTP partagée ; une campagne interrompue reprend où elle "
+        "s'était arrêtée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("campaign", type=int, help="Identifiant de la campagne.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Emails envoyés par lot (défaut : NEWSLETTER_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=None,
+            help="Emails par seconde au plus (défaut : NEWSLETTER_RATE_LIMIT).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            campaign = NewsletterCampaign.objects.get(pk=options["campaign"])
+        except NewsletterCampaign.DoesNotExist:
+            raise CommandError(
+                f"Campagne « {options['campaign']} » introuvable."
+            ) from None
+        if campaign.status == NewsletterCampaign.Status.DONE:
+            raise CommandError(f"La campagne « {campaign} » a déjà été envoyée.")
+
+        try:
+            sent = send_campaign(
+                campaign,
+                batch_size=options["batch_size"],
+                rate=options["rate"],
+                progress=self.report_progress,
+            )
+        except (SMTPException, OSError) as exc:
+            raise CommandError(
+                f"Envoi interrompu après {campaign.sent_count} email(s) "
+                f"({type(exc).__name__}: {exc}) ; relancer la commande pour "
+                "reprendre."
+            ) from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sent} email(s) envoyé(s) ({campaign.sent_count} au total, "
+                f"{campaign.failed_count} adresse(s) refusée(s))."
+            )
+        )
+
+    def report_progress(self, campaign):
+        self.stdout.write(f"{campaign.sent_count} email(s) envoyé(s)...")
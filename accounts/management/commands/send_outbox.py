@@ -0,0 +1,52 @@
+"""Envoie les emails de la boîte d'envoi (worker)."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import deliver_due
+
+
+class Command(BaseCommand):
+    help = (
+        "Envoie les emails en attente par lots, sur une connexion SMTP par lot ; "
+        "les échecs sont retentés avec un délai croissant."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Emails envoyés par connexion (défaut : OUTBOX_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Tourne en continu au lieu de vider la file une fois.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Attente entre deux passages quand la file est vide (secondes).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent, total_failed = 0, 0
+            while True:
+                sent, failed = deliver_due(options["batch_size"])
+                total_sent += sent
+                total_failed += failed
+                if not sent + failed:
+                    break
+            if total_sent or total_failed or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{total_sent} email(s) envoyé(s), {total_failed} en échec."
+                    )
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
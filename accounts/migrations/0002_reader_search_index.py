@@ -0,0 +1,37 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS accounts_readersearch USING fts5("
+    "card_number, username, first_name, last_name, email, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+POPULATE_SQL = (
+    "INSERT INTO accounts_readersearch "
+    "(rowid, card_number, username, first_name, last_name, email) "
+    "SELECT p.id, p.card_number, u.username, u.first_name, u.last_name, u.email "
+    "FROM accounts_readerprofile p INNER JOIN accounts_user u ON u.id = p.user_id"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(POPULATE_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS accounts_readersearch")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
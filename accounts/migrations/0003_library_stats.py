@@ -0,0 +1,85 @@
+# Generated by Django 5.2.10 on 2026-10-17 03:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_library_stats(apps, schema_editor):
+    Library = apps.get_model("accounts", "Library")
+    LibraryStats = apps.get_model("accounts", "LibraryStats")
+    User = apps.get_model("accounts", "User")
+
+    rows = {
+        row.pop("library_id"): row
+        for row in User.objects.filter(library__isnull=False)
+        .values("library_id")
+        .annotate(
+            readers=Count("id", filter=Q(user_type="reader")),
+            staff=Count("id", filter=Q(user_type="library")),
+            active_readers=Count("id", filter=Q(reader_profile__is_active=True)),
+            blocked_readers=Count("id", filter=Q(reader_profile__is_blocked=True)),
+        )
+        .order_by()
+    }
+    LibraryStats.objects.bulk_create(
+        LibraryStats(library_id=pk, **rows.get(pk, {}))
+        for pk in Library.objects.values_list("pk", flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_reader_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LibraryStats",
+            fields=[
+                (
+                    "library",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="accounts.library",
+                        verbose_name="Médiathèque",
+                    ),
+                ),
+                (
+                    "readers",
+                    models.PositiveIntegerField(default=0, verbose_name="Lecteurs"),
+                ),
+                (
+                    "active_readers",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Lecteurs actifs"
+                    ),
+                ),
+                (
+                    "blocked_readers",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Lecteurs bloqués"
+                    ),
+                ),
+                (
+                    "staff",
+                    models.PositiveIntegerField(default=0, verbose_name="Personnel"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Date de modification"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Statistiques de médiathèque",
+                "verbose_name_plural": "Statistiques de médiathèques",
+            },
+        ),
+        migrations.RunPython(populate_library_stats, migrations.RunPython.noop),
+    ]
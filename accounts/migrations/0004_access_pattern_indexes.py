@@ -0,0 +1,60 @@
+# Generated by Django 5.2.10 on 2026-10-17 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_library_stats"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="library",
+            index=models.Index(fields=["name", "id"], name="accounts_lib_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="library",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["name"],
+                name="accounts_lib_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="readerprofile",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="accounts_rp_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="readerprofile",
+            index=models.Index(
+                condition=models.Q(("is_blocked", True)),
+                fields=["card_number"],
+                name="accounts_rp_blocked_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="readerprofile",
+            index=models.Index(
+                condition=models.Q(("is_active", False)),
+                fields=["card_number"],
+                name="accounts_rp_inactive_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["library", "user_type"], name="accounts_user_lib_type_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["user_type", "username"], name="accounts_user_type_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-17 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_access_pattern_indexes"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="normalized_first_name",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=150,
+                verbose_name="Prénom normalisé",
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="normalized_last_name",
+            field=models.CharField(
+                blank=True, editable=False, max_length=150, verbose_name="Nom normalisé"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["normalized_last_name", "normalized_first_name"],
+                name="accounts_user_norm_name_idx",
+            ),
+        ),
+    ]
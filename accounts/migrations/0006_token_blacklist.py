@@ -0,0 +1,47 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_normalized_names"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlacklistedToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "jti",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Identifiant du jeton"
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="Date d'expiration")),
+                (
+                    "blacklisted_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Date de révocation"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Jeton révoqué",
+                "verbose_name_plural": "Jetons révoqués",
+                "indexes": [
+                    models.Index(fields=["expires_at"], name="accounts_bl_expires_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_token_blacklist"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CardSequence",
+            fields=[
+                (
+                    "library",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card_sequence",
+                        serialize=False,
+                        to="accounts.library",
+                        verbose_name="Médiathèque",
+                    ),
+                ),
+                (
+                    "next_value",
+                    models.PositiveBigIntegerField(
+                        default=1, verbose_name="Prochaine valeur"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Séquence de numéros de carte",
+                "verbose_name_plural": "Séquences de numéros de carte",
+            },
+        ),
+    ]
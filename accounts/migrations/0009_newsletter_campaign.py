@@ -0,0 +1,101 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NewsletterCampaign",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=255, verbose_name="Objet")),
+                (
+                    "body",
+                    models.TextField(
+                        help_text="Gabarit Django ; variables : library, campaign.",
+                        verbose_name="Message",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Brouillon"),
+                            ("sending", "Envoi en cours"),
+                            ("done", "Envoyée"),
+                        ],
+                        default="draft",
+                        max_length=10,
+                        verbose_name="Statut",
+                    ),
+                ),
+                (
+                    "last_reader_id",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Dernier lecteur traité"
+                    ),
+                ),
+                (
+                    "sent_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Emails envoyés"
+                    ),
+                ),
+                (
+                    "failed_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Adresses refusées"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Date de création"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Début de l'envoi"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Fin de l'envoi"
+                    ),
+                ),
+                (
+                    "library",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Laisser vide pour tout le réseau.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="newsletter_campaigns",
+                        to="accounts.library",
+                        verbose_name="Médiathèque",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Campagne newsletter",
+                "verbose_name_plural": "Campagnes newsletter",
+            },
+        ),
+    ]
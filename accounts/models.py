@@ -1,8 +1,15 @@
 from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .normalization import normalize_name
+
+RESERVED_CARD_NUMBER_ERROR = _(
+    "Ce format de numéro est réservé aux cartes attribuées automatiquement."
+)
+
 
 class Library(models.Model):
     """
@@ -41,6 +48,16 @@ class Library(models.Model):
         verbose_name = _("Médiathèque")
         verbose_name_plural = _("Médiathèques")
         ordering = ["name"]
+        indexes = [
+            # Liste paginée par curseur (name, id)
+            models.Index(fields=["name", "id"], name="accounts_lib_name_id_idx"),
+            # API publique : médiathèques actives triées par nom
+            models.Index(
+                fields=["name"],
+                condition=models.Q(is_active=True),
+                name="accounts_lib_active_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.code})"
@@ -76,6 +93,14 @@ class User(AbstractUser):
         verbose_name=_("Médiathèque"),
     )
 
+    # Clés de recherche (sans accents, minuscules), calculées à la sauvegarde
+    normalized_first_name = models.CharField(
+        _("Prénom normalisé"), max_length=150, blank=True, editable=False
+    )
+    normalized_last_name = models.CharField(
+        _("Nom normalisé"), max_length=150, blank=True, editable=False
+    )
+
     # Audit RGPD
     created_at = models.DateTimeField(_("Date de création"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Date de modification"), auto_now=True)
@@ -83,6 +108,21 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _("Utilisateur")
         verbose_name_plural = _("Utilisateurs")
+        indexes = [
+            # Requêtes limitées à une médiathèque (lecteurs, personnel)
+            models.Index(
+                fields=["library", "user_type"], name="accounts_user_lib_type_idx"
+            ),
+            # Filtre de l'admin par type, trié par identifiant
+            models.Index(
+                fields=["user_type", "username"], name="accounts_user_type_idx"
+            ),
+            # Recherche et détection de doublons sur les noms normalisés
+            models.Index(
+                fields=["normalized_last_name", "normalized_first_name"],
+                name="accounts_user_norm_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
@@ -104,6 +144,17 @@ class User(AbstractUser):
         if self.user_type == self.UserType.SUPERADMIN:
             self.is_staff = True
             self.is_superuser = True
+        self.normalized_first_name = normalize_name(self.first_name)
+        self.normalized_last_name = normalize_name(self.last_name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"first_name", "last_name"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = {
+                *update_fields,
+                "normalized_first_name",
+                "normalized_last_name",
+            }
         super().save(*args, **kwargs)
 
 
@@ -201,11 +252,229 @@ class ReaderProfile(models.Model):
     class Meta:
         verbose_name = _("Profil lecteur")
         verbose_name_plural = _("Profils lecteurs")
+        indexes = [
+            # Liste des lecteurs paginée par curseur (-created_at, -id)
+            models.Index(fields=["-created_at", "-id"], name="accounts_rp_created_idx"),
+            # Filtres de l'admin (triés par carte) : index partiels sur les
+            # cas minoritaires, les autres valeurs couvrent presque toute la table
+            models.Index(
+                fields=["card_number"],
+                condition=models.Q(is_blocked=True),
+                name="accounts_rp_blocked_idx",
+            ),
+            models.Index(
+                fields=["card_number"],
+                condition=models.Q(is_active=False),
+                name="accounts_rp_inactive_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.card_number} - {self.user.get_full_name() or self.user.username}"
 
+    def clean(self):
+        super().clean()
+        # Import local : ``cards`` dépend de ce module
+        from .cards import is_reserved_card_number
+
+        # Un numéro de la séquence n'est accepté que s'il est déjà celui du
+        # profil (attribué à l'inscription) : saisi à la main, il entrerait
+        # en collision avec une inscription future.
+        if is_reserved_card_number(self.card_number):
+            stored = (
+                ReaderProfile.objects.filter(pk=self.pk)
+                .values_list("card_number", flat=True)
+                .first()
+                if self.pk
+                else None
+            )
+            if stored != self.card_number:
+                raise ValidationError({"card_number": RESERVED_CARD_NUMBER_ERROR})
+
     @property
     def full_address(self):
         parts = [self.address, f"{self.postal_code} {self.city}".strip()]
         return ", ".join(p for p in parts if p)
+
+
+class LibraryStats(models.Model):
+    """
+    Compteurs dénormalisés d'une médiathèque.
+    Tenus à jour de façon incrémentale par les signaux ``User`` et
+    ``ReaderProfile`` ; la commande ``rebuild_library_stats`` les recalcule.
+    """
+
+    objects = models.Manager()
+
+    library = models.OneToOneField(
+        Library,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name=_("Médiathèque"),
+    )
+    readers = models.PositiveIntegerField(_("Lecteurs"), default=0)
+    active_readers = models.PositiveIntegerField(_("Lecteurs actifs"), default=0)
+    blocked_readers = models.PositiveIntegerField(_("Lecteurs bloqués"), default=0)
+    staff = models.PositiveIntegerField(_("Personnel"), default=0)
+
+    updated_at = models.DateTimeField(_("Date de modification"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Statistiques de médiathèque")
+        verbose_name_plural = _("Statistiques de médiathèques")
+
+    def __str__(self):
+        return f"{self.library_id}: {self.readers} lecteurs"
+
+
+class CardSequence(models.Model):
+    """
+    Compteur des numéros de carte attribués automatiquement par médiathèque.
+    ``next_value`` est la prochaine valeur libre (voir ``accounts.cards``).
+    """
+
+    objects = models.Manager()
+
+    library = models.OneToOneField(
+        Library,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="card_sequence",
+        verbose_name=_("Médiathèque"),
+    )
+    next_value = models.PositiveBigIntegerField(_("Prochaine valeur"), default=1)
+
+    class Meta:
+        verbose_name = _("Séquence de numéros de carte")
+        verbose_name_plural = _("Séquences de numéros de carte")
+
+    def __str__(self):
+        return f"{self.library_id}: {self.next_value}"
+
+
+class BlacklistedToken(models.Model):
+    """
+    Jeton de rafraîchissement révoqué, identifié par son ``jti``.
+    Les lignes expirées sont supprimées par la commande ``prune_token_blacklist``.
+    """
+
+    objects = models.Manager()
+
+    jti = models.CharField(_("Identifiant du jeton"), max_length=255, unique=True)
+    expires_at = models.DateTimeField(_("Date d'expiration"))
+    blacklisted_at = models.DateTimeField(_("Date de révocation"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Jeton révoqué")
+        verbose_name_plural = _("Jetons révoqués")
+        indexes = [
+            # Purge des jetons expirés
+            models.Index(fields=["expires_at"], name="accounts_bl_expires_idx"),
+        ]
+
+    def __str__(self):
+        return self.jti
+
+
+class OutboxEmail(models.Model):
+    """
+    Email en attente d'envoi (boîte d'envoi en base).
+    Créé dans la transaction de la requête, envoyé par la commande
+    ``send_outbox`` avec nouvelles tentatives espacées en cas d'échec.
+    """
+
+    objects = models.Manager()
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("En attente")
+        SENT = "sent", _("Envoyé")
+        FAILED = "failed", _("Échec définitif")
+
+    subject = models.CharField(_("Objet"), max_length=255)
+    body = models.TextField(_("Message"))
+    from_email = models.CharField(_("Expéditeur"), max_length=254)
+    recipients = models.JSONField(_("Destinataires"), default=list)
+
+    status = models.CharField(
+        _("Statut"),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(_("Tentatives"), default=0)
+    next_attempt_at = models.DateTimeField(_("Prochaine tentative"))
+    last_error = models.TextField(_("Dernière erreur"), blank=True)
+
+    created_at = models.DateTimeField(_("Date de création"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("Date d'envoi"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Email en attente")
+        verbose_name_plural = _("Emails en attente")
+        indexes = [
+            # File du worker : emails en attente dont la tentative est due
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="pending"),
+                name="accounts_outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+
+class NewsletterCampaign(models.Model):
+    """
+    Campagne d'information envoyée aux lecteurs ayant consenti à la newsletter,
+    pour une médiathèque ou pour tout le réseau. L'envoi (commande
+    ``send_newsletter``) enregistre sa progression et reprend après une
+    interruption.
+    """
+
+    objects = models.Manager()
+
+    class Status(models.TextChoices):
+        DRAFT = "draft", _("Brouillon")
+        SENDING = "sending", _("Envoi en cours")
+        DONE = "done", _("Envoyée")
+
+    library = models.ForeignKey(
+        Library,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="newsletter_campaigns",
+        verbose_name=_("Médiathèque"),
+        help_text=_("Laisser vide pour tout le réseau."),
+    )
+    subject = models.CharField(_("Objet"), max_length=255)
+    body = models.TextField(
+        _("Message"),
+        help_text=_("Gabarit Django ; variables : library, campaign."),
+    )
+
+    status = models.CharField(
+        _("Statut"),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.DRAFT,
+    )
+    # Point de reprise : dernier profil lecteur traité (clé primaire)
+    last_reader_id = models.PositiveBigIntegerField(
+        _("Dernier lecteur traité"), default=0
+    )
+    sent_count = models.PositiveIntegerField(_("Emails envoyés"), default=0)
+    failed_count = models.PositiveIntegerField(_("Adresses refusées"), default=0)
+
+    created_at = models.DateTimeField(_("Date de création"), auto_now_add=True)
+    started_at = models.DateTimeField(_("Début de l'envoi"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Fin de l'envoi"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Campagne newsletter")
+        verbose_name_plural = _("Campagnes newsletter")
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,169 @@
+"""
+Envoi des campagnes newsletter aux lecteurs consentants.
+
+Les destinataires (profil actif, ``newsletter_consent`` coché, email
+renseigné) sont lus en flux par clé primaire croissante avec
+``.values_list().iterator()`` : aucune instance de modèle n'est construite.
+Le gabarit est compilé une fois et rendu une fois par médiathèque (seule
+variable du contexte), pas une fois par lecteur. Les emails partent par lots
+de ``NEWSLETTER_BATCH_SIZE`` sur une connexion SMTP réutilisée d'un lot à
+l'autre (``send_messages``), à ``NEWSLETTER_RATE_LIMIT`` emails par seconde
+au plus.
+
+Chaque email est envoyé séparément sur la connexion partagée : une adresse
+refusée par le serveur (``SMTPRecipientsRefused``) est comptée dans
+``failed_count`` et l'envoi continue. Toute autre erreur (connexion perdue,
+serveur indisponible) interrompt l'envoi.
+
+Après chaque lot, et avant de propager une interruption, la campagne
+enregistre le dernier lecteur traité : une campagne interrompue reprend au
+premier email non envoyé.
+"""
+
+import time
+from smtplib import SMTPRecipientsRefused
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.template import Context, Template
+from django.utils import timezone, translation
+
+from .models import Library, NewsletterCampaign, ReaderProfile
+
+
+def recipients(campaign, chunk_size=2000):
+    """
+    Itère sur les destinataires restants d'une campagne :
+    ``(pk du profil, email, pk de la médiathèque)``.
+    """
+    readers = ReaderProfile.objects.filter(
+        newsletter_consent=True,
+        is_active=True,
+        user__is_active=True,
+        pk__gt=campaign.last_reader_id,
+    ).exclude(user__email="")
+    if campaign.library_id:
+        readers = readers.filter(user__library_id=campaign.library_id)
+    rows = readers.order_by("pk").values_list("pk", "user__email", "user__library_id")
+    return rows.iterator(chunk_size=chunk_size)
+
+
+class CampaignRenderer:
+    """Rend le message d'une campagne une seule fois par médiathèque."""
+
+    def __init__(self, campaign):
+        self.campaign = campaign
+        self.template = Template(campaign.body)
+        self.rendered = {}
+
+    def render(self, library_id):
+        if library_id not in self.rendered:
+            library = Library.objects.filter(pk=library_id).first()
+            with translation.override(settings.LANGUAGE_CODE):
+                self.rendered[library_id] = self.template.render(
+                    Context({"campaign": self.campaign, "library": library})
+                )
+        return self.rendered[library_id]
+
+
+class RateLimiter:
+    """Limite le débit moyen à ``rate`` emails par seconde (0 : illimité)."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.clock = clock
+        self.sleep = sleep
+        self.started = clock()
+        self.count = 0
+
+    def wait(self, count):
+        """Attend le temps nécessaire avant d'envoyer ``count`` emails."""
+        if self.rate > 0:
+            delay = self.started + self.count / self.rate - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+        self.count += count
+
+
+def send_campaign(campaign, batch_size=None, rate=None, progress=None):
+    """
+    Envoie (ou reprend) une campagne ; retourne le nombre d'emails envoyés
+    par cet appel. ``progress`` est appelé avec la campagne après chaque lot.
+    """
+    if campaign.status == NewsletterCampaign.Status.DONE:
+        return 0
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    limiter = RateLimiter(settings.NEWSLETTER_RATE_LIMIT if rate is None else rate)
+    renderer = CampaignRenderer(campaign)
+
+    if campaign.status == NewsletterCampaign.Status.DRAFT:
+        campaign.status = NewsletterCampaign.Status.SENDING
+        campaign.started_at = timezone.now()
+        campaign.save(update_fields=["status", "started_at"])
+
+    sent = 0
+    connection = get_connection()
+    # Ouverte ici : ``send_messages`` la laisse alors ouverte entre les lots
+    connection.open()
+    try:
+        batch = []
+        for row in recipients(campaign):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                sent += _send_batch(campaign, batch, renderer, connection, limiter)
+                batch = []
+                if progress:
+                    progress(campaign)
+        if batch:
+            sent += _send_batch(campaign, batch, renderer, connection, limiter)
+            if progress:
+                progress(campaign)
+    finally:
+        connection.close()
+
+    campaign.status = NewsletterCampaign.Status.DONE
+    campaign.finished_at = timezone.now()
+    campaign.save(update_fields=["status", "finished_at"])
+    return sent
+
+
+def _send_batch(campaign, batch, renderer, connection, limiter):
+    """
+    Envoie un lot sur la connexion partagée puis enregistre la reprise ;
+    retourne le nombre d'emails acceptés par le serveur.
+    """
+    limiter.wait(len(batch))
+    sent, failed, last_reader_id = 0, 0, None
+    try:
+        for pk, email, library_id in batch:
+            # Un message par lecteur : les adresses ne sont jamais partagées
+            message = EmailMessage(
+                campaign.subject,
+                renderer.render(library_id),
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except SMTPRecipientsRefused:
+                failed += 1
+            else:
+                sent += 1
+            last_reader_id = pk
+    finally:
+        if last_reader_id is not None:
+            _save_progress(campaign, last_reader_id, sent, failed)
+    return sent
+
+
+def _save_progress(campaign, last_reader_id, sent, failed):
+    campaign.last_reader_id = last_reader_id
+    NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+        last_reader_id=last_reader_id,
+        sent_count=F("sent_count") + sent,
+        failed_count=F("failed_count") + failed,
+    )
+    campaign.sent_count += sent
+    campaign.failed_count += failed
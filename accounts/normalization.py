@@ -0,0 +1,21 @@
+"""
+Normalisation des noms pour la recherche et la détection de doublons.
+
+Les clés produites sont sans accents, en minuscules (``casefold``) et aux
+espaces réduits, de sorte que « Hélène  DURAND » et « helene durand » donnent
+la même valeur et puissent être comparées par égalité ou préfixe indexés.
+"""
+
+import unicodedata
+
+# Ligatures que la décomposition Unicode ne sépare pas
+LIGATURES = str.maketrans({"œ": "oe", "Œ": "OE", "æ": "ae", "Æ": "AE"})
+
+
+def normalize_name(value):
+    """Retourne la clé de recherche d'un nom ou prénom."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value.translate(LIGATURES))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
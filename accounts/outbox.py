@@ -0,0 +1,121 @@
+"""
+Boîte d'envoi des emails en base de données.
+
+Les vues appellent ``enqueue`` : l'email est enregistré dans la transaction
+en cours (annulé avec elle) et la requête ne dépend plus du serveur SMTP. La
+commande ``send_outbox`` appelle ``deliver_due`` : les emails dus sont
+réservés par un bail (``next_attempt_at`` repoussé de ``OUTBOX_LEASE``
+secondes, ce qui évite un double envoi entre workers), puis envoyés sur une
+seule connexion SMTP par lot. Un échec est retenté après
+``OUTBOX_RETRY_DELAY * 2 ** (tentatives - 1)`` secondes, jusqu'à
+``OUTBOX_MAX_ATTEMPTS`` tentatives. Le corps d'un email envoyé ou
+définitivement en échec est effacé : il peut contenir un mot de passe.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue(subject, body, recipients, from_email=None):
+    """Enregistre un email à envoyer ; retourne l'entrée de la boîte d'envoi."""
+    return OutboxEmail.objects.create(
+        subject=str(subject),
+        body=str(body),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+        next_attempt_at=timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """Délai avant la tentative suivante (croissance exponentielle)."""
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def claim_due(batch_size):
+    """Réserve jusqu'à ``batch_size`` emails dus pour ce worker."""
+    now = timezone.now()
+    due = OutboxEmail.objects.filter(
+        status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now
+    )
+    pks = list(
+        due.order_by("next_attempt_at").values_list("pk", flat=True)[:batch_size]
+    )
+    if not pks:
+        return []
+    # Le bail sert de jeton : seules les lignes encore dues sont réservées
+    lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE)
+    due.filter(pk__in=pks).update(next_attempt_at=lease_until)
+    return list(
+        OutboxEmail.objects.filter(pk__in=pks, next_attempt_at=lease_until).order_by(
+            "pk"
+        )
+    )
+
+
+def deliver_due(batch_size=None):
+    """
+    Envoie un lot d'emails dus sur une seule connexion SMTP.
+    Retourne ``(envoyés, en échec)``.
+    """
+    emails = claim_due(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    sent, failed = 0, 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Toute erreur de connexion est retentée plus tard
+        for email in emails:
+            _record_failure(email, exc)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                _record_failure(email, exc)
+                failed += 1
+            else:
+                _record_success(email)
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def _record_success(email):
+    email.status = OutboxEmail.Status.SENT
+    email.sent_at = timezone.now()
+    email.attempts += 1
+    email.body = ""
+    email.last_error = ""
+    email.save(update_fields=["status", "sent_at", "attempts", "body", "last_error"])
+
+
+def _record_failure(email, exc):
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.Status.FAILED
+        email.body = ""
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(
+        update_fields=["attempts", "last_error", "status", "next_attempt_at", "body"]
+    )
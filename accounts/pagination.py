@@ -0,0 +1,170 @@
+"""
+Pagination par curseur (keyset) pour les listes du personnel.
+
+Au lieu d'un OFFSET et d'un ``COUNT(*)``, chaque page est lue à partir de la
+clé de tri de la dernière ligne affichée : le coût d'une page ne dépend plus
+de sa profondeur. Les curseurs sont des jetons opaques (JSON en base64).
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class InvalidCursor(Exception):
+    """Curseur illisible ou ne correspondant pas à l'ordre de tri."""
+
+
+class CursorPage:
+    """Page de résultats exposant les curseurs suivant et précédent."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginateur keyset sur un ordre de tri total, par ex. ``("name", "id")``.
+    Le dernier champ doit être unique pour départager les égalités.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip("-")) for name in ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        values = [field.value_to_string(obj) for field in self.fields]
+        payload = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = payload["d"], payload["v"]
+            if direction not in (NEXT, PREVIOUS) or len(raw_values) != len(self.fields):
+                raise InvalidCursor
+            values = [
+                field.to_python(value) for field, value in zip(self.fields, raw_values)
+            ]
+        except (
+            binascii.Error,
+            ValueError,
+            TypeError,
+            KeyError,
+            ValidationError,
+        ) as exc:
+            raise InvalidCursor from exc
+        return direction, values
+
+    def _seek_filter(self, values, reverse):
+        """
+        Construit ``(a, b) > (va, vb)`` en tenant compte du sens de chaque champ :
+        ``a > va OR (a = va AND b > vb)``.
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            descending = name.startswith("-")
+            field = name.lstrip("-")
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def page(self, cursor=None):
+        """Retourne la page désignée par ``cursor`` (première page si vide)."""
+        qs, values, reverse = self._page_queryset(cursor)
+        return self._make_page(list(qs[: self.per_page + 1]), values, reverse)
+
+    async def apage(self, cursor=None):
+        """Variante asynchrone de ``page`` (ORM asynchrone)."""
+        qs, values, reverse = self._page_queryset(cursor)
+        rows = [row async for row in qs[: self.per_page + 1]]
+        return self._make_page(rows, values, reverse)
+
+    def _page_queryset(self, cursor):
+        direction, values = NEXT, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+
+        reverse = direction == PREVIOUS
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                name[1:] if name.startswith("-") else f"-{name}" for name in ordering
+            )
+
+        qs = self.queryset.order_by(*ordering)
+        if values is not None:
+            qs = qs.filter(self._seek_filter(values, reverse))
+        return qs, values, reverse
+
+    def _make_page(self, rows, values, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return CursorPage(rows)
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], NEXT) if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], PREVIOUS) if has_previous else None
+            ),
+        )
+
+
+class CursorPaginationMixin:
+    """
+    Remplace la pagination par numéro de page d'une ``ListView`` par une
+    pagination par curseur sur ``cursor_ordering``.
+    """
+
+    cursor_ordering = None
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor as exc:
+            raise Http404(_("Curseur de pagination invalide.")) from exc
+        return (paginator, page, page.object_list, page.has_other_pages())
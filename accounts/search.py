@@ -0,0 +1,130 @@
+"""
+Index de recherche plein texte des lecteurs.
+
+Sous SQLite, l'index est une table virtuelle FTS5 (``accounts_readersearch``)
+dont le ``rowid`` est la clé primaire du ``ReaderProfile``. Elle est tenue à
+jour par les signaux de ``accounts.signals`` et interrogée par la liste des
+lecteurs, l'admin et l'API. Sur les autres moteurs, la recherche retombe sur
+des préfixes des noms normalisés (``User.normalized_*``), jeton par jeton.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .normalization import normalize_name
+
+SEARCH_TABLE = "accounts_readersearch"
+SEARCH_COLUMNS = ("card_number", "username", "first_name", "last_name", "email")
+
+# Clés par requête d'indexation, sous la limite de variables de SQLite (32766)
+INDEX_CHUNK_SIZE = 5000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_enabled():
+    """Indique si l'index FTS5 est disponible sur la base courante."""
+    return connection.vendor == "sqlite"
+
+
+def tokenize(search):
+    """Découpe une saisie en jetons comparables à ceux de l'index."""
+    return [token.lower() for token in _TOKEN_RE.findall(search or "")]
+
+
+def build_match_query(search):
+    """
+    Construit l'expression MATCH FTS5 : chaque jeton doit apparaître,
+    en correspondance de préfixe (``"bib01" "12"*``).
+    """
+    return " ".join(f'"{token}"*' for token in tokenize(search))
+
+
+def index_reader(profile):
+    """Ajoute ou remplace l'entrée d'un profil lecteur dans l'index."""
+    if not is_enabled():
+        return
+    user = profile.user
+    values = [
+        profile.card_number,
+        user.username,
+        user.first_name,
+        user.last_name,
+        user.email,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [profile.pk])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [profile.pk, *values],
+        )
+
+
+def unindex_reader(profile_pk):
+    """Retire un profil lecteur de l'index."""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [profile_pk])
+
+
+_INDEX_SELECT = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+    "SELECT p.id, p.card_number, u.username, u.first_name, u.last_name, "
+    "u.email FROM accounts_readerprofile p "
+    "INNER JOIN accounts_user u ON u.id = p.user_id"
+)
+
+
+def index_readers(profile_pks):
+    """Ajoute à l'index des profils lecteurs créés en masse (sans signaux)."""
+    if not is_enabled() or not profile_pks:
+        return
+    profile_pks = list(profile_pks)
+    with connection.cursor() as cursor:
+        for start in range(0, len(profile_pks), INDEX_CHUNK_SIZE):
+            chunk = profile_pks[start : start + INDEX_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"{_INDEX_SELECT} WHERE p.id IN ({placeholders})", chunk)
+
+
+def rebuild_index():
+    """Reconstruit entièrement l'index à partir des tables lecteurs."""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(_INDEX_SELECT)
+
+
+def search_readers(queryset, search):
+    """
+    Filtre un queryset de ``ReaderProfile`` sur une saisie libre.
+    Chaque jeton doit correspondre (par préfixe) à l'un des champs indexés.
+    """
+    tokens = tokenize(search)
+    if not tokens:
+        return queryset
+
+    if is_enabled():
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+                [build_match_query(search)],
+            )
+        )
+
+    for token in tokens:
+        name = normalize_name(token)
+        queryset = queryset.filter(
+            Q(card_number__icontains=token)
+            | Q(user__username__icontains=token)
+            | Q(user__normalized_first_name__startswith=name)
+            | Q(user__normalized_last_name__startswith=name)
+            | Q(user__email__icontains=token)
+        )
+    return queryset
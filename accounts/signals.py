@@ -0,0 +1,215 @@
+"""
+Signaux de l'application accounts.
+
+Maintiennent les structures dérivées des lecteurs (index de recherche,
+autocomplétion en mémoire, comptages en cache, statistiques par médiathèque)
+synchronisées avec les modèles ``User`` et ``ReaderProfile``. Les structures
+en mémoire ne sont modifiées qu'après validation de la transaction.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache_versions, cards, counts, search, stats, typeahead
+from .api import authentication as api_authentication
+from .models import Library, LibraryStats, ReaderProfile, User
+
+# Champs utilisateur présents dans l'index de recherche et l'autocomplétion
+SEARCH_USER_FIELDS = frozenset(
+    {"username", "first_name", "last_name", "email", "library", "library_id"}
+)
+
+# Champs qui déterminent la contribution aux statistiques de médiathèque
+STATS_USER_FIELDS = frozenset({"library", "library_id", "user_type"})
+STATS_PROFILE_FIELDS = frozenset({"is_active", "is_blocked"})
+
+
+@receiver(pre_save, sender=ReaderProfile)
+def remember_previous_card(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (
+        update_fields is not None and "card_number" not in update_fields
+    ):
+        instance._previous_card = None
+    else:
+        instance._previous_card = (
+            ReaderProfile.objects.filter(pk=instance.pk)
+            .values_list("card_number", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=ReaderProfile)
+def index_reader_profile(sender, instance, created, **kwargs):
+    search.index_reader(instance)
+    cards.invalidate_card(instance.card_number)
+    previous = instance.__dict__.pop("_previous_card", None)
+    if previous and previous != instance.card_number:
+        # Carte renumérotée : l'ancien numéro ne doit plus désigner le lecteur,
+        # y compris s'il a été remis en cache avant la validation.
+        cards.invalidate_card(previous)
+        transaction.on_commit(lambda: cards.invalidate_card(previous))
+    transaction.on_commit(lambda: typeahead.update_reader(instance))
+    if created:
+        counts.invalidate_reader_counts(instance.user.library_id)
+
+
+@receiver(post_delete, sender=ReaderProfile)
+def unindex_reader_profile(sender, instance, **kwargs):
+    search.unindex_reader(instance.pk)
+    cards.invalidate_card(instance.card_number)
+    profile_pk = instance.pk
+    transaction.on_commit(lambda: typeahead.remove_reader(profile_pk))
+    counts.invalidate_reader_counts(instance.user.library_id)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_reader_user_counts(sender, instance, **kwargs):
+    if instance.is_reader:
+        counts.invalidate_reader_counts(instance.library_id)
+
+
+@receiver(post_save, sender=User)
+def reindex_reader_user(sender, instance, created, update_fields=None, **kwargs):
+    # Un nouvel utilisateur n'a pas encore de profil ; une mise à jour
+    # partielle (ex. last_login) ne touche pas aux champs indexés.
+    if not instance.is_reader:
+        return
+    if created:
+        counts.invalidate_reader_counts(instance.library_id)
+        return
+    if update_fields is not None and not SEARCH_USER_FIELDS & set(update_fields):
+        return
+    # Profil relu avec son propre utilisateur : assigner ``profile.user``
+    # remplacerait le ``reader_profile`` déjà chargé sur ``instance``.
+    profile = ReaderProfile.objects.select_related("user").filter(user=instance).first()
+    if profile is not None:
+        search.index_reader(profile)
+        cards.invalidate_card(profile.card_number)
+        transaction.on_commit(lambda: typeahead.update_reader(profile))
+
+
+@receiver(post_save, sender=Library)
+@receiver(post_delete, sender=Library)
+def bump_libraries_version(sender, instance, **kwargs):
+    cache_versions.bump(cache_versions.LIBRARIES_SCOPE)
+    cache_versions.bump(cache_versions.library_scope(instance.pk))
+
+
+@receiver(post_save, sender=ReaderProfile)
+@receiver(post_delete, sender=ReaderProfile)
+def bump_reader_version(sender, instance, **kwargs):
+    cache_versions.bump(cache_versions.reader_scope(instance.user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, instance, update_fields=None, **kwargs):
+    # La mise à jour de last_login à chaque connexion ne change rien d'exposé
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    cache_versions.bump(cache_versions.reader_scope(instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_auth_state(sender, instance, **kwargs):
+    # L'état vérifié par l'authentification par claims est relu au prochain appel
+    api_authentication.forget_user(instance.pk)
+
+
+# =============================================================================
+# Statistiques par médiathèque
+# =============================================================================
+
+
+@receiver(post_save, sender=Library)
+def create_library_stats(sender, instance, created, **kwargs):
+    if created:
+        LibraryStats.objects.get_or_create(library=instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_stats_state(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding:
+        instance._stats_state = (None, None)
+    elif update_fields is not None and not STATS_USER_FIELDS & set(update_fields):
+        instance._stats_state = None
+    else:
+        instance._stats_state = (
+            User.objects.filter(pk=instance.pk)
+            .values_list("library_id", "user_type")
+            .first()
+        ) or (None, None)
+
+
+@receiver(post_save, sender=User)
+def update_user_stats(sender, instance, created, **kwargs):
+    state = instance.__dict__.pop("_stats_state", None)
+    if state is None:
+        return
+    old_library_id, old_user_type = state
+    old = stats.user_contribution(old_library_id, old_user_type)
+    new = stats.user_contribution(instance.library_id, instance.user_type)
+
+    # Un changement de médiathèque déplace aussi les compteurs du profil
+    if not created and old_library_id != instance.library_id:
+        flags = (
+            ReaderProfile.objects.filter(user=instance)
+            .values_list("is_active", "is_blocked")
+            .first()
+        )
+        if flags:
+            old += stats.profile_contribution(old_library_id, *flags)
+            new += stats.profile_contribution(instance.library_id, *flags)
+        # ... et les comptages mis en cache des deux médiathèques
+        if User.UserType.READER in (old_user_type, instance.user_type):
+            counts.invalidate_reader_counts(old_library_id)
+            counts.invalidate_reader_counts(instance.library_id)
+
+    stats.apply_delta(old, new)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_stats(sender, instance, **kwargs):
+    stats.apply_delta(
+        stats.user_contribution(instance.library_id, instance.user_type), Counter()
+    )
+
+
+@receiver(pre_save, sender=ReaderProfile)
+def remember_profile_stats_state(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding:
+        instance._stats_state = (False, False)
+    elif update_fields is not None and not STATS_PROFILE_FIELDS & set(update_fields):
+        instance._stats_state = None
+    else:
+        instance._stats_state = (
+            ReaderProfile.objects.filter(pk=instance.pk)
+            .values_list("is_active", "is_blocked")
+            .first()
+        ) or (False, False)
+
+
+@receiver(post_save, sender=ReaderProfile)
+def update_profile_stats(sender, instance, **kwargs):
+    state = instance.__dict__.pop("_stats_state", None)
+    if state is None or state == (instance.is_active, instance.is_blocked):
+        return
+    library_id = instance.user.library_id
+    stats.apply_delta(
+        stats.profile_contribution(library_id, *state),
+        stats.profile_contribution(library_id, instance.is_active, instance.is_blocked),
+    )
+
+
+@receiver(post_delete, sender=ReaderProfile)
+def remove_profile_stats(sender, instance, **kwargs):
+    stats.apply_delta(
+        stats.profile_contribution(
+            instance.user.library_id, instance.is_active, instance.is_blocked
+        ),
+        Counter(),
+    )
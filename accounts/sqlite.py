@@ -0,0 +1,44 @@
+"""
+Profil de performance SQLite.
+
+``apply_profile`` est branché sur le signal ``connection_created`` : chaque
+nouvelle connexion SQLite reçoit les PRAGMA du profil (``SQLITE_*`` dans les
+réglages). Le journal WAL laisse les lectures se poursuivre pendant une
+écriture, ``synchronous=NORMAL`` ne synchronise le disque qu'aux points de
+contrôle du WAL, ``busy_timeout`` fait attendre un verrou au lieu d'échouer,
+``mmap_size`` et ``cache_size`` réduisent les lectures disque. Les
+transactions IMMEDIATE sont réglées dans ``DATABASES["OPTIONS"]``
+(``transaction_mode``), seul moyen de les imposer à ``atomic()``.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def profile_pragmas():
+    """PRAGMA du profil, validés (les valeurs viennent de l'environnement)."""
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ImproperlyConfigured(f"SQLITE_JOURNAL_MODE invalide : {journal_mode}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ImproperlyConfigured(f"SQLITE_SYNCHRONOUS invalide : {synchronous}")
+    return [
+        ("journal_mode", journal_mode),
+        ("busy_timeout", int(settings.SQLITE_BUSY_TIMEOUT)),
+        ("synchronous", synchronous),
+        ("mmap_size", int(settings.SQLITE_MMAP_SIZE)),
+        ("cache_size", int(settings.SQLITE_CACHE_SIZE)),
+    ]
+
+
+def apply_profile(sender, connection, **kwargs):
+    """Applique le profil à une nouvelle connexion SQLite."""
+    if connection.vendor != "sqlite" or not settings.SQLITE_TUNING:
+        return
+    with connection.cursor() as cursor:
+        for name, value in profile_pragmas():
+            cursor.execute(f"PRAGMA {name} = {value}")
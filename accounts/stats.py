@@ -0,0 +1,107 @@
+"""
+Maintenance des compteurs dénormalisés ``LibraryStats``.
+
+Chaque utilisateur et chaque profil lecteur apporte une « contribution » aux
+compteurs de sa médiathèque. Lors d'une sauvegarde, on retire l'ancienne
+contribution et on ajoute la nouvelle avec des expressions ``F()`` : la mise
+à jour est atomique et ne relit jamais les tables ``User``/``ReaderProfile``.
+"""
+
+from collections import Counter
+
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Library, LibraryStats, User
+
+STAT_FIELDS = ("readers", "active_readers", "blocked_readers", "staff")
+
+
+def user_contribution(library_id, user_type):
+    """Contribution d'un utilisateur aux compteurs de sa médiathèque."""
+    if not library_id:
+        return Counter()
+    if user_type == User.UserType.READER:
+        return Counter({(library_id, "readers"): 1})
+    if user_type == User.UserType.LIBRARY:
+        return Counter({(library_id, "staff"): 1})
+    return Counter()
+
+
+def profile_contribution(library_id, is_active, is_blocked):
+    """Contribution d'un profil lecteur aux compteurs de sa médiathèque."""
+    if not library_id:
+        return Counter()
+    return Counter(
+        {
+            (library_id, "active_readers"): int(bool(is_active)),
+            (library_id, "blocked_readers"): int(bool(is_blocked)),
+        }
+    )
+
+
+def apply_delta(old, new):
+    """Applique la différence entre deux contributions."""
+    delta = Counter(new)
+    delta.subtract(old)
+    per_library = {}
+    for (library_id, field), value in delta.items():
+        if value:
+            expression = F(field) + value
+            if value < 0:
+                # Plancher à zéro : un compteur qui a dérivé ne doit pas faire
+                # échouer la sauvegarde (champ positif)
+                expression = Greatest(expression, 0)
+            per_library.setdefault(library_id, {})[field] = expression
+    for library_id, updates in per_library.items():
+        updated = LibraryStats.objects.filter(library_id=library_id).update(**updates)
+        if not updated:
+            # Ligne absente : on la recalcule plutôt que de deviner
+            rebuild_library_stats(Library.objects.filter(pk=library_id))
+
+
+def compute_library_stats(libraries):
+    """Calcule les compteurs exacts d'un ensemble de médiathèques."""
+    rows = (
+        User.objects.filter(library__in=libraries)
+        .values("library_id")
+        .annotate(
+            readers=Count("id", filter=Q(user_type=User.UserType.READER)),
+            staff=Count("id", filter=Q(user_type=User.UserType.LIBRARY)),
+            active_readers=Count("id", filter=Q(reader_profile__is_active=True)),
+            blocked_readers=Count("id", filter=Q(reader_profile__is_blocked=True)),
+        )
+        .order_by()
+    )
+    return {row.pop("library_id"): row for row in rows}
+
+
+def rebuild_library_stats(libraries=None):
+    """
+    Recalcule les compteurs et corrige les lignes divergentes.
+    Retourne le nombre de médiathèques corrigées ou créées.
+    """
+    if libraries is None:
+        libraries = Library.objects.all()
+    exact = compute_library_stats(libraries)
+    existing = LibraryStats.objects.in_bulk(
+        list(libraries.values_list("pk", flat=True))
+    )
+
+    now = timezone.now()
+    to_create, to_update = [], []
+    for library_id in libraries.values_list("pk", flat=True):
+        values = exact.get(library_id, dict.fromkeys(STAT_FIELDS, 0))
+        stats = existing.get(library_id)
+        if stats is None:
+            to_create.append(LibraryStats(library_id=library_id, **values))
+        elif any(getattr(stats, field) != values[field] for field in STAT_FIELDS):
+            for field in STAT_FIELDS:
+                setattr(stats, field, values[field])
+            stats.updated_at = now
+            to_update.append(stats)
+
+    LibraryStats.objects.bulk_create(to_create, ignore_conflicts=True)
+    LibraryStats.objects.bulk_update(to_update, [*STAT_FIELDS, "updated_at"])
+    return len(to_create) + len(to_update)
@@ -2,15 +2,65 @@
 Tests for the accounts application.
 """
 
-from django.db import IntegrityError
-from django.test import Client, TestCase
+import csv
+import json
+import re
+import tempfile
+import unittest
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from smtplib import SMTPException, SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from rest_framework import status
-from rest_framework.test import APITestCase
-
-from .models import Library, ReaderProfile, User
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from loans.models import Loan
+
+from . import blacklist, newsletters, outbox, search, sqlite, typeahead
+from .api import authentication
+from .api.authentication import (
+    ClaimsJWTAuthentication,
+    ClaimsUser,
+    IdentityJWTAuthentication,
+)
+from .cards import (
+    clear_card_blocks,
+    has_valid_check_digit,
+    is_reserved_card_number,
+    lookup_card,
+    next_card_number,
+)
+from .counts import count_library_readers
+from .forms import ReaderCreationForm
+from .importers import ReaderImporter
+from .models import (
+    BlacklistedToken,
+    CardSequence,
+    Library,
+    LibraryStats,
+    NewsletterCampaign,
+    OutboxEmail,
+    ReaderProfile,
+    User,
+)
+from .normalization import normalize_name
+from .pagination import CursorPaginator
+from .search import search_readers
 
 
 class LibraryModelTests(TestCase):
@@ -397,7 +447,7 @@ class APITests(APITestCase):
         self.assertEqual(response.data["username"], "apireader")
 
     def test_reader_me_loans_empty(self):
-        """Test that loans endpoint returns empty list (placeholder)."""
+        """Test that loans endpoint returns an empty page without loans."""
         response = self.client.post(
             reverse("token_obtain_pair"),
             {"username": "apireader", "password": "apipass123"},
@@ -407,7 +457,7 @@ class APITests(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
         response = self.client.get(reverse("reader-me-loans"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["count"], 0)
+        self.assertIsNone(response.data["next"])
         self.assertEqual(response.data["results"], [])
 
     def test_reader_me_reservations_empty(self):
@@ -424,7 +474,7 @@ class APITests(APITestCase):
         self.assertEqual(response.data["count"], 0)
 
     def test_reader_me_history_empty(self):
-        """Test that history endpoint returns empty list (placeholder)."""
+        """Test that history endpoint returns an empty page without history."""
         response = self.client.post(
             reverse("token_obtain_pair"),
             {"username": "apireader", "password": "apipass123"},
@@ -434,7 +484,8 @@ class APITests(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
         response = self.client.get(reverse("reader-me-history"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["count"], 0)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(response.data["results"], [])
 
     def test_reader_me_update(self):
         """Test updating reader profile via API."""
@@ -701,3 +752,1734 @@ class RegistrationTests(TestCase):
         Library.objects.create(name="Inactive Library", code="INACT01", is_active=False)
         response = self.client.get(reverse("accounts:register"))
         self.assertNotContains(response, "Inactive Library")
+
+
+class ReaderSearchIndexTests(TestCase):
+    """Tests for the full-text reader search index."""
+
+    def setUp(self):
+        self.client = Client()
+        self.library = Library.objects.create(name="Test Lib", code="BIB01")
+        self.staff = User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        self.reader_user = User.objects.create_user(
+            username="hdurand",
+            password="readerpass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+            first_name="Hélène",
+            last_name="Durand",
+        )
+        self.reader_profile = ReaderProfile.objects.create(
+            user=self.reader_user, card_number="BIB01-123456", gdpr_consent=True
+        )
+
+    def search(self, term):
+        return list(search_readers(ReaderProfile.objects.all(), term))
+
+    def test_prefix_and_token_matching(self):
+        """Test that card number tokens and name prefixes match."""
+        self.assertEqual(self.search("BIB01-12"), [self.reader_profile])
+        self.assertEqual(self.search("dur"), [self.reader_profile])
+        self.assertEqual(self.search("durand hel"), [self.reader_profile])
+        self.assertEqual(self.search("martin"), [])
+
+    def test_accent_insensitive(self):
+        """Test that searching without accents finds accented names."""
+        self.assertEqual(self.search("helene"), [self.reader_profile])
+
+    def test_bulk_indexing_beyond_sqlite_variable_limit(self):
+        """Test that bulk indexing chunks primary keys into several queries."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.SEARCH_TABLE}")
+        self.assertEqual(self.search("durand"), [])
+        missing = range(10**6, 10**6 + 4)
+        with mock.patch.object(search, "INDEX_CHUNK_SIZE", 2), self.assertNumQueries(3):
+            search.index_readers([*missing, self.reader_profile.pk])
+        self.assertEqual(self.search("durand"), [self.reader_profile])
+
+    def test_index_follows_user_updates(self):
+        """Test that renaming the user updates the index."""
+        self.reader_user.last_name = "Martin"
+        self.reader_user.save()
+        self.assertEqual(self.search("martin"), [self.reader_profile])
+        self.assertEqual(self.search("durand"), [])
+
+    def test_index_follows_deletion(self):
+        """Test that deleted readers leave the index."""
+        self.reader_user.delete()
+        self.assertEqual(self.search("durand"), [])
+
+    def test_rebuild_index(self):
+        """Test that rebuilding the index keeps readers searchable."""
+        call_command("rebuild_reader_search", stdout=StringIO())
+        self.assertEqual(self.search("BIB01"), [self.reader_profile])
+
+    def test_reader_list_uses_index(self):
+        """Test that the staff reader list searches through the index."""
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(
+            reverse("accounts:reader_list"), {"search": "helene"}
+        )
+        self.assertContains(response, "BIB01-123456")
+        response = self.client.get(reverse("accounts:reader_list"), {"search": "zzz"})
+        self.assertNotContains(response, "BIB01-123456")
+
+
+class CursorPaginationTests(TestCase):
+    """Tests for keyset pagination of the staff lists."""
+
+    def setUp(self):
+        self.client = Client()
+        self.library = Library.objects.create(name="Test Lib", code="TL01")
+        self.staff = User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        for i in range(25):
+            user = User.objects.create(
+                username=f"reader{i:02d}",
+                user_type=User.UserType.READER,
+                library=self.library,
+            )
+            ReaderProfile.objects.create(
+                user=user, card_number=f"RDR{i:03d}", gdpr_consent=True
+            )
+
+    def test_paginator_walks_forward_and_back(self):
+        """Test that next and previous cursors cover every row once."""
+        paginator = CursorPaginator(
+            ReaderProfile.objects.all(), 10, ("-created_at", "-id")
+        )
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+        cards = [p.card_number for page in (first, second, third) for p in page]
+        self.assertEqual(cards, [f"RDR{i:03d}" for i in range(24, -1, -1)])
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertTrue(back.has_previous())
+
+    def test_reader_list_cursor_keeps_search(self):
+        """Test that the reader list exposes cursors and keeps the search."""
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(reverse("accounts:reader_list"), {"search": "rdr"})
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 20)
+        self.assertContains(response, f"cursor={page.next_cursor}&search=rdr")
+
+        response = self.client.get(
+            reverse("accounts:reader_list"),
+            {"search": "rdr", "cursor": page.next_cursor},
+        )
+        self.assertEqual(len(response.context["readers"]), 5)
+        self.assertContains(response, "RDR000")
+
+    def test_invalid_cursor_returns_404(self):
+        """Test that a tampered cursor is rejected."""
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(reverse("accounts:reader_list"), {"cursor": "xx"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_library_list_cursor(self):
+        """Test that the library list paginates on (name, id)."""
+        User.objects.create_user(
+            username="admin",
+            password="adminpass123",
+            user_type=User.UserType.SUPERADMIN,
+        )
+        for i in range(20):
+            Library.objects.create(name=f"Lib {i:02d}", code=f"LIB{i:02d}")
+        self.client.login(username="admin", password="adminpass123")
+        response = self.client.get(reverse("accounts:library_list"))
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_next())
+        response = self.client.get(
+            reverse("accounts:library_list"), {"cursor": page.next_cursor}
+        )
+        self.assertEqual(
+            [library.name for library in response.context["libraries"]],
+            ["Test Lib"],
+        )
+
+
+@override_settings(COUNT_EXACT_THRESHOLD=2)
+class CountProviderTests(TestCase):
+    """Tests for the cached reader count provider."""
+
+    def setUp(self):
+        cache.clear()
+        self.library = Library.objects.create(name="Test Lib", code="TL01")
+        for i in range(3):
+            self.create_reader(i)
+
+    def create_reader(self, i):
+        user = User.objects.create(
+            username=f"reader{i}",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        return ReaderProfile.objects.create(
+            user=user, card_number=f"RDR{i:03d}", gdpr_consent=True
+        )
+
+    def test_exact_below_threshold(self):
+        """Test that small counts are exact and never cached."""
+        User.objects.filter(username="reader0").delete()
+        User.objects.filter(username="reader1").update(user_type="library")
+        self.assertEqual(count_library_readers(self.library), 1)
+
+    def test_cached_above_threshold(self):
+        """Test that large counts are served from the cache."""
+        self.assertEqual(count_library_readers(self.library), 3)
+        # Une mise à jour en masse ne déclenche pas de signal
+        User.objects.filter(username="reader0").update(user_type="library")
+        with self.assertNumQueries(0):
+            self.assertEqual(count_library_readers(self.library), 3)
+
+    def test_invalidated_by_reader_creation_and_deletion(self):
+        """Test that reader create/delete signals invalidate cached counts."""
+        self.assertEqual(count_library_readers(self.library), 3)
+        profile = self.create_reader(3)
+        self.assertEqual(count_library_readers(self.library), 4)
+        profile.user.delete()
+        self.assertEqual(count_library_readers(self.library), 3)
+
+    def test_invalidated_by_library_change(self):
+        """Test that moving a reader invalidates both libraries' counts."""
+        other = Library.objects.create(name="Other Lib", code="TL02")
+        for i in range(3, 6):
+            profile = self.create_reader(i)
+            profile.user.library = other
+            profile.user.save()
+        self.assertEqual(count_library_readers(self.library), 3)
+        self.assertEqual(count_library_readers(other), 3)
+        user = User.objects.get(username="reader0")
+        user.library = other
+        user.save()
+        self.assertEqual(count_library_readers(self.library), 2)
+        self.assertEqual(count_library_readers(other), 4)
+
+
+class LibraryStatsTests(TestCase):
+    """Tests for the denormalized per-library counters."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Test Lib", code="TL01")
+        self.library2 = Library.objects.create(name="Other Lib", code="TL02")
+        User.objects.create(
+            username="staff", user_type=User.UserType.LIBRARY, library=self.library
+        )
+        self.reader_user = User.objects.create(
+            username="reader", user_type=User.UserType.READER, library=self.library
+        )
+        self.profile = ReaderProfile.objects.create(
+            user=self.reader_user, card_number="RDR001", gdpr_consent=True
+        )
+
+    def assertStats(self, library, readers, active, blocked, staff):
+        stats = LibraryStats.objects.get(library=library)
+        self.assertEqual(
+            (stats.readers, stats.active_readers, stats.blocked_readers, stats.staff),
+            (readers, active, blocked, staff),
+        )
+
+    def test_counters_follow_creation(self):
+        """Test that creating users and profiles updates the counters."""
+        self.assertStats(self.library, 1, 1, 0, 1)
+        self.assertStats(self.library2, 0, 0, 0, 0)
+
+    def test_counters_follow_profile_status(self):
+        """Test that blocking and deactivating a reader updates the counters."""
+        self.profile.is_blocked = True
+        self.profile.save()
+        self.assertStats(self.library, 1, 1, 1, 1)
+        self.profile.is_active = False
+        self.profile.save()
+        self.assertStats(self.library, 1, 0, 1, 1)
+
+    def test_counters_follow_library_change(self):
+        """Test that moving a reader moves all its counters."""
+        self.reader_user.library = self.library2
+        self.reader_user.save()
+        self.assertStats(self.library, 0, 0, 0, 1)
+        self.assertStats(self.library2, 1, 1, 0, 0)
+
+    def test_counters_follow_deletion(self):
+        """Test that deleting a reader decrements the counters."""
+        self.reader_user.delete()
+        self.assertStats(self.library, 0, 0, 0, 1)
+
+    def test_drifted_counters_do_not_block_deletion(self):
+        """Test that decrementing a counter already at zero stops at zero."""
+        LibraryStats.objects.filter(library=self.library).update(
+            readers=0, active_readers=0
+        )
+        self.reader_user.delete()
+        self.assertFalse(User.objects.filter(pk=self.reader_user.pk).exists())
+        self.assertStats(self.library, 0, 0, 0, 1)
+
+    def test_rebuild_repairs_drift(self):
+        """Test that the rebuild command repairs counters changed in bulk."""
+        ReaderProfile.objects.update(is_blocked=True)
+        LibraryStats.objects.filter(library=self.library2).delete()
+        out = StringIO()
+        call_command("rebuild_library_stats", stdout=out)
+        self.assertIn("2 corrigée(s)", out.getvalue())
+        self.assertStats(self.library, 1, 1, 1, 1)
+        self.assertStats(self.library2, 0, 0, 0, 0)
+
+    def test_library_list_without_per_row_queries(self):
+        """Test that the library list reads counters in a single query."""
+        User.objects.create_user(
+            username="admin",
+            password="adminpass123",
+            user_type=User.UserType.SUPERADMIN,
+        )
+        self.client.login(username="admin", password="adminpass123")
+        response = self.client.get(reverse("accounts:library_list"))
+        readers = {lib.code: lib.stats.readers for lib in response.context["libraries"]}
+        self.assertEqual(readers, {"TL01": 1, "TL02": 0})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("accounts:library_list"))
+        stats_queries = [q for q in queries if "accounts_librarystats" in q["sql"]]
+        self.assertEqual(len(stats_queries), 1)
+
+
+class QueryPlanTests(TestCase):
+    """Tests that the view, admin and API querysets are served by indexes."""
+
+    SCAN_RE = re.compile(r"\bSCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Test Lib", code="TL01")
+        self.user = User.objects.create(
+            username="reader", user_type=User.UserType.READER, library=self.library
+        )
+        self.partial_indexes = {
+            index.name
+            for model in (Library, User, ReaderProfile)
+            for index in model._meta.indexes
+            if index.condition is not None
+        }
+
+    def assertNoFullScan(self, queryset, ordered_page=False):
+        """
+        Fail on a table scan. A scan through an index is accepted when it
+        reads a partial index, or walks an ordering index for a LIMITed page.
+        """
+        if connection.vendor != "sqlite":
+            self.skipTest("Plans de requête vérifiés sous SQLite uniquement.")
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            match = self.SCAN_RE.search(line)
+            if not match or "VIRTUAL TABLE" in line:
+                continue
+            table, index = match.groups()
+            if index is None:
+                self.fail(f"Parcours complet de {table} :\n{plan}")
+            if index not in self.partial_indexes and not ordered_page:
+                self.fail(f"Parcours complet de l'index {index} :\n{plan}")
+
+    def test_reader_list_queries(self):
+        """Test the staff reader list page and search."""
+        qs = ReaderProfile.objects.select_related("user", "user__library")
+        ordering = ("-created_at", "-id")
+        self.assertNoFullScan(qs.order_by(*ordering)[:21], ordered_page=True)
+        self.assertNoFullScan(
+            qs.filter(user__library=self.library).order_by(*ordering)[:21]
+        )
+        self.assertNoFullScan(search_readers(qs, "dupont").order_by(*ordering)[:21])
+
+    def test_library_queries(self):
+        """Test the library list, detail statistics and public API."""
+        self.assertNoFullScan(
+            Library.objects.select_related("stats").order_by("name", "id")[:21],
+            ordered_page=True,
+        )
+        self.assertNoFullScan(self.library.users.filter(user_type=User.UserType.READER))
+        self.assertNoFullScan(
+            self.library.users.filter(user_type=User.UserType.LIBRARY)
+        )
+        self.assertNoFullScan(Library.objects.filter(is_active=True))
+
+    def test_admin_filters(self):
+        """Test the admin list filters on users and reader profiles."""
+        self.assertNoFullScan(
+            ReaderProfile.objects.filter(is_blocked=True).order_by("card_number")
+        )
+        self.assertNoFullScan(
+            ReaderProfile.objects.filter(is_active=False).order_by("card_number")
+        )
+        self.assertNoFullScan(
+            User.objects.filter(user_type=User.UserType.READER).order_by("username")
+        )
+        self.assertNoFullScan(
+            User.objects.filter(library=self.library).order_by("username")
+        )
+
+    def test_reader_me_query(self):
+        """Test the profile lookup behind /api/v1/readers/me/."""
+        self.assertNoFullScan(
+            ReaderProfile.objects.select_related("user__library").filter(user=self.user)
+        )
+
+
+class NormalizedNameTests(TestCase):
+    """Tests for accent- and case-insensitive name keys."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Test Lib", code="TL01")
+        self.user = User.objects.create(
+            username="hdurand",
+            user_type=User.UserType.READER,
+            library=self.library,
+            first_name="Hélène",
+            last_name="DE  L'ŒUVRE",
+        )
+        ReaderProfile.objects.create(
+            user=self.user,
+            card_number="RDR001",
+            birth_date=date(1990, 5, 1),
+            gdpr_consent=True,
+        )
+
+    def test_normalize_name(self):
+        """Test that accents, case, ligatures and spacing are folded."""
+        self.assertEqual(normalize_name("Hélène"), "helene")
+        self.assertEqual(normalize_name("DE  L'ŒUVRE"), "de l'oeuvre")
+        self.assertEqual(normalize_name(""), "")
+
+    def test_keys_filled_on_save(self):
+        """Test that the keys follow name changes, including partial saves."""
+        self.assertEqual(self.user.normalized_first_name, "helene")
+        self.user.first_name = "Zoé"
+        self.user.save(update_fields=["first_name"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.normalized_first_name, "zoe")
+
+    def test_backfill_command(self):
+        """Test that the batched command fills missing keys."""
+        User.objects.update(normalized_first_name="", normalized_last_name="")
+        out = StringIO()
+        call_command("backfill_normalized_names", batch_size=1, stdout=out)
+        self.assertIn("1 mis à jour", out.getvalue())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.normalized_last_name, "de l'oeuvre")
+
+    def test_duplicate_reader_needs_confirmation(self):
+        """Test that staff must confirm before creating a possible duplicate."""
+        form = ReaderCreationForm(
+            {
+                "username": "hdurand2",
+                "first_name": "helene",
+                "last_name": "de l'oeuvre",
+                "birth_date": "1990-05-01",
+                "card_number": "RDR002",
+                "category": "adult",
+                "gdpr_consent": True,
+            },
+            library=self.library,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.duplicate_found)
+        self.assertIn("déjà inscrit", str(form.non_field_errors()))
+
+        form.data = {**form.data, "confirm_duplicate": "1"}
+        form.full_clean()
+        self.assertTrue(form.is_valid())
+
+        form.data = {**form.data, "confirm_duplicate": "", "birth_date": "1991-05-01"}
+        form.full_clean()
+        self.assertTrue(form.is_valid())
+
+    def test_duplicate_confirmation_shown_only_after_match(self):
+        """Test that the confirmation checkbox appears once, after a match."""
+        User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        self.client.login(username="staff", password="staffpass123")
+        url = reverse("accounts:reader_create")
+        self.assertNotContains(self.client.get(url), "id_confirm_duplicate")
+
+        response = self.client.post(
+            url,
+            {
+                "username": "hdurand2",
+                "first_name": "Hélène",
+                "last_name": "De l'Œuvre",
+                "birth_date": "1990-05-01",
+                "card_number": "RDR002",
+                "category": "adult",
+                "gdpr_consent": "on",
+            },
+        )
+        self.assertContains(response, 'id="id_confirm_duplicate"', count=1)
+
+    def test_homonym_can_self_register(self):
+        """Test that public registration neither blocks nor reveals homonyms."""
+        response = self.client.post(
+            reverse("accounts:register"),
+            {
+                "library": self.library.pk,
+                "username": "hdurand2",
+                "email": "hdurand2@example.com",
+                "password1": "securepass123",
+                "password2": "securepass123",
+                "first_name": "Helene",
+                "last_name": "de l'Oeuvre",
+                "birth_date": "1990-05-01",
+                "category": "adult",
+                "gdpr_consent": True,
+            },
+        )
+        self.assertRedirects(response, reverse("accounts:register_success"))
+        self.assertEqual(
+            ReaderProfile.objects.filter(user__normalized_first_name="helene").count(),
+            2,
+        )
+
+
+class ReaderTypeaheadTests(TestCase):
+    """Tests for the in-memory card number / name typeahead."""
+
+    def setUp(self):
+        typeahead.clear()
+        self.client = Client()
+        self.library = Library.objects.create(name="Test Lib", code="BIB01")
+        self.library2 = Library.objects.create(name="Other Lib", code="BIB02")
+        self.staff = User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        self.profile = self.create_reader(
+            "hdurand", "Hélène", "Durand", "BIB01-123456", self.library
+        )
+        self.create_reader("pmartin", "Paul", "Martin", "BIB02-123456", self.library2)
+
+    def tearDown(self):
+        typeahead.clear()
+
+    def create_reader(self, username, first_name, last_name, card, library):
+        user = User.objects.create(
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+            user_type=User.UserType.READER,
+            library=library,
+        )
+        return ReaderProfile.objects.create(
+            user=user, card_number=card, gdpr_consent=True
+        )
+
+    def cards(self, query):
+        return [r["card_number"] for r in typeahead.search(self.library.pk, query)]
+
+    def test_prefix_lookup_scoped_to_library(self):
+        """Test card and name prefixes within a single library."""
+        self.assertEqual(self.cards("BIB01-12"), ["BIB01-123456"])
+        self.assertEqual(self.cards("hel"), ["BIB01-123456"])
+        self.assertEqual(self.cards("durand h"), ["BIB01-123456"])
+        self.assertEqual(self.cards("BIB02"), [])
+        self.assertEqual(self.cards(""), [])
+
+    def test_incremental_refresh(self):
+        """Test that committed reader changes reach a loaded index."""
+        self.assertEqual(self.cards("BIB01"), ["BIB01-123456"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_reader(
+                "jdupont", "Jean", "Dupont", "BIB01-654321", self.library
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.user.last_name = "Bernard"
+            self.profile.user.save()
+        self.assertEqual(self.cards("dup"), ["BIB01-654321"])
+        self.assertEqual(self.cards("bern"), ["BIB01-123456"])
+        self.assertEqual(self.cards("durand"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.user.delete()
+        self.assertEqual(self.cards("BIB01"), ["BIB01-654321"])
+
+    def test_stale_index_served_during_single_reload(self):
+        """Test that a stale index is served while one background reload runs."""
+        self.assertEqual(self.cards("BIB01"), ["BIB01-123456"])
+        index = typeahead.get_index(self.library.pk)
+        # Lecteur créé par un autre processus : l'index n'est pas prévenu
+        self.create_reader("jdupont", "Jean", "Dupont", "BIB01-654321", self.library)
+        index.loaded_at -= settings.TYPEAHEAD_MAX_AGE + 1
+
+        with mock.patch.object(typeahead.threading, "Thread") as thread:
+            with self.assertNumQueries(0):
+                self.assertEqual(self.cards("BIB01"), ["BIB01-123456"])
+                self.assertEqual(self.cards("BIB01"), ["BIB01-123456"])
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        thread.call_args.kwargs["target"]()
+        self.assertFalse(index.reload_lock.locked())
+        self.assertEqual(self.cards("BIB01"), ["BIB01-123456", "BIB01-654321"])
+
+    def test_typeahead_view(self):
+        """Test the JSON endpoint for library staff."""
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(reverse("accounts:reader_typeahead"), {"q": "bib"})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["card_number"] for r in results], ["BIB01-123456"])
+        self.assertEqual(
+            results[0]["url"],
+            reverse("accounts:reader_detail", args=[self.profile.pk]),
+        )
+
+
+class ReaderByCardTests(APITestCase):
+    """Tests for the scanner-driven card number lookup."""
+
+    def setUp(self):
+        cache.clear()
+        self.library = Library.objects.create(name="Test Lib", code="BIB01")
+        self.library2 = Library.objects.create(name="Other Lib", code="BIB02")
+        self.staff = User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        self.reader_user = User.objects.create(
+            username="reader", user_type=User.UserType.READER, library=self.library
+        )
+        self.profile = ReaderProfile.objects.create(
+            user=self.reader_user, card_number="BIB01-000001", gdpr_consent=True
+        )
+
+    def test_web_lookup_redirects_to_detail(self):
+        """Test that a scan redirects straight to the reader detail page."""
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(
+            reverse("accounts:reader_by_card", args=["bib01-000001"])
+        )
+        self.assertRedirects(
+            response, reverse("accounts:reader_detail", args=[self.profile.pk])
+        )
+        response = self.client.get(
+            reverse("accounts:reader_by_card", args=["BIB01-999999"])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_web_lookup_scoped_to_library(self):
+        """Test that staff cannot resolve cards of another library."""
+        self.reader_user.library = self.library2
+        self.reader_user.save()
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(
+            reverse("accounts:reader_by_card", args=["BIB01-000001"])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_lookup_denied_to_staff_without_library(self):
+        """Test that staff without a library cannot probe card numbers."""
+        User.objects.filter(pk=self.staff.pk).update(library=None)
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(
+            reverse("accounts:reader_by_card", args=["BIB01-000001"])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.staff.refresh_from_db()
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse("reader-by-card", args=["BIB01-000001"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_hot_cache_and_invalidation(self):
+        """Test that repeated scans hit the cache until the profile is saved."""
+        self.assertEqual(lookup_card("BIB01-000001")["pk"], self.profile.pk)
+        with self.assertNumQueries(0):
+            lookup_card("BIB01-000001")
+        self.profile.delete()
+        self.assertIsNone(lookup_card("BIB01-000001"))
+
+    def test_renumbered_card_no_longer_resolves(self):
+        """Test that the previous card number is evicted from the cache."""
+        self.assertEqual(lookup_card("BIB01-000001")["pk"], self.profile.pk)
+        self.profile.card_number = "BIB01-000002"
+        self.profile.save()
+
+        self.client.login(username="staff", password="staffpass123")
+        response = self.client.get(
+            reverse("accounts:reader_by_card", args=["BIB01-000001"])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse("reader-by-card", args=["BIB01-000001"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(lookup_card("BIB01-000002")["pk"], self.profile.pk)
+
+    def test_api_lookup(self):
+        """Test the staff API lookup and its permissions."""
+        url = reverse("reader-by-card", args=["BIB01-000001"])
+        self.client.force_authenticate(self.reader_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.profile.pk)
+        self.assertEqual(response.data["user"]["username"], "reader")
+
+
+class LibraryAPICacheTests(APITestCase):
+    """Tests for cached, conditional responses of the library API."""
+
+    def setUp(self):
+        cache.clear()
+        self.library = Library.objects.create(name="API Lib", code="API01")
+
+    def test_list_served_from_cache(self):
+        """Test that repeated list requests do not touch the database."""
+        first = self.client.get(reverse("library-list"))
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("library-list"))
+        self.assertEqual(second.data, first.data)
+
+    def test_if_none_match_returns_304(self):
+        """Test ETag revalidation of an unchanged list."""
+        etag = self.client.get(reverse("library-list"))["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("library-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_library_change_bumps_version(self):
+        """Test that saving a library invalidates cached responses."""
+        url = reverse("library-detail", args=[self.library.pk])
+        etag = self.client.get(url)["ETag"]
+        self.library.name = "Renamed"
+        self.library.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Renamed")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_not_found_not_cached(self):
+        """Test that error responses are not cached."""
+        url = reverse("library-detail", args=[self.library.pk + 1])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        Library.objects.create(pk=self.library.pk + 1, name="New", code="NEW01")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class ReaderMeCacheTests(APITestCase):
+    """Tests for the versioned /readers/me/ response cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.library = Library.objects.create(name="API Lib", code="API01")
+        self.reader_user = User.objects.create(
+            username="apireader", user_type=User.UserType.READER, library=self.library
+        )
+        self.profile = ReaderProfile.objects.create(
+            user=self.reader_user, card_number="APIRDR001", gdpr_consent=True
+        )
+        self.client.force_authenticate(self.reader_user)
+
+    def test_cached_and_revalidated(self):
+        """Test that polls are served from the cache or answered with 304."""
+        first = self.client.get(reverse("reader-me"))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("reader-me"))
+            not_modified = self.client.get(
+                reverse("reader-me"), HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_bumps_version(self):
+        """Test that PATCH /readers/me/ invalidates the cached profile."""
+        etag = self.client.get(reverse("reader-me"))["ETag"]
+        self.client.patch(
+            reverse("reader-me"),
+            {"city": "Lyon", "email": "new@example.com"},
+            format="json",
+        )
+        response = self.client.get(reverse("reader-me"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["city"], "Lyon")
+        self.assertEqual(response.data["email"], "new@example.com")
+
+    def test_library_change_bumps_version(self):
+        """Test that a library change reaches its readers' cached profiles."""
+        self.client.get(reverse("reader-me"))
+        self.library.name = "Renamed"
+        self.library.save()
+        response = self.client.get(reverse("reader-me"))
+        self.assertEqual(response.data["library"]["name"], "Renamed")
+
+    def test_cache_is_per_reader(self):
+        """Test that readers never see each other's cached profile."""
+        self.client.get(reverse("reader-me"))
+        other = User.objects.create(
+            username="other", user_type=User.UserType.READER, library=self.library
+        )
+        ReaderProfile.objects.create(
+            user=other, card_number="APIRDR002", gdpr_consent=True
+        )
+        self.client.force_authenticate(other)
+        response = self.client.get(reverse("reader-me"))
+        self.assertEqual(response.data["card_number"], "APIRDR002")
+
+
+class ClaimsAuthenticationTests(APITestCase):
+    """Tests for the claims-based JWT authentication of reader endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        authentication.clear()
+        self.library = Library.objects.create(name="API Lib", code="API01")
+        self.reader_user = User.objects.create_user(
+            username="apireader",
+            password="apipass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        ReaderProfile.objects.create(
+            user=self.reader_user, card_number="APIRDR001", gdpr_consent=True
+        )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "apireader", "password": "apipass123"},
+        )
+        self.token = response.data["access"]
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, method="get"):
+        request = getattr(self.factory, method)(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_reads_use_claims(self):
+        """Test that safe requests get a ClaimsUser without a user query."""
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.reader_user.pk)
+        self.assertEqual(user.library_id, self.library.pk)
+        self.assertTrue(user.is_reader)
+
+    def test_writes_load_user(self):
+        """Test that unsafe requests fall back to the database user."""
+        self.assertIsInstance(self.authenticate("patch"), User)
+
+    def test_stale_claims_load_user(self):
+        """Test that claims no longer matching the account are not trusted."""
+        other = Library.objects.create(name="Other Lib", code="OTH01")
+        self.reader_user.library = other
+        self.reader_user.save()
+        user = self.authenticate()
+        self.assertIsInstance(user, User)
+        self.assertEqual(user.library_id, other.pk)
+
+    def test_deactivated_user_rejected(self):
+        """Test that a deactivated account is refused despite a valid token."""
+        self.authenticate()
+        self.reader_user.is_active = False
+        self.reader_user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        response = self.client.get(reverse("reader-me"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reader_me_poll_without_queries(self):
+        """Test that a cached /readers/me/ poll runs no query at all."""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        first = self.client.get(reverse("reader-me"))
+        self.assertEqual(first.data["card_number"], "APIRDR001")
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("reader-me"))
+        self.assertEqual(second.data, first.data)
+        response = self.client.patch(
+            reverse("reader-me"), {"city": "Lyon"}, format="json"
+        )
+        self.assertEqual(response.data["city"], "Lyon")
+
+
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=3600)
+class TokenBlacklistTests(APITestCase):
+    """Tests for the refresh-token blacklist and its Bloom filter."""
+
+    def setUp(self):
+        blacklist.clear()
+        self.user = User.objects.create_user(
+            username="apireader", password="apipass123"
+        )
+
+    def obtain_refresh(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "apireader", "password": "apipass123"},
+        )
+        return response.data["refresh"]
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Test that every added key is reported as present."""
+        bloom = blacklist.BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_rotated_token_is_rejected(self):
+        """Test that a refresh token cannot be reused after rotation."""
+        refresh = self.obtain_refresh()
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data["refresh"], refresh)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+        replay = self.client.post(reverse("token_refresh"), {"refresh": refresh})
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+        rotated = self.client.post(
+            reverse("token_refresh"), {"refresh": response.data["refresh"]}
+        )
+        self.assertEqual(rotated.status_code, status.HTTP_200_OK)
+
+    def test_unknown_jti_needs_no_query(self):
+        """Test that the Bloom filter answers for non-revoked tokens."""
+        blacklist.add("revoked", timezone.now() + timedelta(days=1))
+        blacklist.is_blacklisted("warm-up")
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist.is_blacklisted("fresh"))
+        self.assertTrue(blacklist.is_blacklisted("revoked"))
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=0)
+    def test_other_process_revocations_synced(self):
+        """Test that rows written by another process reach the filter."""
+        blacklist.is_blacklisted("warm-up")
+        BlacklistedToken.objects.create(
+            jti="elsewhere", expires_at=timezone.now() + timedelta(days=1)
+        )
+        self.assertTrue(blacklist.is_blacklisted("elsewhere"))
+
+    @override_settings(TOKEN_BLACKLIST_BLOOM_MIN_CAPACITY=10)
+    def test_stale_filter_rebuilt_in_background(self):
+        """Test that an old filter is served while one thread rebuilds it."""
+        blacklist.is_blacklisted("warm-up")
+        small = blacklist._state["filter"]
+        BlacklistedToken.objects.bulk_create(
+            BlacklistedToken(
+                jti=f"jti-{i}", expires_at=timezone.now() + timedelta(days=1)
+            )
+            for i in range(50)
+        )
+        blacklist._state["loaded_at"] -= settings.TOKEN_BLACKLIST_BLOOM_MAX_AGE + 1
+
+        with mock.patch.object(blacklist.threading, "Thread") as thread:
+            blacklist.is_blacklisted("fresh")
+            blacklist.is_blacklisted("fresh")
+        thread.assert_called_once()
+        self.assertIs(blacklist._state["filter"], small)
+
+        thread.call_args.kwargs["target"]()
+        self.assertFalse(blacklist._rebuild_lock.locked())
+        rebuilt = blacklist._state["filter"]
+        self.assertGreater(rebuilt.size, small.size)
+        self.assertIn("jti-49", rebuilt)
+
+    def test_prune_command(self):
+        """Test that pruning deletes expired rows only, in batches."""
+        now = timezone.now()
+        BlacklistedToken.objects.bulk_create(
+            [
+                BlacklistedToken(jti=f"old-{i}", expires_at=now - timedelta(days=1))
+                for i in range(5)
+            ]
+            + [BlacklistedToken(jti="live", expires_at=now + timedelta(days=1))]
+        )
+        out = StringIO()
+        call_command("prune_token_blacklist", batch_size=2, stdout=out)
+        self.assertIn("5 jeton(s)", out.getvalue())
+        self.assertEqual(
+            list(BlacklistedToken.objects.values_list("jti", flat=True)), ["live"]
+        )
+
+
+class IdentityLoadingTests(APITestCase):
+    """Tests for loading the user, library and reader profile in one query."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Test Lib", code="TL01")
+        self.reader_user = User.objects.create_user(
+            username="reader",
+            password="readerpass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        ReaderProfile.objects.create(
+            user=self.reader_user, card_number="RDR001", gdpr_consent=True
+        )
+
+    def test_profile_page_queries(self):
+        """Test that the profile page needs only the session and user queries."""
+        self.client.login(username="reader", password="readerpass123")
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("accounts:profile"))
+        self.assertContains(response, "RDR001")
+        self.assertContains(response, "Test Lib")
+
+    def test_sessions_from_model_backend_stay_valid(self):
+        """Test that sessions opened with ModelBackend are still accepted."""
+        self.client.force_login(
+            self.reader_user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        response = self.client.get(reverse("accounts:profile"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.reader_user)
+
+    def test_jwt_user_lookup(self):
+        """Test that the JWT user comes with its library and reader profile."""
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "reader", "password": "readerpass123"},
+        )
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {response.data['access']}"
+        )
+        with self.assertNumQueries(1):
+            user, _token = IdentityJWTAuthentication().authenticate(request)
+            self.assertEqual(user.library.code, "TL01")
+            self.assertEqual(user.reader_profile.card_number, "RDR001")
+
+    def test_user_without_profile(self):
+        """Test that a missing reader profile is known without a query."""
+        staff = User.objects.create_user(
+            username="staff", password="staffpass123", library=self.library
+        )
+        self.client.force_login(staff)
+        response = self.client.get(reverse("accounts:profile"))
+        with self.assertNumQueries(0):
+            self.assertFalse(hasattr(response.wsgi_request.user, "reader_profile"))
+
+
+class ReaderImportTests(TestCase):
+    """Tests for the bulk CSV reader import."""
+
+    def setUp(self):
+        cache.clear()
+        self.library = Library.objects.create(name="Import Lib", code="IMP01")
+        self.staff = User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        existing = User.objects.create(
+            username="existing", user_type=User.UserType.READER, library=self.library
+        )
+        ReaderProfile.objects.create(
+            user=existing, card_number="CARD-000", gdpr_consent=True
+        )
+
+    def test_import_creates_readers_and_derived_data(self):
+        """Test that imported readers are searchable and counted."""
+        lines = [
+            "username;card_number;first_name;last_name;birth_date;gdpr_consent\n",
+            "amelie;card-001;Amélie;Poulain;1990-04-25;oui\n",
+            "jules;CARD-002;Jules;Verne;;1\n",
+        ]
+        report = ReaderImporter(self.library, batch_size=1, workers=1).run(lines)
+
+        self.assertEqual((report.created, report.rejected), (2, 0))
+        profile = ReaderProfile.objects.select_related("user").get(
+            card_number="CARD-001"
+        )
+        self.assertEqual(profile.user.normalized_first_name, "amelie")
+        self.assertEqual(profile.user.library, self.library)
+        self.assertFalse(profile.user.has_usable_password())
+        self.assertIsNotNone(profile.gdpr_consent_date)
+        self.assertEqual(
+            list(search_readers(ReaderProfile.objects.all(), "poulain")), [profile]
+        )
+        self.assertEqual(LibraryStats.objects.get(library=self.library).readers, 3)
+        self.assertEqual(count_library_readers(self.library), 3)
+
+    def test_invalid_rows_rejected(self):
+        """Test that invalid or duplicate rows are reported and skipped."""
+        lines = [
+            "username,card_number,first_name,last_name,category,gdpr_consent\n",
+            "existing,CARD-010,Ann,Lee,adult,1\n",
+            "ann,CARD-000,Ann,Lee,adult,1\n",
+            "bob,CARD-011,Bob,Ray,adult,0\n",
+            "carl,CARD-012,Carl,Ray,wizard,1\n",
+            "dana,CARD-013,Dana,Ray,adult,1\n",
+            "dana,CARD-014,Dana,Ray,adult,1\n",
+        ]
+        report = ReaderImporter(self.library, workers=1).run(lines)
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _msg in report.errors], [2, 3, 4, 5, 7])
+
+    def test_missing_columns(self):
+        """Test that a file without the required columns imports nothing."""
+        report = ReaderImporter(self.library).run(["username,email\n", "a,b\n"])
+        self.assertEqual(report.created, 0)
+        self.assertIn("card_number", report.errors[0][1])
+
+    def test_passwords_hashed_in_pool(self):
+        """Test that provided passwords are hashed by worker processes."""
+        lines = [
+            "username,card_number,first_name,last_name,password,gdpr_consent\n",
+            "eve,CARD-020,Eve,Moon,secret-eve-1,1\n",
+            "finn,CARD-021,Finn,Moon,secret-finn-1,1\n",
+        ]
+        report = ReaderImporter(self.library, workers=2).run(lines)
+        self.assertEqual(report.created, 2)
+        self.assertTrue(
+            User.objects.get(username="finn").check_password("secret-finn-1")
+        )
+
+    def test_command(self):
+        """Test the import_readers management command report."""
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / "r.csv"
+        path.write_text(
+            "username,card_number,first_name,last_name,gdpr_consent\n"
+            "hal,CARD-040,Hal,Sun,1\n",
+            encoding="utf-8",
+        )
+        out = StringIO()
+        call_command("import_readers", path, library="IMP01", workers=1, stdout=out)
+        self.assertIn("1 lecteur(s) importé(s), 0 ligne(s)", out.getvalue())
+
+    def test_decode_error_keeps_imported_rows(self):
+        """Test that a mid-file encoding error reports the rows already imported."""
+
+        def lines():
+            yield "username,card_number,first_name,last_name,gdpr_consent\n"
+            yield "ivy,CARD-050,Ivy,Sun,1\n"
+            yield "jon,CARD-051,Jon,Sun,1\n"
+            b"\xff".decode("utf-8")
+
+        report = ReaderImporter(self.library, batch_size=1, workers=1).run(lines())
+        self.assertEqual(report.created, 2)
+        self.assertEqual(len(report.errors), 1)
+        line_number, message = report.errors[0]
+        self.assertEqual(line_number, 4)
+        self.assertIn("UTF-8", message)
+
+    @override_settings(READER_IMPORT_MAX_UPLOAD_SIZE=120, READER_IMPORT_MAX_PASSWORDS=1)
+    def test_upload_view_limits(self):
+        """Test that large or non UTF-8 uploads are refused before importing."""
+        self.client.login(username="staff", password="staffpass123")
+        header = b"username,card_number,first_name,last_name,password,gdpr_consent\n"
+        uploads = {
+            "volumineux": header + b"kim,CARD-060,Kim,Sun,,1\n" * 3,
+            "mots de passe": header + b"k,CARD-060,K,S,pw,1\n" * 2,
+            "doit être encodé": header[:40] + "é".encode("latin-1") + b"\n",
+        }
+        for expected, content in uploads.items():
+            upload = SimpleUploadedFile("readers.csv", content)
+            response = self.client.post(
+                reverse("accounts:reader_import"), {"file": upload}
+            )
+            self.assertContains(response, expected)
+        self.assertFalse(ReaderProfile.objects.filter(card_number="CARD-060").exists())
+
+    def test_upload_view(self):
+        """Test the staff CSV upload page."""
+        self.client.login(username="staff", password="staffpass123")
+        upload = SimpleUploadedFile(
+            "readers.csv",
+            b"username,card_number,first_name,last_name,gdpr_consent\n"
+            b"gil,CARD-030,Gil,Sun,1\n",
+        )
+        response = self.client.post(reverse("accounts:reader_import"), {"file": upload})
+        self.assertContains(response, "1 lecteur import")
+        self.assertTrue(
+            ReaderProfile.objects.filter(
+                card_number="CARD-030", user__library=self.library
+            ).exists()
+        )
+
+
+class ReaderExportTests(TestCase):
+    """Tests for the streaming reader export."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Export Lib", code="EXP01")
+        other = Library.objects.create(name="Other Lib", code="OTH01")
+        self.staff = User.objects.create_user(
+            username="staff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        for index, library in enumerate([self.library, self.library, other]):
+            user = User.objects.create(
+                username=f"reader{index}",
+                first_name="Zoé",
+                last_name="Martin",
+                user_type=User.UserType.READER,
+                library=library,
+            )
+            ReaderProfile.objects.create(
+                user=user,
+                card_number=f"EXP-{index}",
+                birth_date=date(2000, 1, index + 1),
+                gdpr_consent=True,
+            )
+        self.client.login(username="staff", password="staffpass123")
+
+    def test_csv_export_is_streamed_and_scoped(self):
+        """Test that the CSV export streams the library's readers only."""
+        response = self.client.get(reverse("accounts:reader_export"))
+        self.assertTrue(response.streaming)
+        self.assertIn("EXP01", response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("username,card_number,first_name"))
+        self.assertEqual(len(lines), 3)
+        self.assertIn("reader0,EXP-0,Zoé,Martin,,adult,2000-01-01", lines[1])
+
+    def test_csv_export_can_be_reimported(self):
+        """Test that exported columns are accepted by the importer."""
+        ReaderProfile.objects.filter(card_number="EXP-0").update(phone="+33 1 23")
+        response = self.client.get(reverse("accounts:reader_export"))
+        content = b"".join(response.streaming_content).decode()
+        ReaderProfile.objects.all().delete()
+        User.objects.filter(user_type=User.UserType.READER).delete()
+        report = ReaderImporter(self.library, workers=1).run(
+            content.splitlines(keepends=True)
+        )
+        self.assertEqual((report.created, report.errors), (2, []))
+        self.assertEqual(
+            ReaderProfile.objects.get(card_number="EXP-0").phone, "+33 1 23"
+        )
+
+    def test_csv_export_neutralizes_formulas(self):
+        """Test that values starting like a formula are quoted for spreadsheets."""
+        User.objects.filter(username="reader0").update(
+            first_name='=HYPERLINK("http://evil.example")', last_name="@SUM(A1)"
+        )
+        response = self.client.get(reverse("accounts:reader_export"))
+        rows = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(
+            rows[1][2:4], ['\'=HYPERLINK("http://evil.example")', "'@SUM(A1)"]
+        )
+        self.assertEqual(rows[2][2:4], ["Zoé", "Martin"])
+
+    def test_jsonl_export(self):
+        """Test the JSON Lines export format."""
+        response = self.client.get(
+            reverse("accounts:reader_export"), {"format": "jsonl"}
+        )
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual([row["card_number"] for row in rows], ["EXP-0", "EXP-1"])
+        self.assertIs(rows[0]["gdpr_consent"], True)
+
+    def test_unknown_format(self):
+        """Test that an unknown export format is a 404."""
+        response = self.client.get(reverse("accounts:reader_export"), {"format": "xls"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_command(self):
+        """Test the export_readers management command."""
+        out = StringIO()
+        call_command(
+            "export_readers", library="EXP01", export_format="jsonl", stdout=out
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+
+class CardNumberAllocatorTests(TestCase):
+    """Tests for the per-library card number sequence."""
+
+    def setUp(self):
+        clear_card_blocks()
+        self.library = Library.objects.create(name="Seq Lib", code="seq01")
+
+    def test_sequential_numbers_with_check_digit(self):
+        """Test that numbers follow the library counter with a Luhn digit."""
+        numbers = [next_card_number(self.library) for _ in range(3)]
+        self.assertEqual(numbers, ["SEQ01-0000018", "SEQ01-0000026", "SEQ01-0000034"])
+        self.assertTrue(all(has_valid_check_digit(number) for number in numbers))
+        self.assertFalse(has_valid_check_digit("SEQ01-0000017"))
+        self.assertEqual(CardSequence.objects.get(library=self.library).next_value, 4)
+
+    def test_counters_are_per_library(self):
+        """Test that each library has its own counter."""
+        other = Library.objects.create(name="Other Lib", code="OTH01")
+        next_card_number(self.library)
+        self.assertEqual(next_card_number(other), "OTH01-0000018")
+
+    def test_reserved_numbers_rejected_for_manual_entry(self):
+        """Test that staff and imports cannot take a generated card number."""
+        self.assertTrue(is_reserved_card_number("seq01-0000026"))
+        self.assertFalse(is_reserved_card_number("SEQ01-0000027"))
+        self.assertFalse(is_reserved_card_number("SEQ01-000018"))
+        self.assertFalse(is_reserved_card_number("00000018"))
+
+        form = ReaderCreationForm(
+            {
+                "username": "manual",
+                "first_name": "Marc",
+                "last_name": "Manuel",
+                "card_number": "SEQ01-0000018",
+                "category": "adult",
+                "gdpr_consent": True,
+            },
+            library=self.library,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("card_number", form.errors)
+
+        lines = [
+            "username;card_number;first_name;last_name;gdpr_consent\n",
+            "imported;SEQ01-0000026;Ines;Import;oui\n",
+        ]
+        report = ReaderImporter(self.library, workers=1).run(lines)
+        self.assertEqual((report.created, report.rejected), (0, 1))
+        self.assertIn("réservé", report.errors[0][1])
+
+        # La prochaine inscription obtient bien son numéro
+        self.assertEqual(next_card_number(self.library), "SEQ01-0000018")
+
+    def test_model_validation_rejects_reserved_numbers(self):
+        """Test that admin edits cannot move a card into the sequence range."""
+        user = User.objects.create(
+            username="seqreader", user_type=User.UserType.READER, library=self.library
+        )
+        profile = ReaderProfile.objects.create(
+            user=user, card_number="MANUAL-1", gdpr_consent=True
+        )
+        profile.card_number = "SEQ01-0000026"
+        with self.assertRaises(ValidationError) as raised:
+            profile.full_clean()
+        self.assertIn("card_number", raised.exception.message_dict)
+
+        # Un numéro attribué par la séquence reste valide sur son profil
+        ReaderProfile.objects.filter(pk=profile.pk).update(card_number="SEQ01-0000026")
+        profile.full_clean()
+
+    @override_settings(CARD_NUMBER_BLOCK_SIZE=10)
+    def test_no_blocks_inside_transaction(self):
+        """Test that a rolled-back transaction cannot leak a cached block."""
+        next_card_number(self.library)
+        self.assertEqual(CardSequence.objects.get(library=self.library).next_value, 2)
+
+
+@override_settings(CARD_NUMBER_BLOCK_SIZE=10)
+class CardNumberBlockTests(TransactionTestCase):
+    """Tests for card number blocks reserved outside transactions."""
+
+    def setUp(self):
+        clear_card_blocks()
+        self.library = Library.objects.create(name="Seq Lib", code="SEQ01")
+
+    def tearDown(self):
+        clear_card_blocks()
+
+    def test_block_reserved_once(self):
+        """Test that a block serves several numbers with a single reservation."""
+        numbers = [next_card_number(self.library) for _ in range(12)]
+        self.assertEqual(len(set(numbers)), 12)
+        self.assertEqual(CardSequence.objects.get(library=self.library).next_value, 21)
+        self.assertEqual(numbers[11], "SEQ01-0000125")
+
+
+class EmailOutboxTests(TestCase):
+    """Tests for the database email outbox and its worker."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Mail Lib", code="MAIL01")
+
+    def register(self):
+        return self.client.post(
+            reverse("accounts:register"),
+            {
+                "library": self.library.pk,
+                "username": "newreader",
+                "email": "newreader@example.com",
+                "password1": "securepass123",
+                "password2": "securepass123",
+                "first_name": "Jean",
+                "last_name": "Dupont",
+                "category": "adult",
+                "gdpr_consent": True,
+            },
+        )
+
+    def test_registration_enqueues_without_sending(self):
+        """Test that registering queues the welcome email instead of sending it."""
+        self.register()
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(email.recipients, ["newreader@example.com"])
+
+        out = StringIO()
+        call_command("send_outbox", stdout=out)
+        self.assertIn("1 email(s) envoyé(s), 0 en échec", out.getvalue())
+        self.assertEqual(mail.outbox[0].to, ["newreader@example.com"])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.SENT)
+        self.assertEqual(email.body, "")
+
+    def test_rolled_back_transaction_drops_email(self):
+        """Test that an email is only queued if its transaction commits."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            outbox.enqueue("Sujet", "Corps", ["a@example.com"])
+            raise RuntimeError
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_one_connection_per_batch(self):
+        """Test that a batch is delivered over a single connection."""
+        for index in range(3):
+            outbox.enqueue("Sujet", "Corps", [f"r{index}@example.com"])
+        with mock.patch.object(EmailBackend, "open", autospec=True) as opened:
+            self.assertEqual(outbox.deliver_due(), (3, 0))
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=60)
+    def test_failure_backoff_then_gives_up(self):
+        """Test that failures are retried later, then marked as failed."""
+        email = outbox.enqueue("Sujet", "Corps", ["a@example.com"])
+        with mock.patch.object(
+            EmailBackend, "send_messages", side_effect=SMTPException("down")
+        ):
+            self.assertEqual(outbox.deliver_due(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmail.Status.PENDING)
+            self.assertEqual(email.body, "Corps")
+            self.assertIn("down", email.last_error)
+            self.assertGreater(
+                email.next_attempt_at, timezone.now() + timedelta(seconds=50)
+            )
+            # Pas encore due : rien à envoyer
+            self.assertEqual(outbox.deliver_due(), (0, 0))
+
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(outbox.deliver_due(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.FAILED)
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.body, "")
+
+
+class NewsletterCampaignTests(TestCase):
+    """Tests for the batched newsletter dispatch."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="News Lib", code="NEWS01")
+        other = Library.objects.create(name="Other News", code="NEWS02")
+        consents = [True, True, False, True, True]
+        libraries = [self.library, self.library, self.library, other, self.library]
+        for index, (consent, library) in enumerate(zip(consents, libraries)):
+            user = User.objects.create(
+                username=f"news{index}",
+                email=f"news{index}@example.com",
+                user_type=User.UserType.READER,
+                library=library,
+            )
+            ReaderProfile.objects.create(
+                user=user,
+                card_number=f"NEWS-{index}",
+                birth_date=date(2000, 1, 1),
+                gdpr_consent=True,
+                newsletter_consent=consent,
+            )
+
+    def create_campaign(self, library=None):
+        return NewsletterCampaign.objects.create(
+            library=library,
+            subject="Nouveautés",
+            body="Bonjour de la part de {{ library.name }}",
+        )
+
+    def test_sends_to_consenting_readers_only(self):
+        """Test that only consenting readers of the library receive the email."""
+        campaign = self.create_campaign(self.library)
+        out = StringIO()
+        call_command("send_newsletter", campaign.pk, stdout=out)
+        self.assertIn("3 email(s) envoyé(s)", out.getvalue())
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["news0@example.com", "news1@example.com", "news4@example.com"],
+        )
+        self.assertEqual(mail.outbox[0].body, "Bonjour de la part de News Lib")
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, NewsletterCampaign.Status.DONE)
+        self.assertEqual(campaign.sent_count, 3)
+
+    def test_network_campaign_renders_once_per_library(self):
+        """Test that a network campaign renders the body once per library."""
+        campaign = self.create_campaign()
+        with mock.patch(
+            "accounts.newsletters.Template.render", autospec=True, return_value="x"
+        ) as render:
+            self.assertEqual(newsletters.send_campaign(campaign, batch_size=2), 4)
+        self.assertEqual(render.call_count, 2)
+
+    def test_batches_share_one_connection(self):
+        """Test that all batches are sent over the same connection."""
+        campaign = self.create_campaign(self.library)
+        with mock.patch.object(EmailBackend, "open", autospec=True) as opened:
+            newsletters.send_campaign(campaign, batch_size=1)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_interrupted_campaign_resumes(self):
+        """Test that a lost connection resumes at the first unsent email."""
+        campaign = self.create_campaign(self.library)
+        real_send = EmailBackend.send_messages
+        calls = []
+
+        def flaky_send(backend, messages):
+            calls.append(len(messages))
+            if len(calls) == 2:
+                raise SMTPServerDisconnected("down")
+            return real_send(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", flaky_send):
+            with self.assertRaisesMessage(CommandError, "relancer la commande"):
+                call_command(
+                    "send_newsletter", campaign.pk, batch_size=2, stdout=StringIO()
+                )
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, NewsletterCampaign.Status.SENDING)
+        self.assertEqual(campaign.sent_count, 1)
+
+        self.assertEqual(newsletters.send_campaign(campaign, batch_size=2), 2)
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            ["news0@example.com", "news1@example.com", "news4@example.com"],
+        )
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.sent_count, 3)
+
+    def test_refused_recipient_does_not_stop_campaign(self):
+        """Test that a permanently refused address is counted and skipped."""
+        campaign = self.create_campaign(self.library)
+        real_send = EmailBackend.send_messages
+
+        def refusing_send(backend, messages):
+            if messages[0].to == ["news1@example.com"]:
+                raise SMTPRecipientsRefused(
+                    {"news1@example.com": (550, b"No such user")}
+                )
+            return real_send(backend, messages)
+
+        out = StringIO()
+        with mock.patch.object(EmailBackend, "send_messages", refusing_send):
+            call_command("send_newsletter", campaign.pk, batch_size=2, stdout=out)
+        self.assertIn("1 adresse(s) refusée(s)", out.getvalue())
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            ["news0@example.com", "news4@example.com"],
+        )
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, NewsletterCampaign.Status.DONE)
+        self.assertEqual((campaign.sent_count, campaign.failed_count), (2, 1))
+
+    def test_rate_limiter_spaces_batches(self):
+        """Test that the rate limiter sleeps to respect the rate."""
+        now = [0.0]
+        sleeps = []
+        limiter = newsletters.RateLimiter(10, clock=lambda: now[0], sleep=sleeps.append)
+        limiter.wait(5)
+        limiter.wait(5)
+        self.assertEqual(sleeps, [0.5])
+
+
+@override_settings(ROOT_URLCONF="accounts.api.async_urls")
+class AsyncReaderAPITests(TestCase):
+    """Tests for the native async API views (ASGI deployment mode)."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Async Lib", code="ASYNC01")
+        user = User.objects.create_user(
+            username="asyncreader",
+            password="asyncpass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        self.profile = ReaderProfile.objects.create(
+            user=user, card_number="ASYNC-1", gdpr_consent=True
+        )
+        for index in range(3):
+            Loan.objects.create(
+                reader=self.profile,
+                library=self.library,
+                document_title=f"Prêt {index}",
+                due_date=date.today(),
+            )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "asyncreader", "password": "asyncpass123"},
+        )
+        self.headers = {"authorization": f"Bearer {response.data['access']}"}
+
+    async def test_profile_is_cached_and_revalidated(self):
+        """Test that the async profile view answers and honours its ETag."""
+        response = await self.async_client.get(
+            reverse("reader-me"), headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["card_number"], "ASYNC-1")
+
+        response = await self.async_client.get(
+            reverse("reader-me"),
+            headers={**self.headers, "if-none-match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_reader_sections(self):
+        """Test the async loans, reservations, history and dashboard views."""
+        response = await self.async_client.get(
+            reverse("reader-me-loans"), headers=self.headers
+        )
+        self.assertEqual(len(response.json()["results"]), 3)
+
+        response = await self.async_client.get(
+            reverse("reader-me-reservations"), headers=self.headers
+        )
+        self.assertEqual(response.json(), {"count": 0, "results": []})
+
+        response = await self.async_client.get(
+            reverse("reader-me-dashboard"),
+            {"include": "loans,history"},
+            headers=self.headers,
+        )
+        self.assertEqual(set(response.json()), {"loans", "history"})
+
+        response = await self.async_client.get(
+            reverse("reader-me-dashboard"), {"include": "bogus"}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_authentication_errors(self):
+        """Test that missing or invalid tokens get a 401 like DRF."""
+        response = await self.async_client.get(reverse("reader-me-loans"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+        response = await self.async_client.get(
+            reverse("reader-me"), headers={"authorization": "Bearer bogus"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_patch_is_delegated_to_drf(self):
+        """Test that unsafe methods still go through the DRF view."""
+        response = self.client.patch(
+            reverse("reader-me"),
+            {"phone": "0102030405"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.phone, "0102030405")
+
+    async def test_libraries(self):
+        """Test the async library list and detail views."""
+        response = await self.async_client.get(reverse("library-list"))
+        self.assertEqual([lib["code"] for lib in response.json()], ["ASYNC01"])
+        response = await self.async_client.get(
+            reverse("library-detail", args=[self.library.pk])
+        )
+        self.assertEqual(response.json()["name"], "Async Lib")
+        response = await self.async_client.get(reverse("library-detail", args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ReaderAPIBenchmarkTests(TransactionTestCase):
+    """Tests for the bench_reader_api load generator."""
+
+    def test_runs_in_both_modes(self):
+        """Test that the benchmark reports throughput for WSGI and ASGI."""
+        library = Library.objects.create(name="Bench Lib", code="BENCH01")
+        user = User.objects.create_user(
+            username="benchreader",
+            user_type=User.UserType.READER,
+            library=library,
+        )
+        ReaderProfile.objects.create(user=user, card_number="BENCH-1")
+        for mode in ("wsgi", "asgi"):
+            out = StringIO()
+            call_command(
+                "bench_reader_api",
+                "--username=benchreader",
+                f"--mode={mode}",
+                "--path=/api/v1/readers/me/",
+                "--requests=6",
+                "--concurrency=2",
+                stdout=out,
+                stderr=StringIO(),
+            )
+            self.assertIn(f"{mode} (", out.getvalue())
+            self.assertIn("6 requêtes", out.getvalue())
+            self.assertIn("0 erreur(s)", out.getvalue())
+
+
+class SqliteProfileTests(TestCase):
+    """Tests for the SQLite performance profile."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_profile_applied_on_connection(self):
+        """Test that new connections get the profile's pragmas."""
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("cache_size"), -32000)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    @override_settings(SQLITE_JOURNAL_MODE="WAL; DROP TABLE x")
+    def test_invalid_values_are_rejected(self):
+        """Test that pragma values from the environment are validated."""
+        with self.assertRaises(ImproperlyConfigured):
+            sqlite.profile_pragmas()
+
+
+class SqliteBenchmarkTests(unittest.TestCase):
+    """
+    Tests for the bench_sqlite command (plain unittest: it opens threaded
+    connections to its own temporary database).
+    """
+
+    def test_benchmark_uses_wal_without_lock_errors(self):
+        """Test that the tuned profile runs the benchmark without lock errors."""
+        out = StringIO()
+        call_command(
+            "bench_sqlite",
+            "--writers=3",
+            "--readers=1",
+            "--transactions=20",
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("sans profil"))
+        self.assertIn("60 écritures", lines[1])
+        self.assertIn("0 échec(s)", lines[1])
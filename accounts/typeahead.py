@@ -0,0 +1,215 @@
+"""
+Index de préfixes en mémoire pour l'autocomplétion des lecteurs au guichet.
+
+Chaque processus garde, par médiathèque, une liste triée de couples
+``(clé, pk)`` où les clés sont le numéro de carte et les noms normalisés. Une
+recherche par préfixe est une bissection suivie d'un parcours des seules
+entrées correspondantes. L'index est chargé à la première demande, mis à jour
+de façon incrémentale par les signaux ``ReaderProfile``/``User`` du processus,
+et rechargé entièrement après ``TYPEAHEAD_MAX_AGE`` secondes pour rattraper
+les modifications faites par les autres processus.
+
+Seul le premier chargement se fait dans la requête (les requêtes simultanées
+attendent ce chargement unique). Les rechargements suivants tournent dans un
+thread, un seul à la fois par index : l'ancien index reste servi jusqu'à son
+remplacement.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from .models import ReaderProfile
+from .normalization import normalize_name
+
+DEFAULT_LIMIT = 10
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def reader_keys(card_number, first_name, last_name):
+    """Clés de recherche d'un lecteur (carte, nom, prénom et combinaisons)."""
+    first, last = normalize_name(first_name), normalize_name(last_name)
+    keys = {normalize_name(card_number), first, last}
+    if first and last:
+        keys.update({f"{last} {first}", f"{first} {last}"})
+    keys.discard("")
+    return keys
+
+
+class LibraryPrefixIndex:
+    """Index de préfixes des lecteurs d'une médiathèque."""
+
+    def __init__(self, library_id):
+        self.library_id = library_id
+        self.entries = []
+        self.readers = {}
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+        # Tenu pendant un chargement complet : un seul à la fois
+        self.reload_lock = threading.Lock()
+
+    def load(self):
+        rows = ReaderProfile.objects.filter(user__library_id=self.library_id)
+        rows = rows.values_list(
+            "pk",
+            "card_number",
+            "is_blocked",
+            "user__first_name",
+            "user__last_name",
+            "user__username",
+        )
+        entries, readers = [], {}
+        for pk, card_number, is_blocked, first_name, last_name, username in rows:
+            keys = reader_keys(card_number, first_name, last_name)
+            name = f"{first_name} {last_name}".strip() or username
+            readers[pk] = (card_number, name, is_blocked, keys)
+            entries.extend((key, pk) for key in keys)
+        entries.sort()
+        with self.lock:
+            self.entries, self.readers = entries, readers
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self):
+        return time.monotonic() - self.loaded_at > settings.TYPEAHEAD_MAX_AGE
+
+    def ensure_loaded(self):
+        """Premier chargement, fait une seule fois quel que soit le nombre d'appels."""
+        with self.reload_lock:
+            if not self.loaded_at:
+                self.load()
+
+    def reload_in_background(self):
+        """
+        Lance un rechargement complet dans un thread, sauf s'il y en a déjà un
+        en cours ; retourne ``True`` si un rechargement a été lancé.
+        """
+        if not self.reload_lock.acquire(blocking=False):
+            return False
+        try:
+            threading.Thread(
+                target=self._reload,
+                name=f"typeahead-{self.library_id}",
+                daemon=True,
+            ).start()
+        except BaseException:
+            self.reload_lock.release()
+            raise
+        return True
+
+    def _reload(self):
+        try:
+            self.load()
+        finally:
+            # Connexion propre au thread de rechargement
+            connection.close()
+            self.reload_lock.release()
+
+    def _remove_locked(self, pk):
+        reader = self.readers.pop(pk, None)
+        if reader is None:
+            return
+        for key in reader[3]:
+            position = bisect_left(self.entries, (key, pk))
+            if position < len(self.entries) and self.entries[position] == (key, pk):
+                del self.entries[position]
+
+    def upsert(self, pk, card_number, name, is_blocked, keys):
+        with self.lock:
+            self._remove_locked(pk)
+            self.readers[pk] = (card_number, name, is_blocked, keys)
+            for key in keys:
+                insort(self.entries, (key, pk))
+
+    def remove(self, pk):
+        with self.lock:
+            self._remove_locked(pk)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        results, seen = [], set()
+        with self.lock:
+            position = bisect_left(self.entries, (prefix,))
+            while position < len(self.entries) and len(results) < limit:
+                key, pk = self.entries[position]
+                if not key.startswith(prefix):
+                    break
+                if pk not in seen:
+                    seen.add(pk)
+                    card_number, name, is_blocked, _keys = self.readers[pk]
+                    results.append(
+                        {
+                            "id": pk,
+                            "card_number": card_number,
+                            "name": name,
+                            "is_blocked": is_blocked,
+                        }
+                    )
+                position += 1
+        return results
+
+
+def get_index(library_id):
+    """
+    Retourne l'index chargé d'une médiathèque ; s'il est trop ancien, il est
+    retourné tel quel et rechargé en arrière-plan.
+    """
+    with _registry_lock:
+        index = _registry.get(library_id)
+        if index is None:
+            index = _registry[library_id] = LibraryPrefixIndex(library_id)
+    if not index.loaded_at:
+        index.ensure_loaded()
+    elif index.is_stale():
+        index.reload_in_background()
+    return index
+
+
+def search(library_id, query, limit=DEFAULT_LIMIT):
+    """Recherche par préfixe de carte ou de nom dans une médiathèque."""
+    return get_index(library_id).search(query, limit)
+
+
+def update_reader(profile):
+    """Reporte un profil lecteur modifié dans les index chargés."""
+    user = profile.user
+    with _registry_lock:
+        indexes = list(_registry.values())
+    for index in indexes:
+        if index.library_id != user.library_id:
+            index.remove(profile.pk)
+    index = _registry.get(user.library_id)
+    if index is not None:
+        index.upsert(
+            profile.pk,
+            profile.card_number,
+            user.get_full_name() or user.username,
+            profile.is_blocked,
+            reader_keys(profile.card_number, user.first_name, user.last_name),
+        )
+
+
+def remove_reader(profile_pk):
+    """Retire un profil lecteur des index chargés."""
+    with _registry_lock:
+        indexes = list(_registry.values())
+    for index in indexes:
+        index.remove(profile_pk)
+
+
+def forget_library(library_id):
+    """Oublie l'index d'une médiathèque (rechargé à la prochaine recherche)."""
+    with _registry_lock:
+        _registry.pop(library_id, None)
+
+
+def clear():
+    """Vide tous les index du processus."""
+    with _registry_lock:
+        _registry.clear()
@@ -45,11 +45,31 @@ urlpatterns = [
     ),
     # Reader management (library staff)
     path("readers/", views.ReaderListView.as_view(), name="reader_list"),
+    path(
+        "readers/typeahead/",
+        views.ReaderTypeaheadView.as_view(),
+        name="reader_typeahead",
+    ),
+    path(
+        "readers/by-card/<str:card_number>/",
+        views.ReaderByCardView.as_view(),
+        name="reader_by_card",
+    ),
     path(
         "readers/create/",
         views.ReaderCreateView.as_view(),
         name="reader_create",
     ),
+    path(
+        "readers/import/",
+        views.ReaderImportView.as_view(),
+        name="reader_import",
+    ),
+    path(
+        "readers/export/",
+        views.ReaderExportView.as_view(),
+        name="reader_export",
+    ),
     path(
         "readers/<int:pk>/",
         views.ReaderDetailView.as_view(),
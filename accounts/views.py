@@ -1,11 +1,15 @@
+import io
+
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView
-from django.core.mail import send_mail
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import (
     DeleteView,
@@ -16,22 +20,33 @@ from django.views.generic import (
     View,
 )
 
+from loans.archive import archive_reader
+from loans.queries import current_loans
+
+from . import outbox, typeahead
+from .cards import lookup_card
+from .counts import count_library_readers, count_queryset, reader_scope
+from .exporters import FORMATS, export_rows
 from .forms import (
     LibraryForm,
     LibraryUserCreationForm,
     LoginForm,
     ReaderCreationForm,
+    ReaderImportForm,
     ReaderPasswordResetForm,
     ReaderRegistrationForm,
     ReaderUpdateForm,
     UserProfileForm,
 )
+from .importers import ReaderImporter, count_passwords
 from .models import Library, ReaderProfile, User
+from .pagination import CursorPaginationMixin
 from .permissions import (
     LibraryContextMixin,
     LibraryStaffRequiredMixin,
     SuperadminRequiredMixin,
 )
+from .search import search_readers
 
 # =============================================================================
 # Authentication Views
@@ -82,11 +97,12 @@ class RegisterView(View):
     def post(self, request):
         form = ReaderRegistrationForm(request.POST)
         if form.is_valid():
-            user, profile = form.save()
+            with transaction.atomic():
+                user, profile = form.save()
 
-            # Envoyer un email de confirmation si configuré
-            if user.email:
-                self._send_welcome_email(user, profile)
+                # Email de confirmation, envoyé par la boîte d'envoi
+                if user.email:
+                    self._send_welcome_email(user, profile)
 
             messages.success(
                 request,
@@ -116,13 +132,7 @@ class RegisterView(View):
             card_number=profile.card_number,
             library=user.library.name if user.library else "-",
         )
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
-        )
+        outbox.enqueue(subject, message, [user.email])
 
 
 class RegisterSuccessView(TemplateView):
@@ -171,13 +181,17 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
 # =============================================================================
 
 
-class LibraryListView(SuperadminRequiredMixin, ListView):
+class LibraryListView(SuperadminRequiredMixin, CursorPaginationMixin, ListView):
     """Liste des médiathèques."""
 
     model = Library
     template_name = "accounts/library/list.html"
     context_object_name = "libraries"
     paginate_by = 20
+    cursor_ordering = ("name", "id")
+
+    def get_queryset(self):
+        return Library.objects.select_related("stats")
 
 
 class LibraryCreateView(SuperadminRequiredMixin, View):
@@ -243,9 +257,7 @@ class LibraryDetailView(SuperadminRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         library = self.object
         context["staff_users"] = library.users.filter(user_type=User.UserType.LIBRARY)
-        context["reader_count"] = library.users.filter(
-            user_type=User.UserType.READER
-        ).count()
+        context["reader_count"] = count_library_readers(library)
         return context
 
 
@@ -273,9 +285,28 @@ class LibraryDeleteView(SuperadminRequiredMixin, DeleteView):
     context_object_name = "library"
     success_url = reverse_lazy("accounts:library_list")
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["loan_count"] = self.object.loans.count()
+        context["reservation_count"] = self.object.reservations.count()
+        return context
+
     def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                response = super().form_valid(form)
+        except ProtectedError:
+            # Prêts ou réservations de la médiathèque ou de ses lecteurs
+            messages.error(
+                self.request,
+                _(
+                    "Cette médiathèque a des prêts ou des réservations : "
+                    "suppression impossible."
+                ),
+            )
+            return redirect("accounts:library_detail", pk=self.object.pk)
         messages.success(self.request, _("Médiathèque supprimée avec succès."))
-        return super().form_valid(form)
+        return response
 
 
 # =============================================================================
@@ -283,13 +314,16 @@ class LibraryDeleteView(SuperadminRequiredMixin, DeleteView):
 # =============================================================================
 
 
-class ReaderListView(LibraryStaffRequiredMixin, LibraryContextMixin, ListView):
+class ReaderListView(
+    LibraryStaffRequiredMixin, LibraryContextMixin, CursorPaginationMixin, ListView
+):
     """Liste des lecteurs."""
 
     model = ReaderProfile
     template_name = "accounts/reader/list.html"
     context_object_name = "readers"
     paginate_by = 20
+    cursor_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         qs = ReaderProfile.objects.select_related("user", "user__library")
@@ -302,28 +336,67 @@ class ReaderListView(LibraryStaffRequiredMixin, LibraryContextMixin, ListView):
         # Recherche par nom ou numéro de carte
         search = self.request.GET.get("search", "")
         if search:
-            qs = qs.filter(
-                Q(card_number__icontains=search)
-                | Q(user__username__icontains=search)
-                | Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-            )
+            qs = search_readers(qs, search)
 
         return qs.order_by("-created_at")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["search"] = self.request.GET.get("search", "")
+        search = self.request.GET.get("search", "")
+        user = self.request.user
+        library_id = None if user.is_superadmin else user.library_id
+        context["search"] = search
+        context["reader_count"] = count_queryset(
+            self.object_list, reader_scope(library_id), "reader_list", search
+        )
         return context
 
 
-class ReaderCreateView(LibraryStaffRequiredMixin, View):
+class ReaderTypeaheadView(LibraryStaffRequiredMixin, View):
     """
-    Création d'un lecteur avec génération du mot de passe.
-    Affiche le mot de passe généré après création.
+    Autocomplétion JSON par préfixe de carte ou de nom, limitée à la
+    médiathèque de l'utilisateur (le superadmin précise ``library``).
     """
 
-    template_name = "accounts/reader/create.html"
+    def get(self, request):
+        user = request.user
+        library_id = user.library_id
+        if user.is_superadmin:
+            library_id = request.GET.get("library")
+            if not library_id:
+                return JsonResponse(
+                    {"detail": _("Paramètre 'library' requis.")}, status=400
+                )
+            library_id = get_object_or_404(Library, pk=library_id).pk
+        if not library_id:
+            return JsonResponse({"results": []})
+
+        results = typeahead.search(library_id, request.GET.get("q", ""))
+        for result in results:
+            result["url"] = reverse("accounts:reader_detail", args=[result["id"]])
+        return JsonResponse({"results": results})
+
+
+class ReaderByCardView(LibraryStaffRequiredMixin, View):
+    """Accès direct à la fiche d'un lecteur depuis le scan de sa carte."""
+
+    def get(self, request, card_number):
+        entry = lookup_card(card_number)
+        user = request.user
+        readers = ReaderProfile.objects.all()
+        if not user.is_superadmin:
+            # Sans médiathèque rattachée, le personnel ne résout aucune carte
+            readers = readers.filter(user__library_id=user.library_id or 0)
+        if entry is None or not readers.filter(pk=entry["pk"]).exists():
+            raise Http404(_("Aucun lecteur ne correspond à cette carte."))
+        return redirect("accounts:reader_detail", pk=entry["pk"])
+
+
+class ReaderLibraryMixin:
+    """
+    Médiathèque de travail : celle de l'utilisateur, ou celle choisie par le
+    superadmin (paramètre ``library``).
+    """
 
     def get_library(self):
         user = self.request.user
@@ -337,6 +410,15 @@ class ReaderCreateView(LibraryStaffRequiredMixin, View):
             return None
         return user.library
 
+
+class ReaderCreateView(LibraryStaffRequiredMixin, ReaderLibraryMixin, View):
+    """
+    Création d'un lecteur avec génération du mot de passe.
+    Affiche le mot de passe généré après création.
+    """
+
+    template_name = "accounts/reader/create.html"
+
     def get(self, request):
         library = self.get_library()
         form = ReaderCreationForm(library=library)
@@ -363,13 +445,17 @@ class ReaderCreateView(LibraryStaffRequiredMixin, View):
 
         form = ReaderCreationForm(request.POST, library=library)
         if form.is_valid():
-            profile = form.save()
-            generated_password = form.get_generated_password()
-
-            # Envoyer par email si demandé
-            if form.cleaned_data.get("send_password_email") and profile.user.email:
-                self._send_password_email(profile.user, generated_password)
-                messages.info(request, _("Le mot de passe a été envoyé par email."))
+            with transaction.atomic():
+                profile = form.save()
+                generated_password = form.get_generated_password()
+
+                # Envoyer par email si demandé (via la boîte d'envoi)
+                send_email = form.cleaned_data.get("send_password_email")
+                if send_email and profile.user.email:
+                    self._send_password_email(profile.user, generated_password)
+                    messages.info(
+                        request, _("Le mot de passe va être envoyé par email.")
+                    )
 
             # Rediriger vers la page de confirmation avec le mot de passe
             return render(
@@ -412,15 +498,100 @@ class ReaderCreateView(LibraryStaffRequiredMixin, View):
             username=user.username,
             password=password,
         )
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
+        outbox.enqueue(subject, message, [user.email])
+
+
+class ReaderImportView(LibraryStaffRequiredMixin, ReaderLibraryMixin, View):
+    """
+    Import de lecteurs depuis un fichier CSV (voir ``accounts.importers``).
+    Affiche le bilan de l'import : lecteurs créés et lignes refusées. La
+    taille du fichier et le nombre de mots de passe à hacher sont bornés ;
+    les gros fichiers passent par la commande ``import_readers``.
+    """
+
+    template_name = "accounts/reader/import.html"
+
+    def get(self, request):
+        return self.render_form(ReaderImportForm())
+
+    def post(self, request):
+        library = self.get_library()
+        if not library:
+            messages.error(request, _("Veuillez sélectionner une médiathèque."))
+            return redirect("accounts:reader_import")
+
+        form = ReaderImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return self.render_form(form)
+
+        # Fichier de taille bornée : décodé en entier avant tout import
+        try:
+            content = form.cleaned_data["file"].read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            form.add_error("file", _("Le fichier doit être encodé en UTF-8."))
+            return self.render_form(form)
+        if (
+            count_passwords(io.StringIO(content, newline=""))
+            > settings.READER_IMPORT_MAX_PASSWORDS
+        ):
+            form.add_error(
+                "file",
+                _(
+                    "Trop de mots de passe à hacher pour un import depuis "
+                    "l'interface (%(max)s au plus) : utiliser la commande "
+                    "import_readers."
+                )
+                % {"max": settings.READER_IMPORT_MAX_PASSWORDS},
+            )
+            return self.render_form(form)
+
+        importer = ReaderImporter(library, workers=settings.READER_IMPORT_WORKERS)
+        report = importer.run(io.StringIO(content, newline=""))
+        return self.render_form(ReaderImportForm(), report=report)
+
+    def render_form(self, form, **extra):
+        libraries = (
+            Library.objects.filter(is_active=True)
+            if self.request.user.is_superadmin
+            else None
+        )
+        return render(
+            self.request,
+            self.template_name,
+            {
+                "form": form,
+                "library": self.get_library(),
+                "libraries": libraries,
+                **extra,
+            },
         )
 
 
+class ReaderExportView(LibraryStaffRequiredMixin, ReaderLibraryMixin, View):
+    """
+    Export en flux des lecteurs de la médiathèque (``format=csv`` ou ``jsonl``).
+    """
+
+    def get(self, request):
+        library = self.get_library()
+        if not library:
+            messages.error(request, _("Veuillez sélectionner une médiathèque."))
+            return redirect("accounts:reader_list")
+        export_format = request.GET.get("format", "csv")
+        if export_format not in FORMATS:
+            raise Http404
+        serialize, content_type, extension = FORMATS[export_format]
+
+        response = StreamingHttpResponse(
+            serialize(export_rows(library)), content_type=content_type
+        )
+        filename = f"lecteurs-{library.code}-{timezone.localdate():%Y%m%d}"
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{extension}"'
+        )
+        return response
+
+
 class ReaderDetailView(LibraryStaffRequiredMixin, DetailView):
     """Détail d'un lecteur."""
 
@@ -474,11 +645,28 @@ class ReaderDeleteView(LibraryStaffRequiredMixin, DeleteView):
             qs = qs.filter(user__library=user.library)
         return qs
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["current_loans_count"] = current_loans(self.object.pk).count()
+        return context
+
     def form_valid(self, form):
-        # Supprimer aussi l'utilisateur associé
+        if current_loans(self.object.pk).exists():
+            messages.error(
+                self.request,
+                _(
+                    "Ce lecteur a des prêts en cours : ils doivent être rendus "
+                    "avant la suppression du compte."
+                ),
+            )
+            return redirect("accounts:reader_detail", pk=self.object.pk)
+        # Supprimer aussi l'utilisateur associé ; les prêts rendus passent
+        # dans l'historique, qui est anonymisé par la suppression.
         user = self.object.user
-        response = super().form_valid(form)
-        user.delete()
+        with transaction.atomic():
+            archive_reader(self.object.pk)
+            response = super().form_valid(form)
+            user.delete()
         messages.success(self.request, _("Lecteur supprimé avec succès."))
         return response
 
@@ -512,15 +700,16 @@ class ReaderPasswordResetView(LibraryStaffRequiredMixin, View):
         form = ReaderPasswordResetForm(request.POST, reader_profile=reader)
 
         if form.is_valid():
-            new_password = form.save()
-
-            # Envoyer par email si demandé
-            if form.cleaned_data.get("send_email") and reader.user.email:
-                self._send_password_email(reader.user, new_password)
-                messages.info(
-                    request,
-                    _("Le nouveau mot de passe a été envoyé par email."),
-                )
+            with transaction.atomic():
+                new_password = form.save()
+
+                # Envoyer par email si demandé (via la boîte d'envoi)
+                if form.cleaned_data.get("send_email") and reader.user.email:
+                    self._send_password_email(reader.user, new_password)
+                    messages.info(
+                        request,
+                        _("Le nouveau mot de passe va être envoyé par email."),
+                    )
 
             return render(
                 request,
@@ -554,10 +743,4 @@ class ReaderPasswordResetView(LibraryStaffRequiredMixin, View):
             name=user.get_full_name() or user.username,
             password=password,
         )
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
-        )
+        outbox.enqueue(subject, message, [user.email])
@@ -3,6 +3,17 @@ ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+ASGI deployment mode: set ``API_ASYNC_VIEWS=True`` so that the reader
+self-service and library read endpoints are served by native async views
+(``accounts.api.async_views``) instead of sync DRF views run in a thread, and
+serve this module with an ASGI server, for example::
+
+    API_ASYNC_VIEWS=True uvicorn app.asgi:application --workers 4
+
+Keep ``API_ASYNC_VIEWS`` disabled under WSGI (``app.wsgi``): async views
+would then run through ``async_to_sync`` on every request. Compare both modes
+with ``python manage.py bench_reader_api``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
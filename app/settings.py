@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     # Local apps
     "home",
     "accounts",
+    "loans",
 ]
 
 MIDDLEWARE = [
@@ -76,10 +77,23 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Profil de performance SQLite (accounts.sqlite), appliqué à chaque connexion :
+# journal WAL, attente sur verrou (ms), synchronisation NORMAL, taille du mmap
+# (octets) et du cache de pages (Kio si négatif), transactions d'écriture
+# IMMEDIATE (verrou pris dès le début : pas d'échec « database is locked » à
+# la promotion d'une lecture en écriture)
+SQLITE_TUNING = os.environ.get("SQLITE_TUNING", "True").lower() in ("true", "1", "yes")
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000))
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 128 * 1024 * 1024))
+SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -32000))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"} if SQLITE_TUNING else {},
     }
 }
 
@@ -130,6 +144,14 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Custom User Model
 AUTH_USER_MODEL = "accounts.User"
 
+# Charge l'utilisateur avec sa médiathèque et son profil lecteur.
+# ModelBackend reste déclaré : les sessions ouvertes avant IdentityBackend
+# enregistrent ce chemin et seraient sinon invalidées.
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.IdentityBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 
 # Authentication URLs
 LOGIN_URL = "accounts:login"
@@ -140,7 +162,7 @@ LOGOUT_REDIRECT_URL = "home:index"
 # Django REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.api.authentication.IdentityJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -156,9 +178,86 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Liste noire propre à accounts (voir accounts/blacklist.py) au lieu de
+    # l'application rest_framework_simplejwt.token_blacklist
+    "TOKEN_REFRESH_SERIALIZER": (
+        "accounts.api.serializers.BlacklistTokenRefreshSerializer"
+    ),
 }
 
 
+# Liste noire des jetons de rafraîchissement : filtre de Bloom par processus
+# (capacité minimale, le filtre étant dimensionné d'après le nombre de jetons
+# révoqués ; taux de faux positifs ; durée de vie en secondes) et intervalle de
+# synchronisation avec les révocations des autres processus (secondes)
+TOKEN_BLACKLIST_BLOOM_MIN_CAPACITY = int(
+    os.environ.get("TOKEN_BLACKLIST_BLOOM_MIN_CAPACITY", 10_000)
+)
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = float(
+    os.environ.get("TOKEN_BLACKLIST_BLOOM_ERROR_RATE", 0.001)
+)
+TOKEN_BLACKLIST_BLOOM_MAX_AGE = int(
+    os.environ.get("TOKEN_BLACKLIST_BLOOM_MAX_AGE", 3600)
+)
+TOKEN_BLACKLIST_SYNC_INTERVAL = float(
+    os.environ.get("TOKEN_BLACKLIST_SYNC_INTERVAL", 2)
+)
+
+
+# Authentification des lectures d'API depuis les claims du jeton : durée
+# (secondes) pendant laquelle l'état d'un compte (actif, type, médiathèque)
+# est gardé en mémoire avant d'être revérifié
+JWT_CLAIMS_CHECK_TTL = int(os.environ.get("JWT_CLAIMS_CHECK_TTL", 30))
+
+
+# Cache (mémoire locale par défaut ; utiliser un cache partagé, par ex.
+# Redis ou Memcached, dès que plusieurs processus servent l'application)
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+
+# Comptages (exacts jusqu'au seuil, mis en cache au-delà)
+COUNT_EXACT_THRESHOLD = int(os.environ.get("COUNT_EXACT_THRESHOLD", 1000))
+COUNT_CACHE_TIMEOUT = int(os.environ.get("COUNT_CACHE_TIMEOUT", 300))
+
+
+# Autocomplétion des lecteurs : durée de vie de l'index en mémoire (secondes)
+TYPEAHEAD_MAX_AGE = int(os.environ.get("TYPEAHEAD_MAX_AGE", 300))
+
+
+# Recherche par numéro de carte : durée de vie des entrées en cache (secondes)
+CARD_LOOKUP_CACHE_TIMEOUT = int(os.environ.get("CARD_LOOKUP_CACHE_TIMEOUT", 3600))
+
+# Numéros de carte attribués à l'inscription : valeurs réservées par bloc et
+# par processus (1 = une écriture par numéro, sans trou dans la séquence)
+CARD_NUMBER_BLOCK_SIZE = int(os.environ.get("CARD_NUMBER_BLOCK_SIZE", 1))
+
+
+# Import CSV de lecteurs depuis l'interface : processus de hachage des mots de
+# passe (1 = dans le processus web ; la commande import_readers utilise tous
+# les CPU par défaut)
+READER_IMPORT_WORKERS = int(os.environ.get("READER_IMPORT_WORKERS", 1))
+
+
+# Import CSV depuis l'interface : taille maximale du fichier (octets) et nombre
+# maximal de mots de passe à hacher pendant la requête ; au-delà, le fichier
+# passe par la commande import_readers
+READER_IMPORT_MAX_UPLOAD_SIZE = int(
+    os.environ.get("READER_IMPORT_MAX_UPLOAD_SIZE", 1024 * 1024)
+)
+READER_IMPORT_MAX_PASSWORDS = int(os.environ.get("READER_IMPORT_MAX_PASSWORDS", 100))
+
+
+# Réponses d'API mises en cache (invalidées par version ; durée maximale)
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 3600))
+
+
 # Email Configuration (configure in .env for production)
 EMAIL_BACKEND = os.environ.get(
     "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
@@ -173,3 +272,35 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "True").lower() in (
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "noreply@mediabib.local")
+
+
+# Boîte d'envoi des emails (commande send_outbox) : taille des lots, nombre
+# maximal de tentatives, délai de base entre tentatives et durée de
+# réservation d'un lot par un worker (secondes)
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_DELAY = int(os.environ.get("OUTBOX_RETRY_DELAY", 60))
+OUTBOX_LEASE = int(os.environ.get("OUTBOX_LEASE", 300))
+
+
+# Campagnes newsletter (commande send_newsletter) : emails envoyés par lot sur
+# une même connexion SMTP et débit maximal en emails par seconde (0 : illimité)
+NEWSLETTER_BATCH_SIZE = int(os.environ.get("NEWSLETTER_BATCH_SIZE", 100))
+NEWSLETTER_RATE_LIMIT = int(os.environ.get("NEWSLETTER_RATE_LIMIT", 0))
+
+
+# Historique des prêts (commande archive_loans) : délai avant archivage d'un
+# prêt rendu et durée de conservation du lecteur dans l'historique (jours),
+# au-delà de laquelle la ligne est anonymisée (RGPD)
+LOAN_ARCHIVE_DELAY = int(os.environ.get("LOAN_ARCHIVE_DELAY", 0))
+LOAN_HISTORY_RETENTION_DAYS = int(os.environ.get("LOAN_HISTORY_RETENTION_DAYS", 120))
+
+
+# Vues API asynchrones (à activer en déploiement ASGI, voir app/asgi.py) : les
+# lectures de l'espace lecteur et des médiathèques sont servies par des vues
+# natives async au lieu des vues DRF synchrones
+API_ASYNC_VIEWS = os.environ.get("API_ASYNC_VIEWS", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
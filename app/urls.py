@@ -2,12 +2,18 @@
 URL configuration for MediaBiB project.
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
+# Vues API asynchrones en déploiement ASGI (voir app/asgi.py)
+API_URLCONF = (
+    "accounts.api.async_urls" if settings.API_ASYNC_VIEWS else "accounts.api.urls"
+)
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("home.urls")),
     path("accounts/", include("accounts.urls")),
-    path("api/v1/", include("accounts.api.urls")),
+    path("api/v1/", include(API_URLCONF)),
 ]
@@ -0,0 +1,84 @@
+"""Admin configuration for the loans application."""
+
+from django.contrib import admin
+from django.db import transaction
+
+from . import reservations
+from .models import Loan, LoanHistory, OverdueScan, Reservation
+
+
+@admin.register(Loan)
+class LoanAdmin(admin.ModelAdmin):
+    """Admin configuration for loans."""
+
+    list_display = (
+        "document_title",
+        "reader",
+        "library",
+        "loan_date",
+        "due_date",
+        "returned_at",
+    )
+    list_filter = ("library",)
+    search_fields = ("document_title", "reader__card_number")
+    ordering = ("-loan_date",)
+    raw_id_fields = ("reader",)
+    list_select_related = ("reader__user", "library")
+
+
+@admin.register(LoanHistory)
+class LoanHistoryAdmin(admin.ModelAdmin):
+    """Read-only admin for the archived loan history."""
+
+    list_display = ("document_title", "reader", "library", "loan_date", "return_date")
+    list_filter = ("library",)
+    search_fields = ("document_title",)
+    ordering = ("-return_date",)
+    list_select_related = ("reader__user", "library")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    """Admin configuration for reservations (queue order by queue_key)."""
+
+    list_display = (
+        "document_title",
+        "document_key",
+        "reader",
+        "library",
+        "status",
+        "reservation_date",
+    )
+    list_filter = ("status", "library")
+    search_fields = ("document_title", "document_key", "reader__card_number")
+    ordering = ("document_key", "queue_key")
+    raw_id_fields = ("reader",)
+    readonly_fields = ("queue_key",)
+    list_select_related = ("reader__user", "library")
+
+    def save_model(self, request, obj, form, change):
+        """New reservations join the end of their document's queue."""
+        with transaction.atomic():
+            if not change:
+                obj.queue_key = reservations.next_queue_key(obj.document_key)
+            super().save_model(request, obj, form, change)
+
+
+@admin.register(OverdueScan)
+class OverdueScanAdmin(admin.ModelAdmin):
+    """Read-only admin for overdue scanner runs."""
+
+    list_display = ("scanned_through", "overdue_count", "notice_count", "created_at")
+    ordering = ("-scanned_through",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,11 @@
+"""Configuration for the loans application."""
+
+from django.apps import AppConfig
+
+
+class LoansConfig(AppConfig):
+    """Django AppConfig for the loans application."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "loans"
+    verbose_name = "Prêts"
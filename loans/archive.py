@@ -0,0 +1,102 @@
+"""
+Archivage des prêts rendus et anonymisation de l'historique.
+
+``archive_returned`` déplace par lots les prêts rendus depuis plus de
+``LOAN_ARCHIVE_DELAY`` jours vers ``LoanHistory`` (copie puis suppression
+dans la même transaction) : la table des prêts ne garde que les prêts en
+cours et récents. ``anonymize_history`` efface ensuite le lecteur des
+lignes rendues depuis plus de ``LOAN_HISTORY_RETENTION_DAYS`` jours. Les deux
+étapes lisent des index partiels et ne traitent que les lignes nouvellement
+concernées : la commande ``archive_loans`` peut tourner chaque nuit.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Loan, LoanHistory
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def archive_returned(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Archive les prêts rendus ; retourne le nombre de prêts déplacés."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.LOAN_ARCHIVE_DELAY)
+    return _move_to_history(
+        Loan.objects.filter(returned_at__isnull=False, returned_at__lt=cutoff),
+        batch_size,
+    )
+
+
+def archive_reader(reader_id, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Archive sans délai tous les prêts rendus d'un lecteur, avant la
+    suppression de son compte ; retourne le nombre de prêts déplacés.
+    """
+    return _move_to_history(
+        Loan.objects.filter(reader_id=reader_id, returned_at__isnull=False),
+        batch_size,
+    )
+
+
+def _move_to_history(returned, batch_size):
+    returned = returned.order_by("returned_at")
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                returned.only(
+                    "id",
+                    "reader_id",
+                    "library_id",
+                    "document_title",
+                    "loan_date",
+                    "returned_at",
+                )[:batch_size]
+            )
+            if not batch:
+                return moved
+            LoanHistory.objects.bulk_create(
+                LoanHistory(
+                    reader_id=loan.reader_id,
+                    library_id=loan.library_id,
+                    document_title=loan.document_title,
+                    loan_date=loan.loan_date,
+                    return_date=timezone.localdate(loan.returned_at),
+                )
+                for loan in batch
+            )
+            Loan.objects.filter(pk__in=[loan.pk for loan in batch]).delete()
+        moved += len(batch)
+
+
+def anonymize_history(batch_size=DEFAULT_BATCH_SIZE, today=None):
+    """
+    Efface le lecteur des lignes d'historique dont la durée de conservation
+    est écoulée ; retourne le nombre de lignes anonymisées.
+    """
+    cutoff = (today or timezone.localdate()) - timedelta(
+        days=settings.LOAN_HISTORY_RETENTION_DAYS
+    )
+    expired = LoanHistory.objects.filter(
+        reader__isnull=False, return_date__lt=cutoff
+    ).order_by("return_date")
+    anonymized = 0
+    while True:
+        pks = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return anonymized
+        anonymized += LoanHistory.objects.filter(pk__in=pks).update(reader=None)
+
+
+def reader_history(reader_id):
+    """Historique d'un lecteur, limité aux colonnes exposées."""
+    return LoanHistory.objects.filter(reader_id=reader_id).only(
+        "id", "document_title", "loan_date", "return_date"
+    )
+
+
+# Ordre de pagination : du plus récent au plus ancien, donné par l'index
+HISTORY_ORDERING = ("-return_date", "-id")
@@ -0,0 +1,30 @@
+"""Archive les prêts rendus et anonymise l'historique expiré."""
+
+from django.core.management.base import BaseCommand
+
+from loans.archive import DEFAULT_BATCH_SIZE, anonymize_history, archive_returned
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace les prêts rendus vers l'historique, puis efface le lecteur des "
+        "lignes d'historique plus anciennes que la durée de conservation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Lignes traitées par transaction (défaut : {DEFAULT_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_returned(options["batch_size"])
+        anonymized = anonymize_history(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{archived} prêt(s) archivé(s), {anonymized} ligne(s) "
+                "d'historique anonymisée(s)."
+            )
+        )
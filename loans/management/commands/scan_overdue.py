@@ -0,0 +1,40 @@
+"""Détecte les nouveaux prêts en retard et prépare les avis aux lecteurs."""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.overdue import scan
+
+
+class Command(BaseCommand):
+    help = (
+        "Détecte les prêts arrivés à échéance depuis le dernier passage et met "
+        "un avis par lecteur dans la boîte d'envoi (à lancer chaque nuit)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Date du passage, au format AAAA-MM-JJ (défaut : aujourd'hui).",
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError(f"Date « {options['date']} » invalide.") from None
+
+        result = scan(today)
+        if result is None:
+            self.stdout.write("Échéances déjà traitées, rien à faire.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.overdue_count} prêt(s) en retard jusqu'au "
+                f"{result.scanned_through:%d/%m/%Y}, {result.notice_count} avis "
+                "mis en file."
+            )
+        )
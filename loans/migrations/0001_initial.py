@@ -0,0 +1,84 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("accounts", "0009_newsletter_campaign"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Loan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document_title",
+                    models.CharField(max_length=255, verbose_name="Titre du document"),
+                ),
+                (
+                    "loan_date",
+                    models.DateField(
+                        default=django.utils.timezone.localdate,
+                        verbose_name="Date de prêt",
+                    ),
+                ),
+                ("due_date", models.DateField(verbose_name="Date de retour prévue")),
+                (
+                    "renewed_count",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Nombre de prolongations"
+                    ),
+                ),
+                (
+                    "returned_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Date de retour"
+                    ),
+                ),
+                (
+                    "library",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="loans",
+                        to="accounts.library",
+                        verbose_name="Médiathèque",
+                    ),
+                ),
+                (
+                    "reader",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="loans",
+                        to="accounts.readerprofile",
+                        verbose_name="Lecteur",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Prêt",
+                "verbose_name_plural": "Prêts",
+                "indexes": [
+                    models.Index(
+                        fields=["reader", "returned_at"],
+                        name="loans_reader_returned_idx",
+                    ),
+                    models.Index(fields=["due_date"], name="loans_due_date_idx"),
+                ],
+            },
+        ),
+    ]
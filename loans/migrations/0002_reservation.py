@@ -0,0 +1,104 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_newsletter_campaign"),
+        ("loans", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Reservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document_key",
+                    models.CharField(
+                        help_text="Identifiant de la notice (une file par document).",
+                        max_length=64,
+                        verbose_name="Référence du document",
+                    ),
+                ),
+                (
+                    "document_title",
+                    models.CharField(max_length=255, verbose_name="Titre du document"),
+                ),
+                (
+                    "reservation_date",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Date de réservation"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("ready", "Disponible"),
+                            ("fulfilled", "Honorée"),
+                            ("cancelled", "Annulée"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Statut",
+                    ),
+                ),
+                (
+                    "queue_key",
+                    models.BigIntegerField(verbose_name="Clé d'ordre dans la file"),
+                ),
+                (
+                    "library",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="reservations",
+                        to="accounts.library",
+                        verbose_name="Médiathèque de retrait",
+                    ),
+                ),
+                (
+                    "reader",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="accounts.readerprofile",
+                        verbose_name="Lecteur",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Réservation",
+                "verbose_name_plural": "Réservations",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status__in", ["pending", "ready"])),
+                        fields=["document_key", "queue_key"],
+                        name="loans_resv_queue_idx",
+                    ),
+                    models.Index(
+                        fields=["reader", "status"], name="loans_resv_reader_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("status__in", ["pending", "ready"])),
+                        fields=("reader", "document_key"),
+                        name="loans_resv_one_active_per_reader",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_newsletter_campaign"),
+        ("loans", "0002_reservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LoanHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document_title",
+                    models.CharField(max_length=255, verbose_name="Titre du document"),
+                ),
+                ("loan_date", models.DateField(verbose_name="Date de prêt")),
+                ("return_date", models.DateField(verbose_name="Date de retour")),
+            ],
+            options={
+                "verbose_name": "Historique de prêt",
+                "verbose_name_plural": "Historique des prêts",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                condition=models.Q(("returned_at__isnull", False)),
+                fields=["returned_at"],
+                name="loans_returned_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="loanhistory",
+            name="library",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="loan_history",
+                to="accounts.library",
+                verbose_name="Médiathèque",
+            ),
+        ),
+        migrations.AddField(
+            model_name="loanhistory",
+            name="reader",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="loan_history",
+                to="accounts.readerprofile",
+                verbose_name="Lecteur",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loanhistory",
+            index=models.Index(
+                fields=["reader", "return_date"], name="loans_hist_reader_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loanhistory",
+            index=models.Index(
+                condition=models.Q(("reader__isnull", False)),
+                fields=["return_date"],
+                name="loans_hist_named_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.10 on 2026-10-17 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0003_loan_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OverdueScan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scanned_through",
+                    models.DateField(verbose_name="Échéances traitées jusqu'au"),
+                ),
+                (
+                    "overdue_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Prêts en retard"
+                    ),
+                ),
+                (
+                    "notice_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Avis envoyés"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Date du passage"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Détection des retards",
+                "verbose_name_plural": "Détections des retards",
+                "get_latest_by": "scanned_through",
+            },
+        ),
+    ]
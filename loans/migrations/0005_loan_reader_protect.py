@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-17 05:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_newsletter_campaign"),
+        ("loans", "0004_overdue_scan"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="loan",
+            name="reader",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="loans",
+                to="accounts.readerprofile",
+                verbose_name="Lecteur",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-17 05:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_newsletter_campaign"),
+        ("loans", "0005_loan_reader_protect"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="loanhistory",
+            name="library",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="loan_history",
+                to="accounts.library",
+                verbose_name="Médiathèque",
+            ),
+        ),
+    ]
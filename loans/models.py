@@ -0,0 +1,208 @@
+"""Modèles de l'application loans (prêts de documents aux lecteurs)."""
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Loan(models.Model):
+    """
+    Prêt d'un document à un lecteur. Un prêt est en cours tant que
+    ``returned_at`` est vide.
+    """
+
+    objects = models.Manager()
+
+    reader = models.ForeignKey(
+        "accounts.ReaderProfile",
+        # Un lecteur ne peut être supprimé tant qu'il a des prêts en cours
+        on_delete=models.PROTECT,
+        related_name="loans",
+        verbose_name=_("Lecteur"),
+    )
+    library = models.ForeignKey(
+        "accounts.Library",
+        on_delete=models.PROTECT,
+        related_name="loans",
+        verbose_name=_("Médiathèque"),
+    )
+    document_title = models.CharField(_("Titre du document"), max_length=255)
+    loan_date = models.DateField(_("Date de prêt"), default=timezone.localdate)
+    due_date = models.DateField(_("Date de retour prévue"))
+    renewed_count = models.PositiveSmallIntegerField(
+        _("Nombre de prolongations"), default=0
+    )
+    returned_at = models.DateTimeField(_("Date de retour"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Prêt")
+        verbose_name_plural = _("Prêts")
+        indexes = [
+            # Prêts en cours d'un lecteur : parcours d'un seul intervalle de
+            # l'index, déjà trié par id (clé implicite de l'index)
+            models.Index(
+                fields=["reader", "returned_at"], name="loans_reader_returned_idx"
+            ),
+            # Recherche des retards
+            models.Index(fields=["due_date"], name="loans_due_date_idx"),
+            # Prêts rendus à archiver (voir loans.archive)
+            models.Index(
+                fields=["returned_at"],
+                condition=models.Q(returned_at__isnull=False),
+                name="loans_returned_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.document_title} ({self.reader})"
+
+    @property
+    def is_returned(self):
+        return self.returned_at is not None
+
+
+class LoanHistory(models.Model):
+    """
+    Prêt rendu et archivé (voir ``loans.archive``) : une ligne compacte par
+    prêt, hors de la table des prêts en cours. Le lecteur est effacé
+    (``reader`` vide) une fois la durée de conservation écoulée.
+    """
+
+    objects = models.Manager()
+
+    reader = models.ForeignKey(
+        "accounts.ReaderProfile",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="loan_history",
+        verbose_name=_("Lecteur"),
+    )
+    # Conservé (sans médiathèque) si la médiathèque est supprimée
+    library = models.ForeignKey(
+        "accounts.Library",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="loan_history",
+        verbose_name=_("Médiathèque"),
+    )
+    document_title = models.CharField(_("Titre du document"), max_length=255)
+    loan_date = models.DateField(_("Date de prêt"))
+    return_date = models.DateField(_("Date de retour"))
+
+    class Meta:
+        verbose_name = _("Historique de prêt")
+        verbose_name_plural = _("Historique des prêts")
+        indexes = [
+            # Historique d'un lecteur, du plus récent au plus ancien
+            models.Index(
+                fields=["reader", "return_date"], name="loans_hist_reader_idx"
+            ),
+            # Lignes encore nominatives à anonymiser
+            models.Index(
+                fields=["return_date"],
+                condition=models.Q(reader__isnull=False),
+                name="loans_hist_named_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.document_title} ({self.return_date})"
+
+
+class Reservation(models.Model):
+    """
+    Réservation d'un document par un lecteur, dans la file d'attente du
+    document. L'ordre de la file est donné par ``queue_key``, une clé
+    espacée (voir ``loans.reservations``) : annuler ou insérer une
+    réservation ne renumérote pas les suivantes.
+    """
+
+    objects = models.Manager()
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("En attente")
+        READY = "ready", _("Disponible")
+        FULFILLED = "fulfilled", _("Honorée")
+        CANCELLED = "cancelled", _("Annulée")
+
+    # Statuts occupant une place dans la file
+    ACTIVE_STATUSES = (Status.PENDING, Status.READY)
+
+    reader = models.ForeignKey(
+        "accounts.ReaderProfile",
+        on_delete=models.CASCADE,
+        related_name="reservations",
+        verbose_name=_("Lecteur"),
+    )
+    library = models.ForeignKey(
+        "accounts.Library",
+        on_delete=models.PROTECT,
+        related_name="reservations",
+        verbose_name=_("Médiathèque de retrait"),
+    )
+    document_key = models.CharField(
+        _("Référence du document"),
+        max_length=64,
+        help_text=_("Identifiant de la notice (une file par document)."),
+    )
+    document_title = models.CharField(_("Titre du document"), max_length=255)
+    reservation_date = models.DateTimeField(_("Date de réservation"), auto_now_add=True)
+    status = models.CharField(
+        _("Statut"),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    queue_key = models.BigIntegerField(_("Clé d'ordre dans la file"))
+
+    class Meta:
+        verbose_name = _("Réservation")
+        verbose_name_plural = _("Réservations")
+        indexes = [
+            # File d'un document : le rang se compte sur cet index
+            models.Index(
+                fields=["document_key", "queue_key"],
+                condition=models.Q(status__in=["pending", "ready"]),
+                name="loans_resv_queue_idx",
+            ),
+            models.Index(fields=["reader", "status"], name="loans_resv_reader_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reader", "document_key"],
+                condition=models.Q(status__in=["pending", "ready"]),
+                name="loans_resv_one_active_per_reader",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.document_title} ({self.reader})"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+
+class OverdueScan(models.Model):
+    """
+    Passage du détecteur de retards (commande ``scan_overdue``). Le dernier
+    passage sert de point de reprise : le suivant ne lit que les échéances
+    postérieures à ``scanned_through``.
+    """
+
+    objects = models.Manager()
+
+    scanned_through = models.DateField(_("Échéances traitées jusqu'au"))
+    overdue_count = models.PositiveIntegerField(_("Prêts en retard"), default=0)
+    notice_count = models.PositiveIntegerField(_("Avis envoyés"), default=0)
+    created_at = models.DateTimeField(_("Date du passage"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Détection des retards")
+        verbose_name_plural = _("Détections des retards")
+        get_latest_by = "scanned_through"
+
+    def __str__(self):
+        return f"{self.scanned_through}: {self.overdue_count} retard(s)"
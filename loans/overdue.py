@@ -0,0 +1,103 @@
+"""
+Détection des prêts en retard et envoi des avis.
+
+Un passage ne lit que les prêts arrivés à échéance depuis le passage
+précédent : ``due_date`` dans ``]scanned_through précédent, hier]``, par
+une seule requête sur l'index ``due_date``. Le coût d'un passage dépend donc
+du nombre de nouveaux retards, pas du nombre de prêts. Les retards sont
+regroupés par lecteur (puis par médiathèque dans le message) : chaque
+lecteur reçoit un seul avis, mis dans la boîte d'envoi
+(``accounts.outbox``). Les avis et le point de reprise sont enregistrés dans
+la même transaction : un passage interrompu est simplement rejoué.
+"""
+
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.formats import date_format
+from django.utils.translation import gettext as _
+
+from accounts import outbox
+
+from .models import Loan, OverdueScan
+
+# Colonnes lues pour chaque prêt en retard
+OVERDUE_FIELDS = (
+    "reader_id",
+    "reader__user__email",
+    "reader__user__first_name",
+    "reader__user__last_name",
+    "reader__user__username",
+    "library__name",
+    "document_title",
+    "due_date",
+)
+
+
+def newly_overdue(since, until):
+    """Prêts en cours arrivés à échéance entre ``since`` (exclu) et ``until``."""
+    loans = Loan.objects.filter(returned_at__isnull=True, due_date__lte=until)
+    if since is not None:
+        loans = loans.filter(due_date__gt=since)
+    return loans.order_by("reader_id", "library__name", "due_date").values_list(
+        *OVERDUE_FIELDS
+    )
+
+
+def scan(today=None):
+    """
+    Détecte les nouveaux retards et met un avis par lecteur dans la boîte
+    d'envoi. Retourne le passage enregistré, ou ``None`` si les échéances
+    jusqu'à hier ont déjà été traitées.
+    """
+    until = (today or timezone.localdate()) - timedelta(days=1)
+    last = OverdueScan.objects.order_by("-scanned_through").first()
+    since = last.scanned_through if last else None
+    if since is not None and since >= until:
+        return None
+
+    overdue_count, notice_count = 0, 0
+    with transaction.atomic():
+        for _reader_id, rows in groupby(newly_overdue(since, until), itemgetter(0)):
+            rows = list(rows)
+            overdue_count += len(rows)
+            email = rows[0][1]
+            if email:
+                outbox.enqueue(_("Documents en retard"), notice_body(rows), [email])
+                notice_count += 1
+        return OverdueScan.objects.create(
+            scanned_through=until,
+            overdue_count=overdue_count,
+            notice_count=notice_count,
+        )
+
+
+def notice_body(rows):
+    """Texte de l'avis d'un lecteur, ses retards regroupés par médiathèque."""
+    _reader_id, _email, first_name, last_name, username = rows[0][:5]
+    name = f"{first_name} {last_name}".strip() or username
+    lines = [
+        _("Bonjour {name},").format(name=name),
+        "",
+        _("Les documents suivants auraient dû être rendus :"),
+    ]
+    for library, loans in groupby(rows, itemgetter(5)):
+        lines.append("")
+        lines.append(f"{library} :")
+        for row in loans:
+            lines.append(
+                _("- {title} (à rendre le {date})").format(
+                    title=row[6], date=date_format(row[7], "SHORT_DATE_FORMAT")
+                )
+            )
+    lines += [
+        "",
+        _("Merci de les rapporter ou de les prolonger au plus vite."),
+        "",
+        _("Cordialement,"),
+        _("L'équipe MediaBib"),
+    ]
+    return "\n".join(lines)
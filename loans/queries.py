@@ -0,0 +1,22 @@
+"""
+Requêtes de lecture des prêts.
+
+Les listes ne chargent que les colonnes affichées (``.only()``) et ne
+suivent aucune relation : une page de prêts est lue en une requête, par un
+parcours de l'index ``(reader, returned_at)``.
+"""
+
+from .models import Loan
+
+# Colonnes exposées par ``LoanSerializer``
+LOAN_FIELDS = ("id", "document_title", "loan_date", "due_date", "renewed_count")
+
+# Ordre de pagination : id croissant, donné directement par l'index
+LOAN_ORDERING = ("id",)
+
+
+def current_loans(reader_id):
+    """Prêts en cours d'un lecteur, limités aux colonnes exposées."""
+    return Loan.objects.filter(reader_id=reader_id, returned_at__isnull=True).only(
+        *LOAN_FIELDS
+    )
@@ -0,0 +1,128 @@
+"""
+File d'attente des réservations.
+
+Chaque réservation active porte une clé d'ordre espacée (``queue_key``) :
+une nouvelle réservation prend la dernière clé de la file plus ``QUEUE_GAP``
+et une insertion prioritaire prend le milieu de l'intervalle visé. Annuler
+ou honorer une réservation ne touche aucune autre ligne ; la file n'est
+renumérotée que lorsqu'un intervalle est épuisé (après une dizaine
+d'insertions au même endroit).
+
+Le rang n'est pas stocké : c'est le nombre de réservations actives du même
+document placées avant (ou à) la réservation, compté sur l'index partiel
+``(document_key, queue_key)``. ``reader_reservations`` calcule le rang de
+toutes les réservations d'un lecteur en une seule requête.
+"""
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from .models import Reservation
+
+QUEUE_GAP = 1024
+
+
+def active_queue(document_key):
+    """Réservations actives d'un document, dans l'ordre de la file."""
+    return Reservation.objects.filter(
+        document_key=document_key, status__in=Reservation.ACTIVE_STATUSES
+    ).order_by("queue_key", "pk")
+
+
+def next_queue_key(document_key):
+    """Clé d'une réservation ajoutée en fin de file d'un document."""
+    last = active_queue(document_key).values_list("queue_key", flat=True).last()
+    return (last or 0) + QUEUE_GAP
+
+
+def place(reader, library, document_key, document_title):
+    """Ajoute une réservation en fin de file."""
+    with transaction.atomic():
+        return Reservation.objects.create(
+            reader=reader,
+            library=library,
+            document_key=document_key,
+            document_title=document_title,
+            queue_key=next_queue_key(document_key),
+        )
+
+
+def move_before(reservation, target):
+    """
+    Place ``reservation`` juste avant ``target`` dans la file (priorité
+    accordée par le personnel). Seule la réservation déplacée est écrite,
+    sauf si l'intervalle est épuisé.
+    """
+    with transaction.atomic():
+        previous = (
+            active_queue(target.document_key)
+            .filter(queue_key__lt=target.queue_key)
+            .exclude(pk=reservation.pk)
+            .values_list("queue_key", flat=True)
+            .last()
+        )
+        low = target.queue_key - 2 * QUEUE_GAP if previous is None else previous
+        if target.queue_key - low < 2:
+            rebalance(target.document_key)
+            target.refresh_from_db(fields=["queue_key"])
+            return move_before(reservation, target)
+        reservation.queue_key = (low + target.queue_key) // 2
+        reservation.save(update_fields=["queue_key"])
+        return reservation
+
+
+def rebalance(document_key):
+    """Réespace les clés d'une file (``QUEUE_GAP`` entre deux réservations)."""
+    with transaction.atomic():
+        queue = list(active_queue(document_key).select_for_update())
+        for index, reservation in enumerate(queue, start=1):
+            reservation.queue_key = index * QUEUE_GAP
+        Reservation.objects.bulk_update(queue, ["queue_key"])
+
+
+def cancel(reservation):
+    """Annule une réservation ; les suivantes avancent sans être modifiées."""
+    reservation.status = Reservation.Status.CANCELLED
+    reservation.save(update_fields=["status"])
+
+
+def position(reservation):
+    """Rang d'une réservation active dans sa file (1 = la prochaine)."""
+    return (
+        active_queue(reservation.document_key)
+        .filter(
+            Q(queue_key__lt=reservation.queue_key)
+            | Q(queue_key=reservation.queue_key, pk__lte=reservation.pk)
+        )
+        .count()
+    )
+
+
+def reader_reservations(reader_id):
+    """
+    Réservations actives d'un lecteur annotées de ``position_in_queue``,
+    calculée par une sous-requête de comptage corrélée : une seule requête
+    quel que soit le nombre de réservations.
+    """
+    ahead = (
+        Reservation.objects.filter(
+            document_key=OuterRef("document_key"),
+            status__in=Reservation.ACTIVE_STATUSES,
+        )
+        .filter(
+            Q(queue_key__lt=OuterRef("queue_key"))
+            | Q(queue_key=OuterRef("queue_key"), pk__lte=OuterRef("pk"))
+        )
+        .order_by()
+        .values("document_key")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return (
+        Reservation.objects.filter(
+            reader_id=reader_id, status__in=Reservation.ACTIVE_STATUSES
+        )
+        .annotate(position_in_queue=Subquery(ahead))
+        .order_by("reservation_date", "pk")
+        .only("id", "document_title", "reservation_date", "status")
+    )
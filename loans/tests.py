@@ -0,0 +1,518 @@
+"""Tests for the loans application."""
+
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import ProtectedError
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import Library, OutboxEmail, ReaderProfile, User
+
+from . import overdue, reservations
+from .archive import anonymize_history, archive_returned
+from .models import Loan, LoanHistory, OverdueScan, Reservation
+from .queries import current_loans
+
+
+class ReaderLoansAPITests(APITestCase):
+    """Tests for GET /readers/me/loans/."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Loan Lib", code="LOAN01")
+        self.reader = self.create_reader("loanreader", "LOAN-1")
+        self.other = self.create_reader("otherreader", "LOAN-2")
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "loanreader", "password": "loanpass123"},
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def create_reader(self, username, card_number):
+        user = User.objects.create_user(
+            username=username,
+            password="loanpass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        return ReaderProfile.objects.create(
+            user=user, card_number=card_number, gdpr_consent=True
+        )
+
+    def create_loans(self, reader, count, **kwargs):
+        Loan.objects.bulk_create(
+            Loan(
+                reader=reader,
+                library=self.library,
+                document_title=f"Document {index}",
+                due_date=date.today() + timedelta(days=21),
+                **kwargs,
+            )
+            for index in range(count)
+        )
+
+    def test_lists_current_loans_only(self):
+        """Test that returned loans and other readers' loans are excluded."""
+        self.create_loans(self.reader, 2)
+        self.create_loans(self.reader, 1, returned_at=timezone.now())
+        self.create_loans(self.other, 1)
+        response = self.client.get(reverse("reader-me-loans"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [loan["document_title"] for loan in response.data["results"]],
+            ["Document 0", "Document 1"],
+        )
+        self.assertEqual(
+            set(response.data["results"][0]),
+            {"id", "document_title", "loan_date", "due_date", "renewed_count"},
+        )
+
+    def test_cursor_pagination(self):
+        """Test that pages are chained with cursors without overlap."""
+        self.create_loans(self.reader, 120)
+        seen = []
+        url = reverse("reader-me-loans")
+        while url:
+            response = self.client.get(url)
+            seen.extend(loan["id"] for loan in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(seen, sorted(set(seen)))
+
+        response = self.client.get(reverse("reader-me-loans"), {"cursor": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_is_one_indexed_query(self):
+        """Test that a page is read in one query using the reader index."""
+        self.create_loans(self.reader, 300)
+        queryset = current_loans(self.reader.pk).order_by("id")[:51]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(list(queryset)), 51)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("JOIN", queries[0]["sql"])
+        plan = queryset.explain()
+        self.assertIn("loans_reader_returned_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class ReservationQueueTests(APITestCase):
+    """Tests for the sparse-key reservation queue."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Queue Lib", code="QUEUE01")
+        self.readers = []
+        for index in range(4):
+            user = User.objects.create_user(
+                username=f"queue{index}",
+                password="queuepass123",
+                user_type=User.UserType.READER,
+                library=self.library,
+            )
+            self.readers.append(
+                ReaderProfile.objects.create(
+                    user=user, card_number=f"QUEUE-{index}", gdpr_consent=True
+                )
+            )
+
+    def place(self, reader, document_key="DOC-1"):
+        return reservations.place(reader, self.library, document_key, "Titre")
+
+    def positions(self, *holds):
+        return [reservations.position(hold) for hold in holds]
+
+    def test_cancel_does_not_renumber(self):
+        """Test that cancelling a hold moves the others up without writes."""
+        holds = [self.place(reader) for reader in self.readers[:3]]
+        self.assertEqual(self.positions(*holds), [1, 2, 3])
+        keys = [hold.queue_key for hold in holds]
+
+        reservations.cancel(holds[0])
+        self.assertEqual(self.positions(holds[1], holds[2]), [1, 2])
+        self.assertEqual(
+            list(
+                Reservation.objects.filter(pk__in=[holds[1].pk, holds[2].pk])
+                .order_by("pk")
+                .values_list("queue_key", flat=True)
+            ),
+            keys[1:],
+        )
+
+    def test_move_before_and_rebalance(self):
+        """Test priority insertion, including when the key gap runs out."""
+        first, second, third = [self.place(reader) for reader in self.readers[:3]]
+        reservations.move_before(third, second)
+        self.assertEqual(self.positions(first, third, second), [1, 2, 3])
+
+        # Épuise l'intervalle entre first et third : la file est réespacée
+        for _ in range(12):
+            reservations.move_before(second, third)
+            reservations.move_before(third, second)
+        for hold in (first, second, third):
+            hold.refresh_from_db()
+        self.assertEqual(self.positions(first, third, second), [1, 2, 3])
+
+    def test_one_active_hold_per_document(self):
+        """Test that a reader cannot hold the same document twice."""
+        self.place(self.readers[0])
+        with self.assertRaises(IntegrityError):
+            self.place(self.readers[0])
+
+    def test_admin_add_joins_end_of_queue(self):
+        """Test that a hold added in the admin gets the next queue key."""
+        first = self.place(self.readers[0])
+        User.objects.create_user(
+            username="admin",
+            password="adminpass123",
+            user_type=User.UserType.SUPERADMIN,
+        )
+        self.client.login(username="admin", password="adminpass123")
+        response = self.client.post(
+            reverse("admin:loans_reservation_add"),
+            {
+                "reader": self.readers[1].pk,
+                "library": self.library.pk,
+                "document_key": "DOC-1",
+                "document_title": "Titre",
+                "status": Reservation.Status.PENDING,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        hold = Reservation.objects.get(reader=self.readers[1])
+        self.assertEqual(hold.queue_key, first.queue_key + reservations.QUEUE_GAP)
+        self.assertEqual(self.positions(first, hold), [1, 2])
+
+    def test_reader_positions_in_one_query(self):
+        """Test that the API returns all positions of a reader in one query."""
+        for reader in self.readers[:2]:
+            self.place(reader, "DOC-1")
+        self.place(self.readers[2], "DOC-2")
+        self.place(self.readers[3], "DOC-1")
+        self.place(self.readers[3], "DOC-2")
+
+        with CaptureQueriesContext(connection) as queries:
+            holds = list(reservations.reader_reservations(self.readers[3].pk))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([hold.position_in_queue for hold in holds], [3, 2])
+
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "queue3", "password": "queuepass123"},
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get(reverse("reader-me-reservations"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            [hold["position_in_queue"] for hold in response.data["results"]], [3, 2]
+        )
+
+
+@override_settings(LOAN_ARCHIVE_DELAY=7, LOAN_HISTORY_RETENTION_DAYS=120)
+class LoanHistoryArchiveTests(APITestCase):
+    """Tests for the loan archive and history anonymization."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Archive Lib", code="ARCH01")
+        user = User.objects.create_user(
+            username="archreader",
+            password="archpass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        self.reader = ReaderProfile.objects.create(
+            user=user, card_number="ARCH-1", gdpr_consent=True
+        )
+
+    def create_loan(self, title, returned_days_ago=None):
+        returned_at = None
+        if returned_days_ago is not None:
+            returned_at = timezone.now() - timedelta(days=returned_days_ago)
+        return Loan.objects.create(
+            reader=self.reader,
+            library=self.library,
+            document_title=title,
+            loan_date=date.today() - timedelta(days=300),
+            due_date=date.today() - timedelta(days=280),
+            returned_at=returned_at,
+        )
+
+    def test_archive_moves_old_returned_loans(self):
+        """Test that only loans returned before the delay are archived."""
+        self.create_loan("En cours")
+        self.create_loan("Rendu hier", returned_days_ago=1)
+        self.create_loan("Rendu", returned_days_ago=10)
+        self.assertEqual(archive_returned(batch_size=1), 1)
+        self.assertEqual(
+            sorted(Loan.objects.values_list("document_title", flat=True)),
+            ["En cours", "Rendu hier"],
+        )
+        history = LoanHistory.objects.get()
+        self.assertEqual(history.document_title, "Rendu")
+        self.assertEqual(history.reader, self.reader)
+        self.assertEqual(history.return_date, date.today() - timedelta(days=10))
+
+    def test_anonymize_after_retention(self):
+        """Test that the reader is erased from expired history only."""
+        self.create_loan("Ancien", returned_days_ago=200)
+        self.create_loan("Récent", returned_days_ago=30)
+        out = StringIO()
+        call_command("archive_loans", stdout=out)
+        self.assertIn("2 prêt(s) archivé(s), 1 ligne(s)", out.getvalue())
+        self.assertEqual(
+            dict(LoanHistory.objects.values_list("document_title", "reader")),
+            {"Ancien": None, "Récent": self.reader.pk},
+        )
+        self.assertEqual(anonymize_history(), 0)
+
+    def test_reader_with_current_loans_cannot_be_deleted(self):
+        """Test that deletion is refused until all loans are returned."""
+        loan = self.create_loan("En cours")
+        self.create_loan("Rendu", returned_days_ago=1)
+        User.objects.create_user(
+            username="archstaff",
+            password="staffpass123",
+            user_type=User.UserType.LIBRARY,
+            library=self.library,
+        )
+        self.client.login(username="archstaff", password="staffpass123")
+        url = reverse("accounts:reader_delete", args=[self.reader.pk])
+        self.assertContains(self.client.get(url), "1 prêt en cours")
+
+        response = self.client.post(url, follow=True)
+        self.assertRedirects(
+            response, reverse("accounts:reader_detail", args=[self.reader.pk])
+        )
+        self.assertContains(response, "prêts en cours")
+        self.assertTrue(ReaderProfile.objects.filter(pk=self.reader.pk).exists())
+        self.assertEqual(Loan.objects.count(), 2)
+        with self.assertRaises(ProtectedError):
+            self.reader.delete()
+
+        # Une fois les documents rendus, l'historique est archivé et anonymisé
+        loan.returned_at = timezone.now()
+        loan.save()
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse("accounts:reader_list"))
+        self.assertFalse(User.objects.filter(username="archreader").exists())
+        self.assertFalse(Loan.objects.exists())
+        self.assertEqual(
+            sorted(LoanHistory.objects.values_list("document_title", "reader")),
+            [("En cours", None), ("Rendu", None)],
+        )
+
+    def test_library_with_loans_cannot_be_deleted(self):
+        """Test that library deletion is refused, not a server error."""
+        loan = self.create_loan("En cours")
+        LoanHistory.objects.create(
+            reader=self.reader,
+            library=self.library,
+            document_title="Archivé",
+            loan_date=date(2024, 1, 1),
+            return_date=date(2024, 1, 15),
+        )
+        User.objects.create_user(
+            username="root",
+            password="rootpass123",
+            user_type=User.UserType.SUPERADMIN,
+        )
+        self.client.login(username="root", password="rootpass123")
+        url = reverse("accounts:library_delete", args=[self.library.pk])
+        self.assertContains(self.client.get(url), "Suppression impossible")
+
+        response = self.client.post(url, follow=True)
+        self.assertRedirects(
+            response, reverse("accounts:library_detail", args=[self.library.pk])
+        )
+        self.assertContains(response, "suppression impossible")
+        self.assertTrue(Library.objects.filter(pk=self.library.pk).exists())
+
+        # Sans prêt, la médiathèque est supprimée et l'historique conservé
+        loan.delete()
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse("accounts:library_list"))
+        self.assertFalse(Library.objects.filter(pk=self.library.pk).exists())
+        self.assertEqual(
+            list(LoanHistory.objects.values_list("document_title", "library")),
+            [("Archivé", None)],
+        )
+
+    def test_history_endpoint_is_paged_from_archive(self):
+        """Test that /readers/me/history/ pages the archive, newest first."""
+        LoanHistory.objects.bulk_create(
+            LoanHistory(
+                reader=self.reader,
+                library=self.library,
+                document_title=f"Document {index}",
+                loan_date=date(2024, 1, 1),
+                return_date=date(2024, 1, 1) + timedelta(days=index),
+            )
+            for index in range(60)
+        )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "archreader", "password": "archpass123"},
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get(reverse("reader-me-history"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertEqual(response.data["results"][0]["document_title"], "Document 59")
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [row["document_title"] for row in response.data["results"]][-1],
+            "Document 0",
+        )
+        self.assertIsNone(response.data["next"])
+
+
+class OverdueScanTests(APITestCase):
+    """Tests for the overdue scanner."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Centrale", code="OVER01")
+        self.annex = Library.objects.create(name="Annexe", code="OVER02")
+        self.readers = []
+        for index in range(2):
+            user = User.objects.create_user(
+                username=f"late{index}",
+                email=f"late{index}@example.com",
+                user_type=User.UserType.READER,
+                library=self.library,
+            )
+            self.readers.append(
+                ReaderProfile.objects.create(
+                    user=user, card_number=f"LATE-{index}", gdpr_consent=True
+                )
+            )
+        self.today = date(2025, 3, 10)
+
+    def lend(self, reader, title, due_date, library=None, **kwargs):
+        return Loan.objects.create(
+            reader=reader,
+            library=library or self.library,
+            document_title=title,
+            loan_date=due_date - timedelta(days=21),
+            due_date=due_date,
+            **kwargs,
+        )
+
+    def test_one_notice_per_reader(self):
+        """Test that a reader's overdue loans are grouped into one notice."""
+        reader, other = self.readers
+        self.lend(reader, "Livre A", date(2025, 3, 1))
+        self.lend(reader, "Livre B", date(2025, 3, 5), library=self.annex)
+        self.lend(other, "Livre C", date(2025, 3, 9))
+        self.lend(other, "Pas encore", date(2025, 3, 10))
+        self.lend(other, "Rendu", date(2025, 3, 1), returned_at=timezone.now())
+
+        result = overdue.scan(self.today)
+        self.assertEqual((result.overdue_count, result.notice_count), (3, 2))
+        self.assertEqual(result.scanned_through, date(2025, 3, 9))
+
+        notices = {
+            email.recipients[0]: email.body for email in OutboxEmail.objects.all()
+        }
+        self.assertEqual(set(notices), {"late0@example.com", "late1@example.com"})
+        body = notices["late0@example.com"]
+        self.assertIn("Annexe :\n- Livre B", body)
+        self.assertIn("Centrale :\n- Livre A", body)
+        self.assertNotIn("Pas encore", notices["late1@example.com"])
+
+    def test_resumes_from_checkpoint(self):
+        """Test that each run only reads loans due since the last run."""
+        reader = self.readers[0]
+        self.lend(reader, "Ancien", date(2025, 3, 1))
+        overdue.scan(self.today)
+        self.assertIsNone(overdue.scan(self.today))
+
+        self.lend(reader, "Nouveau", date(2025, 3, 10))
+        out = StringIO()
+        call_command("scan_overdue", "--date", "2025-03-12", stdout=out)
+        self.assertIn("1 prêt(s) en retard jusqu'au 11/03/2025", out.getvalue())
+        latest = OutboxEmail.objects.order_by("pk").last()
+        self.assertIn("Nouveau", latest.body)
+        self.assertNotIn("Ancien", latest.body)
+        self.assertEqual(OverdueScan.objects.count(), 2)
+
+        plan = overdue.newly_overdue(date(2025, 3, 9), date(2025, 3, 11)).explain()
+        self.assertIn("loans_due_date_idx", plan)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class ReaderDashboardAPITests(APITestCase):
+    """Tests for GET /readers/me/dashboard/."""
+
+    def setUp(self):
+        self.library = Library.objects.create(name="Dash Lib", code="DASH01")
+        user = User.objects.create_user(
+            username="dashreader",
+            password="dashpass123",
+            user_type=User.UserType.READER,
+            library=self.library,
+        )
+        self.reader = ReaderProfile.objects.create(
+            user=user, card_number="DASH-1", gdpr_consent=True
+        )
+        for index in range(3):
+            Loan.objects.create(
+                reader=self.reader,
+                library=self.library,
+                document_title=f"Prêt {index}",
+                due_date=date.today() + timedelta(days=index),
+            )
+        reservations.place(self.reader, self.library, "DOC-1", "Réservé")
+        LoanHistory.objects.bulk_create(
+            LoanHistory(
+                reader=self.reader,
+                library=self.library,
+                document_title=f"Ancien {index}",
+                loan_date=date(2024, 1, 1),
+                return_date=date(2024, 2, 1) + timedelta(days=index),
+            )
+            for index in range(12)
+        )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "dashreader", "password": "dashpass123"},
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_all_sections_in_few_queries(self):
+        """Test that the full dashboard is built with one query per section."""
+        url = reverse("reader-me-dashboard")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(queries), 4)
+
+        data = response.data
+        self.assertEqual(data["profile"]["card_number"], "DASH-1")
+        self.assertEqual(len(data["loans"]["results"]), 3)
+        self.assertEqual(data["reservations"][0]["position_in_queue"], 1)
+        self.assertEqual(len(data["history"]["results"]), 10)
+        self.assertIn(reverse("reader-me-history"), data["history"]["next"])
+
+        response = self.client.get(data["history"]["next"])
+        self.assertEqual(
+            [row["document_title"] for row in response.data["results"]],
+            ["Ancien 1", "Ancien 0"],
+        )
+
+    def test_include_selects_sections(self):
+        """Test that ?include= limits the sections and rejects unknown ones."""
+        url = reverse("reader-me-dashboard")
+        response = self.client.get(url, {"include": "loans,reservations"})
+        self.assertEqual(set(response.data), {"loans", "reservations"})
+
+        response = self.client.get(url, {"include": "loans,wishlist"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("wishlist", str(response.data["include"]))